@@ -10,10 +10,11 @@ import uuid
 import logging
 import subprocess
 import json
-import requests
+import shutil
+import tempfile
 from datetime import datetime
 from pathlib import Path
-from flask import Flask, request, jsonify, send_file, render_template, flash, redirect, url_for
+from flask import Flask, request, jsonify, render_template, flash, redirect, url_for
 from werkzeug.utils import secure_filename
 from werkzeug.exceptions import RequestEntityTooLarge
 
@@ -23,16 +24,20 @@ from utils.file_handler import FileHandler
 from utils.converter import FileConverter
 from utils.validators import FileValidator
 from utils.cleanup import CleanupManager
+from utils.admission import AdmissionRejected
+from utils.chunked_upload import ChunkedUploadError, ChunkedUploadManager
+from utils.compression import write_sidecars
+from utils.downloads import DownloadManager, send_ephemeral
+from utils.ingest import UploadRejected, check_upload_admission, ingest_request_class, ingest_summary
+from utils.log_pipeline import configure_logging
+from utils.sandbox import ConversionSandbox, LIMIT_ERRORS
+from utils.scheduler import ConversionScheduler
+from utils.spool import get_spool
+from utils.storage import get_storage
+from utils.warmup import state as warmup_state
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('app.log'),
-        logging.StreamHandler()
-    ]
-)
+# Configure logging: records go through a queue to a background writer
+configure_logging()
 logger = logging.getLogger(__name__)
 
 # Initialize Flask app
@@ -44,10 +49,40 @@ file_handler = FileHandler()
 converter = FileConverter()
 validator = FileValidator()
 cleanup_manager = CleanupManager()
+chunked_uploads = ChunkedUploadManager()
+scheduler = ConversionScheduler()
+sandbox = ConversionSandbox()
+downloads = DownloadManager()
+storage = get_storage()
+
+# Uploaded files stream straight to disk through the ingestion stage
+app.request_class = ingest_request_class(validator)
 
 # Start cleanup thread
 cleanup_manager.start_cleanup_thread()
 
+# Remote outputs are expired by the bucket, not by the cleanup thread
+if storage.remote and Config.S3_MANAGE_LIFECYCLE:
+    try:
+        storage.configure_expiry(Config.FILE_RETENTION_HOURS)
+    except Exception as e:
+        logger.error(f"Storage lifecycle setup error: {str(e)}")
+
+@app.before_request
+def admit_upload():
+    """Answer 413 from the headers before an oversized upload body is read"""
+    try:
+        check_upload_admission(request, validator)
+    except UploadRejected as e:
+        logger.warning("Upload rejected before reading the body: %s", e.details)
+        if request.path.startswith('/api/'):
+            return jsonify({
+                'success': False,
+                'error': e.error,
+                'details': e.details
+            }), 413, {'Connection': 'close'}
+        return render_template('413.html'), 413, {'Connection': 'close'}
+
 @app.route('/')
 def index():
     """Main page with enhanced UI"""
@@ -88,16 +123,18 @@ def api_html_to_pdf():
         
         # Generate unique filename
         filename = f"html_converted_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-        output_path = os.path.join(app.config['CONVERTED_FOLDER'], filename)
-        
-        # Call the Node.js converter
-        result = convert_html_to_pdf_via_nodejs(html_content, output_path, {
-            'letterheadType': letterhead_type,
-            'format': format_type,
-            'landscape': landscape
-        })
+        output_path = file_handler.get_output_path(filename)
+        
+        # Call the Node.js converter (Chromium renders are admission-controlled)
+        with scheduler.admit('chromium', len(html_content)):
+            result = convert_html_to_pdf_via_nodejs(html_content, output_path, {
+                'letterheadType': letterhead_type,
+                'format': format_type,
+                'landscape': landscape
+            })
         
         if result['success']:
+            publish_output(output_path, filename)
             return jsonify({
                 'success': True,
                 'filename': filename,
@@ -111,6 +148,8 @@ def api_html_to_pdf():
                 'error': result.get('error', 'Conversion failed')
             }), 500
             
+    except AdmissionRejected as e:
+        return admission_rejected_response(e)
     except Exception as e:
         logger.error(f"HTML to PDF conversion error: {str(e)}")
         return jsonify({
@@ -124,6 +163,8 @@ def convert_html_to_pdf_via_nodejs(html_content, output_path, options):
         # Path to the Node.js converter
         converter_path = os.path.join(os.path.dirname(__file__), 'html_converter', 'converter.js')
         
+        escaped_html = html_content.replace("'", "\\'").replace('"', '\\"')
+        
         # Prepare the command
         cmd = [
             'node', 
@@ -137,7 +178,7 @@ def convert_html_to_pdf_via_nodejs(html_content, output_path, options):
                     await converter.initialize();
                     
                     const result = await converter.convertHTMLToPDF(
-                        `{html_content.replace("'", "\\'").replace('"', '\\"')}`,
+                        `{escaped_html}`,
                         '{output_path}',
                         {{
                             format: '{options.get("format", "A4")}',
@@ -203,6 +244,117 @@ def convert_html_to_pdf_via_nodejs(html_content, output_path, options):
             'error': str(e)
         }
 
+def publish_output(output_path, output_filename):
+    """Hand a finished output to the storage backend and arrange its expiry"""
+    if storage.remote:
+        # Uploaded to the bucket, whose lifecycle rule expires it; nothing stays on this node
+        storage.store(output_path, output_filename)
+        return
+    
+    # Precompress large text outputs once so downloads can skip the encoder
+    write_sidecars(output_path)
+    
+    # Schedule cleanup of output file
+    cleanup_manager.schedule_cleanup(output_path)
+
+def run_conversion(input_path, output_path, target_format, conversion_options, admitted=False):
+    """Run a sandboxed conversion in its lane and engine slots; raises AdmissionRejected when saturated"""
+    engine = converter.engine_for(input_path, target_format)
+    if admitted:
+        return sandbox.convert(converter, engine, input_path, output_path, target_format, conversion_options)
+    with scheduler.admit(engine, os.path.getsize(input_path)):
+        return sandbox.convert(converter, engine, input_path, output_path, target_format, conversion_options)
+
+def conversion_failed_response(conversion_result):
+    """JSON error for a failed conversion; inputs that hit a sandbox limit get a 422"""
+    error_code = conversion_result.get('error_code')
+    body = {'success': False, 'error': conversion_result.get('error', 'Conversion failed')}
+    if error_code:
+        body['error_code'] = error_code
+    return jsonify(body), 422 if error_code in LIMIT_ERRORS else 500
+
+def admission_rejected_response(e):
+    """429 with Retry-After for a conversion turned away by admission control"""
+    return jsonify({
+        'success': False,
+        'error': 'Server busy, please retry',
+        'details': f'{e.engine} conversions are at capacity ({e.reason})',
+        'retry_after': e.retry_after
+    }), 429, {'Retry-After': str(e.retry_after)}
+
+def apply_converter_settings(image_quality, pdf_resolution):
+    """Apply the per-request quality options from the upload form"""
+    if image_quality.isdigit():
+        converter.image_quality = int(image_quality)
+    if pdf_resolution.isdigit():
+        converter.pdf_resolution = int(pdf_resolution)
+
+def convert_upload_response(input_path, unique_id, original_filename, target_format,
+                            conversion_options, image_quality='85', pdf_resolution='300', file_size=0,
+                            admitted=False):
+    """Convert a stored, validated upload and build the JSON reply (shared by the upload APIs)"""
+    # Generate output filename
+    output_filename = f"{unique_id}_converted_{Path(original_filename).stem}.{target_format}"
+    output_path = file_handler.get_output_path(output_filename)
+    
+    # Update converter settings with advanced options
+    apply_converter_settings(image_quality, pdf_resolution)
+    
+    # Perform conversion
+    logger.info("Starting conversion: %s -> %s", original_filename, target_format)
+    logger.debug("Input path: %s, output path: %s", input_path, output_path)
+    try:
+        conversion_result = run_conversion(input_path, output_path, target_format, conversion_options, admitted)
+    finally:
+        # Clean up input file
+        file_handler.delete_file(input_path)
+    logger.debug("Conversion result: %s", conversion_result)
+    
+    if conversion_result['success']:
+        publish_output(output_path, output_filename)
+        
+        download_url = url_for('download_file', filename=output_filename)
+        
+        logger.info("Conversion successful: %s", output_filename)
+        return jsonify({
+            'success': True,
+            'download_url': download_url,
+            'filename': output_filename,
+            'original_filename': original_filename,
+            'target_format': target_format,
+            'file_size': file_size
+        })
+    else:
+        return conversion_failed_response(conversion_result)
+
+def stream_conversion_response(input_path, original_filename, target_format,
+                               conversion_options, image_quality='85', pdf_resolution='300'):
+    """Convert into a private scratch directory and send the bytes back in this response"""
+    download_name = f"{Path(original_filename).stem}.{target_format}"
+    # Small conversions run entirely on the RAM spool
+    spool = get_spool()
+    scratch_root = spool.directory if spool.accepts(os.path.getsize(input_path)) else Config.STREAM_SCRATCH_FOLDER
+    scratch_dir = tempfile.mkdtemp(prefix='stream_', dir=scratch_root)
+    output_path = os.path.join(scratch_dir, download_name)
+    
+    apply_converter_settings(image_quality, pdf_resolution)
+    
+    logger.info("Starting streamed conversion: %s -> %s", original_filename, target_format)
+    try:
+        conversion_result = run_conversion(input_path, output_path, target_format, conversion_options)
+    except Exception:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+        raise
+    finally:
+        file_handler.delete_file(input_path)
+    
+    if not conversion_result['success'] or not os.path.isfile(output_path):
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+        return conversion_failed_response(conversion_result)
+    
+    # Nothing reaches CONVERTED_FOLDER; the scratch copy is gone once the response starts
+    return send_ephemeral(output_path, download_name, scratch_dir)
+
 @app.route('/api/upload', methods=['POST'])
 def api_upload():
     """Enhanced API endpoint for file upload and conversion"""
@@ -220,6 +372,9 @@ def api_upload():
         # Get advanced options
         image_quality = request.form.get('image_quality', '85')
         pdf_resolution = request.form.get('pdf_resolution', '300')
+        conversion_options = {
+            'sheet': request.form.get('sheet', '')
+        }
         
         # Validate input
         if file.filename == '':
@@ -234,10 +389,7 @@ def api_upload():
                 'error': 'Target format not specified'
             }), 400
         
-        # Debug logging
-        logger.info(f"Received file: {file.filename}")
-        logger.info(f"Target format: {target_format}")
-        logger.info(f"Form data: {dict(request.form)}")
+        logger.debug("Received file: %s, target format: %s", file.filename, target_format)
         
         # Validate file
         if not validator.is_allowed_file(file.filename):
@@ -260,9 +412,8 @@ def api_upload():
         input_path = file_handler.save_uploaded_file(file, input_filename)
         
         # Enhanced file validation
-        logger.info(f"Validating file: {input_path}")
-        validation_result = validator.validate_file(input_path, original_filename)
-        logger.info(f"Validation result: {validation_result}")
+        validation_result = validator.validate_file(input_path, original_filename, ingest_summary(file))
+        logger.debug("Validation result for %s: %s", input_path, validation_result)
         if not validation_result['valid']:
             # Clean up invalid file
             file_handler.delete_file(input_path)
@@ -272,56 +423,29 @@ def api_upload():
                 'error': validation_result['error']
             }), 400
         
-        # Generate output filename
-        output_filename = f"{unique_id}_converted_{Path(original_filename).stem}.{target_format}"
-        output_path = os.path.join(Config.CONVERTED_FOLDER, output_filename)
+        # stream=true returns the converted file itself instead of a download_url
+        if request.values.get('stream', '').lower() in ('1', 'true', 'yes'):
+            return stream_conversion_response(input_path, original_filename, target_format,
+                                              conversion_options, image_quality, pdf_resolution)
         
-        # Update converter settings with advanced options
-        if image_quality.isdigit():
-            converter.image_quality = int(image_quality)
-        if pdf_resolution.isdigit():
-            converter.pdf_resolution = int(pdf_resolution)
-        
-        # Perform conversion
-        logger.info(f"Starting conversion: {original_filename} -> {target_format}")
-        logger.info(f"Input path: {input_path}")
-        logger.info(f"Output path: {output_path}")
-        logger.info(f"Input file exists: {os.path.exists(input_path)}")
-        logger.info(f"Input file size: {os.path.getsize(input_path) if os.path.exists(input_path) else 'N/A'}")
-        conversion_result = converter.convert_file(input_path, output_path, target_format)
-        logger.info(f"Conversion result: {conversion_result}")
-        
-        if conversion_result['success']:
-            # Clean up input file
-            file_handler.delete_file(input_path)
-            
-            # Schedule cleanup of output file
-            cleanup_manager.schedule_cleanup(output_path)
-            
-            download_url = url_for('download_file', filename=output_filename)
-            
-            logger.info(f"Conversion successful: {output_filename}")
-            return jsonify({
-                'success': True,
-                'download_url': download_url,
-                'filename': output_filename,
-                'original_filename': original_filename,
-                'target_format': target_format,
-                'file_size': validation_result.get('file_size', 0)
-            })
-        else:
-            # Clean up input file on conversion failure
-            file_handler.delete_file(input_path)
-            return jsonify({
-                'success': False,
-                'error': conversion_result.get('error', 'Conversion failed')
-            }), 500
+        return convert_upload_response(input_path, unique_id, original_filename, target_format,
+                                       conversion_options, image_quality, pdf_resolution,
+                                       validation_result.get('file_size', 0))
             
     except RequestEntityTooLarge:
         return jsonify({
             'success': False,
             'error': 'File too large. Maximum file size is 100MB.'
         }), 413
+    except UploadRejected as e:
+        logger.warning("Upload rejected while streaming: %s", e.details)
+        return jsonify({
+            'success': False,
+            'error': e.error,
+            'details': e.details
+        }), e.code, {'Connection': 'close'}
+    except AdmissionRejected as e:
+        return admission_rejected_response(e)
     except Exception as e:
         logger.error(f"API upload error: {str(e)}")
         return jsonify({
@@ -329,6 +453,145 @@ def api_upload():
             'error': f'Server error: {str(e)}'
         }), 500
 
+@app.route('/api/uploads', methods=['POST'])
+def api_create_chunked_upload():
+    """Start a resumable upload: declare the file, get a session and chunk size"""
+    try:
+        data = request.get_json(silent=True) or {}
+        filename = data.get('filename', '')
+        target_format = str(data.get('target_format', '')).lower()
+        size = data.get('size')
+        
+        if not filename or not validator.is_allowed_file(filename):
+            return jsonify({
+                'success': False,
+                'error': 'File type not supported'
+            }), 400
+        if not target_format:
+            return jsonify({
+                'success': False,
+                'error': 'Target format not specified'
+            }), 400
+        if not isinstance(size, int) or size < 0:
+            return jsonify({
+                'success': False,
+                'error': 'File size must be a non-negative integer'
+            }), 400
+        
+        extension = Path(filename).suffix[1:].lower()
+        if size > validator.get_max_size_for_format(extension):
+            error = validator.size_limit_error(extension)
+            return jsonify({
+                'success': False,
+                'error': error['error'],
+                'details': error['details']
+            }), 413
+        
+        options = {
+            'sheet': str(data.get('sheet', '')),
+            'image_quality': str(data.get('image_quality', '85')),
+            'pdf_resolution': str(data.get('pdf_resolution', '300'))
+        }
+        session = chunked_uploads.create_session(filename, size, target_format, options)
+        return jsonify({
+            'success': True,
+            'upload_id': session['upload_id'],
+            'chunk_size': session['chunk_size'],
+            'chunk_count': session['chunk_count'],
+            'upload_url': url_for('api_chunked_upload', upload_id=session['upload_id'])
+        }), 201
+    
+    except Exception as e:
+        logger.error(f"Chunked upload create error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': f'Server error: {str(e)}'
+        }), 500
+
+@app.route('/api/uploads/<upload_id>', methods=['PUT', 'GET', 'DELETE'])
+def api_chunked_upload(upload_id):
+    """PUT one chunk at ?offset=N, GET the session status, or DELETE the session"""
+    try:
+        if request.method == 'GET':
+            return jsonify({'success': True, **chunked_uploads.status(upload_id)})
+        
+        if request.method == 'DELETE':
+            chunked_uploads.get_session(upload_id)
+            chunked_uploads.discard(upload_id)
+            return jsonify({'success': True})
+        
+        offset = request.args.get('offset', '')
+        if not offset.isdigit() or request.content_length is None:
+            return jsonify({
+                'success': False,
+                'error': 'A numeric offset and a Content-Length are required'
+            }), 400
+        
+        status = chunked_uploads.write_chunk(
+            upload_id,
+            int(offset),
+            request.stream,
+            request.content_length,
+            request.headers.get('X-Chunk-SHA256')
+        )
+        return jsonify({'success': True, **status})
+    
+    except ChunkedUploadError as e:
+        return jsonify({
+            'success': False,
+            'error': e.message
+        }), e.status
+    except Exception as e:
+        logger.error(f"Chunked upload error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': f'Server error: {str(e)}'
+        }), 500
+
+@app.route('/api/uploads/<upload_id>/complete', methods=['POST'])
+def api_complete_chunked_upload(upload_id):
+    """Assemble a finished upload and hand it straight to conversion"""
+    try:
+        data = request.get_json(silent=True) or {}
+        session = chunked_uploads.get_session(upload_id)
+        
+        unique_id = str(uuid.uuid4())
+        original_filename = session['filename']
+        input_path = file_handler.get_upload_path(f"{unique_id}_{original_filename}")
+        
+        # Admit before assembling, so a busy server leaves the session intact for a retry
+        engine = converter.engine_for(original_filename, session['target_format'])
+        with scheduler.admit(engine, session['size']):
+            chunked_uploads.complete(upload_id, input_path, validator, data.get('sha256'))
+        
+            validation_result = validator.validate_file(input_path, original_filename)
+            if not validation_result['valid']:
+                file_handler.delete_file(input_path)
+                return jsonify({
+                    'success': False,
+                    'error': validation_result['error']
+                }), 400
+    
+            options = session['options']
+            return convert_upload_response(input_path, unique_id, original_filename, session['target_format'],
+                                           {'sheet': options.get('sheet', '')},
+                                           options.get('image_quality', '85'), options.get('pdf_resolution', '300'),
+                                           validation_result.get('file_size', 0), admitted=True)
+    
+    except AdmissionRejected as e:
+        return admission_rejected_response(e)
+    except ChunkedUploadError as e:
+        return jsonify({
+            'success': False,
+            'error': e.message
+        }), e.status
+    except Exception as e:
+        logger.error(f"Chunked upload complete error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': f'Server error: {str(e)}'
+        }), 500
+
 @app.route('/upload', methods=['POST'])
 def upload_file():
     """Enhanced form-based file upload endpoint"""
@@ -344,6 +607,9 @@ def upload_file():
         # Get advanced options
         image_quality = request.form.get('image_quality', '85')
         pdf_resolution = request.form.get('pdf_resolution', '300')
+        conversion_options = {
+            'sheet': request.form.get('sheet', '')
+        }
         
         # Validate input
         if file.filename == '':
@@ -372,7 +638,7 @@ def upload_file():
         input_path = file_handler.save_uploaded_file(file, input_filename)
         
         # Enhanced file validation
-        validation_result = validator.validate_file(input_path, original_filename)
+        validation_result = validator.validate_file(input_path, original_filename, ingest_summary(file))
         if not validation_result['valid']:
             # Clean up invalid file
             file_handler.delete_file(input_path)
@@ -381,24 +647,24 @@ def upload_file():
         
         # Generate output filename
         output_filename = f"{unique_id}_converted_{Path(original_filename).stem}.{target_format}"
-        output_path = os.path.join(Config.CONVERTED_FOLDER, output_filename)
+        output_path = file_handler.get_output_path(output_filename)
         
         # Update converter settings with advanced options
-        if image_quality.isdigit():
-            converter.image_quality = int(image_quality)
-        if pdf_resolution.isdigit():
-            converter.pdf_resolution = int(pdf_resolution)
+        apply_converter_settings(image_quality, pdf_resolution)
         
         # Perform conversion
-        logger.info(f"Starting conversion: {original_filename} -> {target_format}")
-        conversion_result = converter.convert_file(input_path, output_path, target_format)
+        logger.info("Starting conversion: %s -> %s", original_filename, target_format)
+        try:
+            conversion_result = run_conversion(input_path, output_path, target_format, conversion_options)
+        except AdmissionRejected:
+            file_handler.delete_file(input_path)
+            raise
         
         if conversion_result['success']:
             # Clean up input file
             file_handler.delete_file(input_path)
             
-            # Schedule cleanup of output file
-            cleanup_manager.schedule_cleanup(output_path)
+            publish_output(output_path, output_filename)
             
             # Redirect to success page
             flash(f'File converted successfully! Original: {original_filename} -> {target_format.upper()}', 'success')
@@ -412,6 +678,13 @@ def upload_file():
     except RequestEntityTooLarge:
         flash('File too large. Maximum file size is 100MB.', 'error')
         return redirect(request.url)
+    except UploadRejected as e:
+        logger.warning("Upload rejected while streaming: %s", e.details)
+        flash(f'{e.error}: {e.details}', 'error')
+        return redirect(request.url)
+    except AdmissionRejected as e:
+        flash(f'The server is busy converting other files. Please try again in {e.retry_after} seconds.', 'error')
+        return redirect(request.url)
     except Exception as e:
         logger.error(f"Upload error: {str(e)}")
         flash(f'Server error: {str(e)}', 'error')
@@ -421,20 +694,18 @@ def upload_file():
 def download_file(filename):
     """Download converted file"""
     try:
-        file_path = os.path.join(Config.CONVERTED_FOLDER, filename)
-        
-        if not os.path.exists(file_path):
-            return "File not found", 404
-        
         # Get original filename for download
         original_name = filename.split('_converted_', 1)[-1] if '_converted_' in filename else filename
         
-        return send_file(
-            file_path,
-            as_attachment=True,
-            download_name=original_name,
-            mimetype='application/octet-stream'
-        )
+        # The bucket serves remote outputs itself through a short-lived signed URL
+        if storage.remote:
+            return redirect(storage.download_url(filename, original_name))
+        
+        # Range, If-None-Match and proxy offload are handled by the download manager
+        response = downloads.send(filename, original_name)
+        if response is None:
+            return "File not found", 404
+        return response
         
     except Exception as e:
         logger.error(f"Download error: {str(e)}")
@@ -444,18 +715,20 @@ def download_file(filename):
 def success(filename):
     """Success page after conversion"""
     try:
-        file_path = os.path.join(Config.CONVERTED_FOLDER, filename)
-        
-        if not os.path.exists(file_path):
+        if storage.remote:
+            file_size = storage.size(filename)
+        else:
+            file_stat = downloads.stat(filename)
+            file_size = file_stat.st_size if file_stat else None
+        if file_size is None:
             return "File not found", 404
         
-        # Get file info
-        file_size = os.path.getsize(file_path)
         original_name = filename.split('_converted_', 1)[-1] if '_converted_' in filename else filename
         
         return render_template('success.html', 
                              filename=filename,
                              original_name=original_name,
+                             target_format=Path(filename).suffix[1:],
                              file_size=file_size,
                              download_url=url_for('download_file', filename=filename))
         
@@ -463,6 +736,15 @@ def success(filename):
         logger.error(f"Success page error: {str(e)}")
         return "Error", 500
 
+@app.route('/api/metrics/lanes')
+def lane_metrics():
+    """Queue-wait and latency percentiles per scheduling lane, across this host's workers"""
+    try:
+        return jsonify(scheduler.stats())
+    except Exception as e:
+        logger.error(f"Lane metrics error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/formats')
 def get_formats():
     """API endpoint to get supported formats"""
@@ -534,7 +816,8 @@ def health_check():
             'pil_available': converter.pil_available,
             'pymupdf_available': converter.pymupdf_available,
             'reportlab_available': converter.reportlab_available,
-            'docx_available': converter.docx_available
+            'docx_available': converter.docx_available,
+            'libreoffice_available': converter.libreoffice_available
         }
         
         return jsonify({
@@ -559,6 +842,12 @@ def health():
     """Simple health check for load balancers"""
     return "OK", 200
 
+@app.route('/ready')
+def ready():
+    """Readiness check: 503 until every gunicorn worker has finished its warm-up"""
+    status = warmup_state.snapshot()
+    return jsonify(status), 200 if status['ready'] else 503
+
 @app.errorhandler(404)
 def not_found(e):
     """404 error handler"""
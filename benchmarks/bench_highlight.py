@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark: code to highlighted HTML.
+Measures per-language highlighting throughput, the one-off lexer load
+cost and the time to serve a repeated file from the render cache.
+
+Usage: python benchmarks/bench_highlight.py [size_mb]
+"""
+
+import os
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.highlighter import CodeHighlighter, get_lexer, pygments_available
+from utils.render_cache import RenderCache
+
+SAMPLES = {
+    'py': 'def handler(event, context):\n    """Docstring"""\n    total = sum(x * 2 for x in event["items"])  # comment\n    return {"total": total, "ok": True}\n\n',
+    'js': 'function handler(event) {\n  // comment\n  const total = event.items.reduce((a, b) => a + b * 2, 0);\n  return { total, ok: true };\n}\n\n',
+    'css': '.card > .title:hover {\n  color: #333;\n  margin: 0 auto;\n  font: 12px/1.4 "Helvetica", sans-serif;\n}\n\n',
+    'java': 'public class Handler {\n    // comment\n    public int total(int[] items) {\n        int t = 0; for (int x : items) { t += x * 2; }\n        return t;\n    }\n}\n\n',
+    'go': 'func total(items []int) int {\n\t// comment\n\tt := 0\n\tfor _, x := range items {\n\t\tt += x * 2\n\t}\n\treturn t\n}\n\n',
+    'rs': 'fn total(items: &[i32]) -> i32 {\n    // comment\n    items.iter().map(|x| x * 2).sum()\n}\n\n',
+    'yaml': 'service:\n  name: "converter"\n  replicas: 3\n  ports:\n    - 8080\n    - 9090\n\n',
+    'log': '2024-01-01 12:00:00,000 - app - INFO - Converting pdf to txt in 0.42s\n',
+}
+
+def build_source(path: str, sample: str, size_mb: float):
+    target = int(size_mb * 1024 * 1024)
+    with open(path, 'w', encoding='utf-8') as f:
+        written = 0
+        while written < target:
+            f.write(sample)
+            written += len(sample)
+
+def main():
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 2
+    if not pygments_available():
+        print("Pygments is not installed; only the escaped fallback would be measured")
+        return
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        print(f"Input: {size_mb:.1f} MB per language")
+        print(f"{'lang':<8}{'lexer ms':>10}{'time (s)':>10}{'MB/s':>10}{'cached ms':>11}")
+
+        for ext, sample in SAMPLES.items():
+            source = os.path.join(work_dir, f'sample.{ext}')
+            output = os.path.join(work_dir, f'sample.{ext}.html')
+            build_source(source, sample, size_mb)
+            size = os.path.getsize(source)
+
+            start = time.perf_counter()
+            get_lexer(ext)
+            lexer_ms = (time.perf_counter() - start) * 1000
+
+            # Cache large enough to hold the whole output for the repeat run
+            cache = RenderCache(max_bytes=512 * 1024 * 1024, max_entry_bytes=512 * 1024 * 1024)
+            highlighter = CodeHighlighter(cache, max_bytes=size)
+
+            start = time.perf_counter()
+            highlighter.render_html(source, output, 'sample', ext, size)
+            elapsed = time.perf_counter() - start
+
+            start = time.perf_counter()
+            highlighter.render_html(source, output, 'sample', ext, size)
+            cached_ms = (time.perf_counter() - start) * 1000
+
+            print(f"{ext:<8}{lexer_ms:>10.1f}{elapsed:>10.2f}{size / (1024 * 1024) / elapsed:>10.2f}{cached_ms:>11.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark: HTML to text extraction.
+Compares the old whole-document regex approach with the streaming
+extractor (one compiled tokenizer pattern per chunk) on a large
+generated page.
+
+Usage: python benchmarks/bench_html_to_text.py [size_mb]
+"""
+
+import os
+import re
+import sys
+import time
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.html_text import extract_html_text
+
+def build_page(path: str, size_mb: int):
+    """Write a large HTML page with scripts, styles, tables and lists"""
+    block = (
+        '<div class="card"><h2>Section title</h2>'
+        '<p>Lorem ipsum <b>dolor</b> sit amet, <a href="#">consectetur</a> adipiscing elit. '
+        'Sed do eiusmod tempor incididunt ut labore et dolore magna aliqua.</p>'
+        '<script>var data = {"items": [1, 2, 3], "html": "<p>not text</p>"};</script>'
+        '<style>.card { margin: 0 auto; padding: 4px; }</style>'
+        '<ul><li>first item</li><li>second &amp; third</li></ul>'
+        '<table><tr><th>Name</th><th>Value</th></tr><tr><td>alpha</td><td>42</td></tr></table>'
+        '</div>\n'
+    )
+    target = size_mb * 1024 * 1024
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<!DOCTYPE html><html><head><title>Benchmark</title></head><body>\n')
+        written = 0
+        while written < target:
+            f.write(block)
+            written += len(block)
+        f.write('</body></html>\n')
+
+def regex_extract(input_path: str, output_path: str):
+    """The previous implementation, kept here as the baseline"""
+    with open(input_path, 'r', encoding='utf-8', errors='ignore') as f:
+        content = f.read()
+    text = re.sub(r'<[^>]+>', '', content)
+    text = re.sub(r'\s+', ' ', text).strip()
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+def measure(func, input_path: str, output_path: str) -> dict:
+    """Wall time from a clean run, peak Python allocations from a traced run"""
+    start = time.perf_counter()
+    func(input_path, output_path)
+    elapsed = time.perf_counter() - start
+    
+    tracemalloc.start()
+    func(input_path, output_path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    return {'seconds': elapsed, 'peak_mb': peak / (1024 * 1024), 'output_bytes': os.path.getsize(output_path)}
+
+def main():
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    
+    with tempfile.TemporaryDirectory() as work_dir:
+        page = os.path.join(work_dir, 'page.html')
+        build_page(page, size_mb)
+        input_mb = os.path.getsize(page) / (1024 * 1024)
+        print(f"Input: {input_mb:.1f} MB of HTML")
+        print(f"{'method':<12}{'time (s)':>10}{'MB/s':>10}{'peak MB':>10}{'output MB':>12}")
+        
+        for name, func in (('regex', regex_extract), ('streaming', extract_html_text)):
+            result = measure(func, page, os.path.join(work_dir, f'{name}.txt'))
+            print(f"{name:<12}{result['seconds']:>10.2f}{input_mb / result['seconds']:>10.1f}"
+                  f"{result['peak_mb']:>10.1f}{result['output_bytes'] / (1024 * 1024):>12.1f}")
+
+if __name__ == "__main__":
+    main()
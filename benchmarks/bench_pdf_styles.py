@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark: small text files to PDF with ReportLab.
+Compares a stylesheet built per conversion with the shared per-process
+cache, both in-process and in forked children (the sandbox), where the
+worker either primed ReportLab before forking or did not. Each cell is
+the median over [runs] conversions (after WARMUP_RUNS discarded ones)
+with the 10th-90th percentile spread, since single-run timings of a few
+milliseconds are mostly noise.
+
+Usage: python benchmarks/bench_pdf_styles.py [runs]
+"""
+
+import os
+import sys
+import time
+import tempfile
+import statistics
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+from utils.converter import FileConverter
+from utils.pdf_layout import prime_reportlab, sample_styles
+
+SIZES_KB = [1, 4, 16]
+WARMUP_RUNS = 5
+PARAGRAPH = 'The quick brown fox jumps over the lazy dog. ' * 6 + '\n\n'
+
+def build_source(path: str, size_kb: int):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write((PARAGRAPH * (size_kb * 1024 // len(PARAGRAPH) + 1))[:size_kb * 1024])
+
+def convert_uncached(input_path: str, output_path: str):
+    """The previous code path: a fresh stylesheet for every conversion"""
+    with open(input_path, 'r', encoding='utf-8', errors='ignore') as f:
+        content = f.read()
+    doc = SimpleDocTemplate(output_path, pagesize=A4, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18)
+    styles = sample_styles.__wrapped__()
+    story = []
+    for para in content.split('\n\n'):
+        if para.strip():
+            story.append(Paragraph(para.strip().replace('\n', ' '), styles['Normal']))
+            story.append(Spacer(1, 12))
+    doc.build(story)
+
+def summarize(samples: list) -> str:
+    """'median (p10-p90)' in milliseconds"""
+    deciles = statistics.quantiles(samples, n=10)
+    return f"{statistics.median(samples):.2f} ({deciles[0]:.2f}-{deciles[-1]:.2f})"
+
+def timed(job, runs: int) -> str:
+    for _ in range(WARMUP_RUNS):
+        job()
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        job()
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+def timed_forked(job, runs: int) -> str:
+    """Milliseconds of the job in a fresh fork, measured inside the child"""
+    samples = []
+    for _ in range(runs):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            start = time.perf_counter()
+            job()
+            os.write(write_fd, str((time.perf_counter() - start) * 1000).encode())
+            os._exit(0)
+        os.close(write_fd)
+        with os.fdopen(read_fd, 'rb') as pipe:
+            samples.append(float(pipe.read()))
+        os.waitpid(pid, 0)
+    return summarize(samples)
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    converter = FileConverter()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        jobs = {}
+        for size_kb in SIZES_KB:
+            source = os.path.join(work_dir, f'sample_{size_kb}k.txt')
+            build_source(source, size_kb)
+            output = os.path.join(work_dir, f'sample_{size_kb}k.pdf')
+            jobs[size_kb] = (
+                lambda s=source, o=output: convert_uncached(s, o),
+                lambda s=source, o=output: converter._convert_text_to_pdf_reportlab(s, o),
+            )
+
+        # Children forked before anything warmed ReportLab up in this process
+        cold = {size_kb: timed_forked(cached, runs) for size_kb, (_, cached) in jobs.items()}
+        prime_reportlab()
+        primed = {size_kb: timed_forked(cached, runs) for size_kb, (_, cached) in jobs.items()}
+
+        print(f"ms per conversion, median (p10-p90) of {runs} runs")
+        print(f"{'input':<8}{'per-call':>20}{'cached':>20}{'fork cold':>20}{'fork primed':>20}")
+        for size_kb, (uncached, cached) in jobs.items():
+            before = timed(uncached, runs)
+            after = timed(cached, runs)
+            print(f"{str(size_kb) + ' KB':<8}{before:>20}{after:>20}{cold[size_kb]:>20}{primed[size_kb]:>20}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark: worker startup.
+Imports the app in fresh interpreters (what a recycled worker or a cold
+container pays) and reports the wall time plus the slowest modules from
+python -X importtime, and which optional engines got loaded eagerly.
+
+Usage: python benchmarks/bench_startup.py [runs] [top]
+"""
+
+import os
+import sys
+import time
+import tempfile
+import statistics
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Heavy optional engines that should only be imported on first use
+ENGINE_MODULES = ['PIL', 'fitz', 'reportlab', 'docx', 'pygments', 'uno', 'requests']
+
+def import_app(work_dir: str, importtime: bool = False):
+    """Import app in a new interpreter; returns (seconds, stderr)"""
+    env = dict(os.environ, PYTHONPATH=str(ROOT), PYTHONDONTWRITEBYTECODE='1')
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ['-X', 'importtime']
+    cmd += ['-c', 'import app']
+    start = time.perf_counter()
+    result = subprocess.run(cmd, cwd=work_dir, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        print(result.stderr)
+        raise SystemExit("import app failed")
+    return elapsed, result.stderr
+
+def parse_importtime(stderr: str) -> dict:
+    """Map top-level package -> (self us, cumulative us) from -X importtime output"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        modules[name] = (int(self_us), int(cumulative_us))
+    return modules
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    top = int(sys.argv[2]) if len(sys.argv) > 2 else 15
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        import_app(work_dir)  # warm the page cache and the capability manifest
+        times = [import_app(work_dir)[0] for _ in range(runs)]
+        _, stderr = import_app(work_dir, importtime=True)
+
+    modules = parse_importtime(stderr)
+    total_us = sum(self_us for self_us, _ in modules.values())
+
+    print(f"import app: median {statistics.median(times) * 1000:.0f} ms, "
+          f"min {min(times) * 1000:.0f} ms over {runs} runs (interpreter start included)")
+    print(f"modules imported: {len(modules)}, import time {total_us / 1000:.0f} ms")
+    print()
+    print(f"{'module':<48}{'self ms':>10}{'cumul ms':>10}")
+    for name, (self_us, cumulative_us) in sorted(modules.items(), key=lambda item: -item[1][1])[:top]:
+        print(f"{name:<48}{self_us / 1000:>10.1f}{cumulative_us / 1000:>10.1f}")
+    print()
+    for name in ENGINE_MODULES:
+        state = f"{modules[name][1] / 1000:.1f} ms at startup" if name in modules else 'lazy'
+        print(f"{name:<12}{state}")
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from pathlib import Path
 
 class Config:
@@ -17,6 +18,44 @@ class Config:
     UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER', 'uploads')
     CONVERTED_FOLDER = os.environ.get('CONVERTED_FOLDER', 'converted')
     
+    # Upload ingestion
+    INGEST_CHUNK_BYTES = int(os.environ.get('INGEST_CHUNK_BYTES', 1024 * 1024))  # 1MB reads and writes
+    UPLOAD_PEEK_BYTES = int(os.environ.get('UPLOAD_PEEK_BYTES', 16 * 1024))  # body head searched for the filename
+    UPLOAD_FORM_OVERHEAD = int(os.environ.get('UPLOAD_FORM_OVERHEAD', 64 * 1024))  # form fields + multipart framing
+    
+    # RAM spool (tmpfs) for small uploads and intermediates; '' keeps everything on disk
+    SPOOL_DIR = os.environ.get('SPOOL_DIR', '/dev/shm/dazzlodocs-spool' if os.path.isdir('/dev/shm') else '')
+    SPOOL_MAX_BYTES = int(os.environ.get('SPOOL_MAX_BYTES', 8 * 1024 * 1024))  # larger files go to disk
+    SPOOL_MIN_FREE_BYTES = int(os.environ.get('SPOOL_MIN_FREE_BYTES', 32 * 1024 * 1024))  # tmpfs headroom to keep
+    
+    # Resumable chunked uploads
+    CHUNKED_UPLOAD_FOLDER = os.environ.get('CHUNKED_UPLOAD_FOLDER', os.path.join(UPLOAD_FOLDER, '.chunked'))
+    CHUNKED_UPLOAD_CHUNK_SIZE = int(os.environ.get('CHUNKED_UPLOAD_CHUNK_SIZE', 8 * 1024 * 1024))  # 8MB
+    CHUNKED_UPLOAD_TTL_HOURS = int(os.environ.get('CHUNKED_UPLOAD_TTL_HOURS', 6))  # abandoned sessions
+    
+    # Downloads: '' serves from Python, 'x-accel' (nginx) or 'x-sendfile' (Apache/lighttpd) hand off to the proxy
+    DOWNLOAD_OFFLOAD = os.environ.get('DOWNLOAD_OFFLOAD', '')
+    DOWNLOAD_ACCEL_PREFIX = os.environ.get('DOWNLOAD_ACCEL_PREFIX', '/protected-converted/')  # nginx internal location
+    DOWNLOAD_MAX_AGE = int(os.environ.get('DOWNLOAD_MAX_AGE', 3600))
+    
+    # Where converted files live: 'local' (CONVERTED_FOLDER) or 's3' (any S3-compatible store)
+    STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'local')
+    S3_BUCKET = os.environ.get('S3_BUCKET', '')
+    S3_PREFIX = os.environ.get('S3_PREFIX', 'converted')
+    S3_ENDPOINT_URL = os.environ.get('S3_ENDPOINT_URL') or None  # e.g. http://minio:9000
+    S3_REGION = os.environ.get('S3_REGION', 'us-east-1')
+    S3_PRESIGN_SECONDS = int(os.environ.get('S3_PRESIGN_SECONDS', 900))
+    S3_MULTIPART_THRESHOLD = int(os.environ.get('S3_MULTIPART_THRESHOLD', 8 * 1024 * 1024))  # 8MB
+    S3_MULTIPART_CHUNK_SIZE = int(os.environ.get('S3_MULTIPART_CHUNK_SIZE', 8 * 1024 * 1024))  # 8MB
+    S3_MAX_CONCURRENCY = int(os.environ.get('S3_MAX_CONCURRENCY', 4))
+    S3_MANAGE_LIFECYCLE = os.environ.get('S3_MANAGE_LIFECYCLE', 'True').lower() == 'true'  # create bucket + expiry rule at startup
+    STREAM_SCRATCH_FOLDER = os.environ.get('STREAM_SCRATCH_FOLDER') or None  # stream=true conversions; system temp by default
+    COMPRESS_MIN_BYTES = int(os.environ.get('COMPRESS_MIN_BYTES', 1024))  # smaller text is sent as is
+    COMPRESS_SIDECAR_MIN_BYTES = int(os.environ.get('COMPRESS_SIDECAR_MIN_BYTES', 256 * 1024))  # larger text gets .gz/.br/.zst at conversion time
+    COMPRESS_GZIP_LEVEL = int(os.environ.get('COMPRESS_GZIP_LEVEL', 6))
+    COMPRESS_BROTLI_QUALITY = int(os.environ.get('COMPRESS_BROTLI_QUALITY', 5))
+    COMPRESS_ZSTD_LEVEL = int(os.environ.get('COMPRESS_ZSTD_LEVEL', 10))
+    
     # Universal supported file extensions
     ALLOWED_EXTENSIONS = {
         # Images
@@ -54,11 +93,69 @@ class Config:
     IMAGE_QUALITY = int(os.environ.get('IMAGE_QUALITY', 85))
     IMAGE_MAX_DIMENSION = int(os.environ.get('IMAGE_MAX_DIMENSION', 2048))
     PDF_RESOLUTION = int(os.environ.get('PDF_RESOLUTION', 300))
+    TABLE_FONT_SIZE = float(os.environ.get('TABLE_FONT_SIZE', 7))
+    TABLE_SAMPLE_ROWS = int(os.environ.get('TABLE_SAMPLE_ROWS', 200))
+    XLSX_PARALLEL_WORKERS = int(os.environ.get('XLSX_PARALLEL_WORKERS', 4))
+    XLSX_PARALLEL_MIN_BYTES = int(os.environ.get('XLSX_PARALLEL_MIN_BYTES', 20 * 1024 * 1024))  # 20MB
+    
+    # Rendered output cache (per worker process, keyed by input content hash)
+    RENDER_CACHE_MAX_BYTES = int(os.environ.get('RENDER_CACHE_MAX_BYTES', 32 * 1024 * 1024))  # 32MB
+    RENDER_CACHE_MAX_ENTRY_BYTES = int(os.environ.get('RENDER_CACHE_MAX_ENTRY_BYTES', 2 * 1024 * 1024))  # 2MB
+    HIGHLIGHT_MAX_BYTES = int(os.environ.get('HIGHLIGHT_MAX_BYTES', 10 * 1024 * 1024))  # larger files are escaped only
+    HIGHLIGHT_CHUNK_BYTES = int(os.environ.get('HIGHLIGHT_CHUNK_BYTES', 256 * 1024))
+    FAST_COPY_HARDLINK = os.environ.get('FAST_COPY_HARDLINK', 'True').lower() == 'true'  # passthroughs share the upload's inode
+    
+    # LibreOffice worker pool (per gunicorn worker)
+    LIBREOFFICE_PATH = os.environ.get('LIBREOFFICE_PATH', 'soffice')
+    LIBREOFFICE_UNO_PATH = os.environ.get('LIBREOFFICE_UNO_PATH', '/usr/lib/python3/dist-packages')
+    LIBREOFFICE_PROFILE_DIR = os.environ.get('LIBREOFFICE_PROFILE_DIR', '/tmp')
+    LIBREOFFICE_POOL_SIZE = int(os.environ.get('LIBREOFFICE_POOL_SIZE', 1))
+    LIBREOFFICE_MAX_JOBS = int(os.environ.get('LIBREOFFICE_MAX_JOBS', 50))  # recycle after N jobs
+    LIBREOFFICE_JOB_TIMEOUT = int(os.environ.get('LIBREOFFICE_JOB_TIMEOUT', 90))
+    LIBREOFFICE_STARTUP_TIMEOUT = int(os.environ.get('LIBREOFFICE_STARTUP_TIMEOUT', 30))
+    LIBREOFFICE_ACQUIRE_TIMEOUT = int(os.environ.get('LIBREOFFICE_ACQUIRE_TIMEOUT', 20))
+    
+    # Admission control: per-engine 'slots:queue' shared by the workers on one host
+    ADMISSION_ENABLED = os.environ.get('ADMISSION_ENABLED', 'True').lower() == 'true'
+    ADMISSION_LIMITS = os.environ.get('ADMISSION_LIMITS',
+                                      'chromium=2:4,libreoffice=2:8,pymupdf=2:8,reportlab=4:16,pillow=4:16,default=16:64')
+    ADMISSION_WAIT_SECONDS = float(os.environ.get('ADMISSION_WAIT_SECONDS', 30))  # longest wait in the queue
+    ADMISSION_LOCK_DIR = os.environ.get('ADMISSION_LOCK_DIR', os.path.join(tempfile.gettempdir(), 'dazzlodocs-admission'))
+    
+    # Scheduling lanes: jobs costing up to FAST_LANE_MAX_COST_BYTES (input size x pair cost) take the fast lane.
+    # Keep bulk slots + queue below the worker count so waiting bulk jobs never hold every worker.
+    LANE_LIMITS = os.environ.get('LANE_LIMITS', 'fast=4:16,bulk=2:1')
+    FAST_LANE_MAX_COST_BYTES = int(os.environ.get('FAST_LANE_MAX_COST_BYTES', 4 * 1024 * 1024))  # 4MB of text, 512KB of office
+    FAST_LANE_RESERVED = int(os.environ.get('FAST_LANE_RESERVED', 1))  # engine slots bulk jobs may not take
+    LANE_SAMPLE_SIZE = int(os.environ.get('LANE_SAMPLE_SIZE', 512))  # recent jobs per lane and worker in the metrics
+    LANE_METRICS_FLUSH_JOBS = int(os.environ.get('LANE_METRICS_FLUSH_JOBS', 50))  # write a worker's metrics snapshot every N jobs
+    LANE_METRICS_FLUSH_SECONDS = float(os.environ.get('LANE_METRICS_FLUSH_SECONDS', 5))  # ... or when it is this old
+    
+    # Sandboxed conversions: each job runs in a forked child with these limits (0 = no limit).
+    # RLIMIT_AS counts the address space inherited from the worker, so keep it well above the worker's VSZ.
+    SANDBOX_ENABLED = os.environ.get('SANDBOX_ENABLED', 'True').lower() == 'true'
+    SANDBOX_MAX_MEMORY_MB = int(os.environ.get('SANDBOX_MAX_MEMORY_MB', 2048))
+    SANDBOX_MAX_CPU_SECONDS = int(os.environ.get('SANDBOX_MAX_CPU_SECONDS', 60))
+    SANDBOX_MAX_OUTPUT_MB = int(os.environ.get('SANDBOX_MAX_OUTPUT_MB', 512))  # largest file a job may write
+    SANDBOX_TIMEOUTS = os.environ.get('SANDBOX_TIMEOUTS',  # wall clock per input>target pair or engine
+                                      'pdf>docx=90,pdf>doc=90,pymupdf=60,reportlab=60,pillow=30,default=30')
+    SANDBOX_EXEMPT_ENGINES = os.environ.get('SANDBOX_EXEMPT_ENGINES', 'libreoffice')  # run in-process
+    
+    # Optional engines found at startup, reused until the interpreter or site-packages change
+    CAPABILITY_MANIFEST = os.environ.get('CAPABILITY_MANIFEST', os.path.join(tempfile.gettempdir(), 'dazzlodocs-capabilities.json'))
+    
+    # Worker warm-up (enabled with WARMUP_ENABLED=true, read by gunicorn.conf.py's post_fork)
+    WARMUP_ENGINES = os.environ.get('WARMUP_ENGINES', 'pillow,reportlab,pymupdf,default')  # add libreoffice to pre-start soffice
     
     # Cleanup settings
     CLEANUP_INTERVAL = int(os.environ.get('CLEANUP_INTERVAL', 3600))  # 1 hour
     FILE_RETENTION_HOURS = int(os.environ.get('FILE_RETENTION_HOURS', 24))  # 24 hours
+    CLEANUP_INDEX_PATH = os.environ.get('CLEANUP_INDEX_PATH', os.path.join(UPLOAD_FOLDER, '.index', 'expiry.sqlite3'))
+    CLEANUP_SWEEP_HOURS = int(os.environ.get('CLEANUP_SWEEP_HOURS', 24))  # full directory sweep for unindexed files; 0 disables
     
     # Logging
     LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
-    LOG_FILE = 'app.log' 
\ No newline at end of file
+    LOG_FILE = os.environ.get('LOG_FILE', 'app.log')  # empty for stderr only
+    LOG_FORMAT = os.environ.get('LOG_FORMAT', 'json')  # json or text
+    LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', 10000))  # records beyond this are dropped, never waited for
+    LOG_DEBUG_SAMPLE_RATE = int(os.environ.get('LOG_DEBUG_SAMPLE_RATE', 10))  # keep 1 in N debug records per call site
\ No newline at end of file
@@ -2,6 +2,7 @@
 # Production WSGI server configuration
 
 import os
+import tempfile
 
 # Server socket
 bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
@@ -41,4 +42,29 @@ limit_request_field_size = 8190
 
 # SSL (uncomment if using HTTPS)
 # keyfile = "path/to/keyfile"
-# certfile = "path/to/certfile" 
\ No newline at end of file
+# certfile = "path/to/certfile" 
+
+# Warm-up (opt-in): each new worker runs a tiny conversion through every
+# engine in WARMUP_ENGINES before it accepts requests, so the first real job
+# after a max_requests recycle does not pay for fonts, plugins and pool starts.
+# Warmed workers are counted in a file per master for the /ready probe.
+def warmup_state_path(server):
+    return os.path.join(tempfile.gettempdir(), f"dazzlodocs-warmup-{server.pid}")
+
+def clear_warmup_state(server):
+    try:
+        os.remove(warmup_state_path(server))
+    except OSError:
+        pass
+
+when_ready = clear_warmup_state  # runs in the master before the first worker forks
+on_exit = clear_warmup_state
+
+def post_fork(server, worker):
+    if os.environ.get('WARMUP_ENABLED', 'False').lower() != 'true':
+        return
+    from app import converter
+    from utils.warmup import state, warm_up
+    state.track(warmup_state_path(server), server.cfg.workers)
+    timings = warm_up(converter)
+    server.log.info("Worker %s warm (%s)", worker.pid, ", ".join(f"{k} {v:.0f} ms" for k, v in timings.items()))
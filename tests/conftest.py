@@ -0,0 +1,28 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Config reads the environment at import time: point every folder at a scratch area first
+SCRATCH = tempfile.mkdtemp(prefix='dazzlodocs-tests-')
+for name, sub in (('UPLOAD_FOLDER', 'uploads'), ('CONVERTED_FOLDER', 'converted'), ('SPOOL_DIR', 'spool'),
+                  ('ADMISSION_LOCK_DIR', 'admission'), ('STREAM_SCRATCH_FOLDER', 'stream')):
+    os.environ.setdefault(name, os.path.join(SCRATCH, sub))
+    os.makedirs(os.environ[name], exist_ok=True)
+os.environ.setdefault('CAPABILITY_MANIFEST', os.path.join(SCRATCH, 'capabilities.json'))
+os.environ.setdefault('LOG_FILE', '')
+
+@pytest.fixture(scope='session')
+def app_module():
+    """The Flask app module, imported once with the scratch configuration"""
+    import app
+    app.app.config['TESTING'] = True
+    return app
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
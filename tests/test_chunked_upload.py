@@ -0,0 +1,81 @@
+import hashlib
+import io
+
+import pytest
+
+from utils.chunked_upload import ChunkedUploadError, ChunkedUploadManager
+from utils.validators import FileValidator
+
+DATA = b'name,value\n' + b''.join(b'row%d,%d\n' % (i, i) for i in range(40))
+
+@pytest.fixture
+def uploads(tmp_path):
+    return ChunkedUploadManager(str(tmp_path / 'sessions'), chunk_size=64)
+
+def put(uploads, upload_id, offset, data=None, sha256=None):
+    chunk = DATA[offset:offset + 64] if data is None else data
+    return uploads.write_chunk(upload_id, offset, io.BytesIO(chunk), len(chunk), sha256)
+
+def test_chunks_in_any_order_assemble_the_file(uploads, tmp_path):
+    session = uploads.create_session('data.csv', len(DATA), 'json')
+    upload_id = session['upload_id']
+    offsets = list(range(0, len(DATA), 64))
+    
+    for offset in reversed(offsets[1:]):
+        status = put(uploads, upload_id, offset)
+    assert status['missing_offsets'] == [0]
+    assert not status['complete']
+    
+    status = put(uploads, upload_id, 0, sha256=hashlib.sha256(DATA[:64]).hexdigest())
+    assert status['complete']
+    assert status['received_bytes'] == len(DATA)
+    
+    destination = tmp_path / 'data.csv'
+    uploads.complete(upload_id, str(destination), FileValidator(), hashlib.sha256(DATA).hexdigest())
+    assert destination.read_bytes() == DATA
+
+@pytest.mark.parametrize('offset, data', [(10, None), (64, b'short'), (len(DATA) + 64, b'x')])
+def test_bad_offsets_and_lengths_are_rejected(uploads, offset, data):
+    upload_id = uploads.create_session('data.csv', len(DATA), 'json')['upload_id']
+    with pytest.raises(ChunkedUploadError) as excinfo:
+        put(uploads, upload_id, offset, data)
+    assert excinfo.value.status == 400
+
+def test_chunk_checksum_mismatch(uploads):
+    upload_id = uploads.create_session('data.csv', len(DATA), 'json')['upload_id']
+    with pytest.raises(ChunkedUploadError) as excinfo:
+        put(uploads, upload_id, 0, sha256='0' * 64)
+    assert excinfo.value.status == 422
+    assert uploads.status(upload_id)['received_chunks'] == []
+
+def test_incomplete_and_corrupt_uploads_do_not_complete(uploads, tmp_path):
+    upload_id = uploads.create_session('data.csv', len(DATA), 'json')['upload_id']
+    put(uploads, upload_id, 0)
+    with pytest.raises(ChunkedUploadError) as excinfo:
+        uploads.complete(upload_id, str(tmp_path / 'out.csv'), FileValidator())
+    assert excinfo.value.status == 409
+    
+    for offset in range(64, len(DATA), 64):
+        put(uploads, upload_id, offset)
+    with pytest.raises(ChunkedUploadError) as excinfo:
+        uploads.complete(upload_id, str(tmp_path / 'out.csv'), FileValidator(), '0' * 64)
+    assert excinfo.value.status == 422
+    assert not (tmp_path / 'out.csv').exists()
+
+def test_chunked_upload_api(client, app_module, monkeypatch):
+    monkeypatch.setattr(app_module.chunked_uploads, 'chunk_size', 64)
+    response = client.post('/api/uploads', json={'filename': 'data.csv', 'size': len(DATA), 'target_format': 'json'})
+    assert response.status_code == 201
+    created = response.get_json()
+    
+    for offset in range(0, len(DATA), 64):
+        chunk = DATA[offset:offset + 64]
+        response = client.put(f"{created['upload_url']}?offset={offset}", data=chunk,
+                              headers={'X-Chunk-SHA256': hashlib.sha256(chunk).hexdigest()})
+        assert response.status_code == 200
+    assert client.get(created['upload_url']).get_json()['complete']
+    
+    response = client.post(f"{created['upload_url']}/complete", json={'sha256': hashlib.sha256(DATA).hexdigest()})
+    assert response.status_code == 200
+    assert response.get_json()['target_format'] == 'json'
+    assert client.get(created['upload_url']).status_code == 404
@@ -0,0 +1,39 @@
+import gzip
+import io
+
+import pytest
+
+TEXT = ''.join(f'Line {i}: the quick brown fox jumps over the lazy dog.\n' for i in range(200))
+
+def upload_text(client, text: str) -> str:
+    response = client.post('/api/upload', data={'file': (io.BytesIO(text.encode()), 'notes.txt'),
+                                                'target_format': 'txt'},
+                           content_type='multipart/form-data')
+    assert response.status_code == 200
+    return response.get_json()['download_url']
+
+@pytest.fixture
+def download_url(client):
+    return upload_text(client, TEXT)
+
+def test_gzip_download(client, download_url):
+    plain_etag = client.get(download_url).headers['ETag']
+    
+    response = client.get(download_url, headers={'Accept-Encoding': 'gzip'})
+    
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert response.headers['ETag'] != plain_etag
+    assert gzip.decompress(response.data) == TEXT.encode()
+
+def test_small_outputs_are_sent_as_is(client):
+    download_url = upload_text(client, 'tiny\n')
+    response = client.get(download_url, headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+    assert response.data == b'tiny\n'
+
+def test_identity_only_client(client, download_url):
+    response = client.get(download_url, headers={'Accept-Encoding': 'identity'})
+    assert 'Content-Encoding' not in response.headers
+    assert response.data == TEXT.encode()
@@ -0,0 +1,57 @@
+import pytest
+
+from utils.converter import FileConverter, conversion_step
+
+class Steps:
+    @conversion_step('Broken step')
+    def broken(self):
+        raise ValueError('bad input')
+    
+    @conversion_step('Greedy step')
+    def greedy(self):
+        raise MemoryError()
+
+def test_failed_step_returns_false():
+    assert Steps().broken() is False
+
+def test_memory_error_is_not_swallowed():
+    with pytest.raises(MemoryError):
+        Steps().greedy()
+
+def test_every_conversion_helper_is_wrapped():
+    for name in dir(FileConverter):
+        if name.startswith('_convert_'):
+            assert hasattr(getattr(FileConverter, name), '__wrapped__'), name
+
+@pytest.fixture
+def converter():
+    converter = FileConverter()
+    converter.libreoffice_available = False
+    return converter
+
+def test_binary_documents_are_not_copied_as_text(converter, tmp_path):
+    source = tmp_path / 'report.doc'
+    source.write_bytes(b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1' + b'\x00' * 512)
+    
+    result = converter.convert_file(str(source), str(tmp_path / 'report.txt'), 'txt')
+    
+    assert result['success'] is False
+    assert not (tmp_path / 'report.txt').exists()
+
+def test_rtf_markup_is_not_passed_off_as_text(converter, tmp_path):
+    source = tmp_path / 'letter.rtf'
+    source.write_text('{\\rtf1\\ansi Hello\\par}')
+    assert converter.convert_file(str(source), str(tmp_path / 'letter.txt'), 'txt')['success'] is False
+
+def test_html_is_extracted_not_copied(converter, tmp_path):
+    source = tmp_path / 'page.html'
+    source.write_text('<html><body><p>Hello <b>there</b></p></body></html>')
+    
+    assert converter._extract_text_to_file(str(source), str(tmp_path / 'page.txt'))
+    assert (tmp_path / 'page.txt').read_text() == 'Hello there\n\n'
+
+def test_code_is_passed_through(converter, tmp_path):
+    source = tmp_path / 'script.py'
+    source.write_bytes(b'print("\xff")\n')
+    assert converter._extract_text_to_file(str(source), str(tmp_path / 'script.txt'))
+    assert (tmp_path / 'script.txt').read_bytes() == b'print("\xff")\n'
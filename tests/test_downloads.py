@@ -0,0 +1,36 @@
+import io
+
+import pytest
+
+TEXT = ''.join(f'Line {i}: the quick brown fox jumps over the lazy dog.\n' for i in range(200))
+
+@pytest.fixture
+def download_url(client):
+    response = client.post('/api/upload', data={'file': (io.BytesIO(TEXT.encode()), 'notes.txt'),
+                                                'target_format': 'txt'},
+                           content_type='multipart/form-data')
+    assert response.status_code == 200
+    return response.get_json()['download_url']
+
+def test_full_download_has_a_content_etag(client, download_url):
+    response = client.get(download_url)
+    assert response.status_code == 200
+    assert response.data == TEXT.encode()
+    assert response.headers['ETag']
+    assert 'private' in response.headers['Cache-Control']
+
+def test_if_none_match_is_a_304(client, download_url):
+    etag = client.get(download_url).headers['ETag']
+    response = client.get(download_url, headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+
+def test_range_request(client, download_url):
+    response = client.get(download_url, headers={'Range': 'bytes=5-14', 'Accept-Encoding': 'gzip'})
+    assert response.status_code == 206
+    assert response.data == TEXT.encode()[5:15]
+    assert response.headers['Content-Range'] == f'bytes 5-14/{len(TEXT)}'
+    assert 'Content-Encoding' not in response.headers
+
+def test_missing_file(client):
+    assert client.get('/download/nothing-here.txt').status_code == 404
@@ -0,0 +1,46 @@
+import time
+
+from utils.cleanup import CleanupManager
+from utils.expiry_index import ExpiryIndex
+
+def test_due_returns_expired_paths_oldest_first(tmp_path):
+    index = ExpiryIndex(str(tmp_path / 'expiry.sqlite3'))
+    now = time.time()
+    index.schedule(str(tmp_path / 'b'), now - 10)
+    index.schedule(str(tmp_path / 'a'), now - 20)
+    index.schedule(str(tmp_path / 'later'), now + 3600)
+    
+    assert index.due(now) == [str(tmp_path / 'a'), str(tmp_path / 'b')]
+    assert index.count() == 3
+
+def test_reschedule_cancel_and_rename(tmp_path):
+    index = ExpiryIndex(str(tmp_path / 'expiry.sqlite3'))
+    now = time.time()
+    index.schedule(str(tmp_path / 'a'), now - 10)
+    index.schedule(str(tmp_path / 'a'), now + 3600)
+    assert index.due(now) == []
+    assert index.count() == 1
+    
+    index.rename(str(tmp_path / 'a'), str(tmp_path / 'b'))
+    assert index.due(now + 7200) == [str(tmp_path / 'b')]
+    
+    index.cancel(str(tmp_path / 'b'))
+    assert index.count() == 0
+
+def test_cleanup_deletes_due_files_and_their_sidecars(tmp_path, app_module):
+    manager = CleanupManager()
+    manager.index = ExpiryIndex(str(tmp_path / 'expiry.sqlite3'))
+    expired = tmp_path / 'old.txt'
+    expired.write_text('old')
+    (tmp_path / 'old.txt.gz').write_bytes(b'gz')
+    kept = tmp_path / 'new.txt'
+    kept.write_text('new')
+    manager.schedule_cleanup(str(expired), retention_seconds=-1)
+    manager.schedule_cleanup(str(kept), retention_seconds=3600)
+    
+    assert manager._delete_due_files() == 1
+    
+    assert not expired.exists()
+    assert not (tmp_path / 'old.txt.gz').exists()
+    assert kept.exists()
+    assert manager.index.due() == []
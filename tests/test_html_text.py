@@ -0,0 +1,52 @@
+import io
+
+import pytest
+
+from utils.html_text import HtmlTextExtractor, extract_html_text
+
+DOCUMENTS = {
+    'paragraphs': '<html><head><title>T</title></head><body><h1>Head</h1><p>One <b>two</b>\nthree</p></body></html>',
+    'comment': 'a<!-- <p>hidden</p> -->b<p>after</p>',
+    'conditional_comment': '<p>Before</p><!--[if lt IE 9]><p>Upgrade your browser</p><![endif]--><p>After</p>',
+    'cdata': '<p>x<![CDATA[ <p>not text</p> ]]>y</p>',
+    'doctype': '<!DOCTYPE html><?xml-stylesheet href="a"?><p>Body</p>',
+    'entities': '<p>Fish &amp; chips &lt;3 &#8364;5 &eacute;t&eacute; &nbsp;done</p>',
+    'script': '<p>Shown</p><script>if (a < b) { x = "</p>"; }</script ><style>p{}</style><p>Also</p>',
+    'table': '<table><tr><th>A</th><th>B</th></tr><tr><td>1</td><td>2</td></tr></table>',
+    'pre': '<pre>  line 1\n    line 2\n</pre><ul><li>x</li><li>y</li></ul>',
+}
+
+def extract(html: str, chunk_size: int) -> str:
+    out = io.StringIO()
+    parser = HtmlTextExtractor(out)
+    for start in range(0, len(html), chunk_size):
+        parser.feed(html[start:start + chunk_size])
+    parser.close()
+    return out.getvalue()
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 7])
+@pytest.mark.parametrize('name', sorted(DOCUMENTS))
+def test_chunked_output_matches_whole_document(name, chunk_size):
+    html = DOCUMENTS[name]
+    assert extract(html, chunk_size) == extract(html, len(html))
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 7, 1024])
+def test_comment_content_is_never_text(chunk_size):
+    assert extract('a<!-- <p>hidden</p> -->b', chunk_size) == 'ab\n'
+    text = extract(DOCUMENTS['conditional_comment'], chunk_size)
+    assert 'Upgrade' not in text
+    assert text == 'Before\n\nAfter\n\n'
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 7, 1024])
+def test_entities_and_script(chunk_size):
+    assert extract(DOCUMENTS['entities'], chunk_size) == 'Fish & chips <3 €5 été done\n\n'
+    assert extract(DOCUMENTS['script'], chunk_size) == 'Shown\n\nAlso\n\n'
+
+def test_extract_html_text_from_file(tmp_path):
+    source = tmp_path / 'page.html'
+    source.write_text(DOCUMENTS['paragraphs'] * 50, encoding='utf-8')
+    target = tmp_path / 'page.txt'
+    
+    extract_html_text(str(source), str(target), chunk_size=5)
+    
+    assert target.read_text(encoding='utf-8') == extract(DOCUMENTS['paragraphs'] * 50, 1 << 20)
@@ -0,0 +1,33 @@
+import io
+
+from utils.validators import SNIFF_BYTES
+
+PNG_HEADER = b'\x89PNG\r\n\x1a\n'
+
+def upload(client, data: bytes, filename: str, target_format: str):
+    return client.post('/api/upload', data={'file': (io.BytesIO(data), filename), 'target_format': target_format},
+                       content_type='multipart/form-data')
+
+def test_content_that_does_not_match_the_extension_is_rejected(client, app_module):
+    before = set(app_module.os.listdir(app_module.Config.UPLOAD_FOLDER))
+    
+    response = upload(client, b'MZ' + b'\x00' * SNIFF_BYTES * 4, 'photo.png', 'gif')
+    
+    assert response.status_code == 415
+    # The partial upload is not left behind
+    assert set(app_module.os.listdir(app_module.Config.UPLOAD_FOLDER)) <= before
+
+def test_upload_shorter_than_the_sniff_window_is_checked(client):
+    response = upload(client, b'GIF89a' + b'\x00' * 16, 'photo.png', 'gif')
+    assert response.status_code == 415
+
+def test_matching_content_is_converted(client):
+    from PIL import Image
+    image = io.BytesIO()
+    Image.new('RGB', (32, 32), color='red').save(image, format='PNG')
+    assert image.getvalue().startswith(PNG_HEADER)
+    
+    response = upload(client, image.getvalue(), 'photo.png', 'gif')
+    
+    assert response.status_code == 200
+    assert response.get_json()['success'] is True
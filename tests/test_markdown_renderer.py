@@ -0,0 +1,33 @@
+import pytest
+
+from utils.markdown_renderer import is_safe_url, render_inline
+
+@pytest.mark.parametrize('url', [
+    'javascript:alert(1)', 'JaVaScRiPt:alert(1)', ' javascript:alert(1)', 'java&#x09;script:alert(1)',
+    'data:text/html,x', 'vbscript:msgbox', 'file:///etc/passwd',
+])
+def test_unsafe_urls(url):
+    assert not is_safe_url(url)
+
+@pytest.mark.parametrize('url', [
+    'https://example.com/a?b=1&amp;c=2', 'http://example.com', 'mailto:someone@example.com',
+    'docs/page.md', '/absolute/path', '#section', '../up', 'page.html?next=javascript:x',
+])
+def test_safe_urls(url):
+    assert is_safe_url(url)
+
+@pytest.mark.parametrize('mode', ['html', 'pdf'])
+def test_unsafe_links_and_images_render_as_text(mode):
+    assert render_inline('[click](javascript:alert)', mode) == 'click'
+    assert render_inline('![logo](data:image/png;base64,AAAA)', mode) == 'logo'
+    assert 'href' not in render_inline('[x](vbscript:run)', mode)
+
+def test_safe_links_are_kept():
+    assert render_inline('[docs](https://example.com/docs)') == '<a href="https://example.com/docs">docs</a>'
+    assert render_inline('[next](chapter2.md)') == '<a href="chapter2.md">next</a>'
+    assert render_inline('![logo](img/logo.png)') == '<img src="img/logo.png" alt="logo">'
+    assert render_inline('<mailto:someone@example.com>') == \
+        '<a href="mailto:someone@example.com">mailto:someone@example.com</a>'
+
+def test_text_mode_keeps_link_text():
+    assert render_inline('[click](javascript:alert)', 'text') == 'click'
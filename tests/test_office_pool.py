@@ -0,0 +1,43 @@
+import subprocess
+import threading
+import time
+
+from utils.office_pool import OfficeInstance
+
+class HungDesktop:
+    """UNO desktop of an instance that never answers"""
+    
+    def __init__(self):
+        self.called = threading.Event()
+    
+    def terminate(self):
+        self.called.set()
+        time.sleep(3600)
+
+def test_kill_does_not_talk_to_a_hung_instance(tmp_path):
+    instance = OfficeInstance(0, 'soffice', str(tmp_path))
+    instance.process = subprocess.Popen(['sh', '-c', 'sleep 60 & sleep 60'], start_new_session=True)
+    instance.desktop = desktop = HungDesktop()
+    (tmp_path / 'profile').mkdir()
+    instance.profile_dir = str(tmp_path / 'profile')
+    
+    started = time.monotonic()
+    instance.kill()
+    
+    assert time.monotonic() - started < 5
+    assert not desktop.called.is_set()
+    assert instance.process is None
+    assert not (tmp_path / 'profile').exists()
+
+def test_timed_out_job_kills_the_instance(tmp_path, monkeypatch):
+    instance = OfficeInstance(0, 'soffice', str(tmp_path))
+    instance.process = subprocess.Popen(['sleep', '60'], start_new_session=True)
+    instance.desktop = HungDesktop()
+    monkeypatch.setattr(instance, '_export', lambda *args: time.sleep(3600))
+    
+    started = time.monotonic()
+    assert instance.convert('in.doc', 'out.pdf', 'writer_pdf_Export', timeout=0.2) is False
+    
+    assert time.monotonic() - started < 5
+    assert instance.broken
+    assert instance.process is None
@@ -0,0 +1,112 @@
+import io
+import os
+import time
+import zlib
+import struct
+
+import pytest
+
+from utils.converter import FileConverter
+from utils.render_cache import RenderCache
+from utils.sandbox import ConversionSandbox, resource
+
+pytestmark = pytest.mark.skipif(resource is None or not hasattr(os, 'fork'), reason='needs fork and rlimits')
+
+class ScriptedConverter:
+    """Stands in for FileConverter: runs a plain function as the conversion"""
+    
+    def __init__(self, job):
+        self.job = job
+        self.render_cache = RenderCache()
+    
+    def convert_file(self, input_path, output_path, target_format, options=None):
+        self.job(output_path)
+        return {'success': True, 'output_path': output_path}
+
+def blank_png(width: int, height: int) -> bytes:
+    """A white RGB PNG built row by row, so this process never holds the decoded image"""
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+    
+    compressor = zlib.compressobj(9)
+    row = b'\x00' + b'\xff' * (width * 3)
+    pixels = b''.join(compressor.compress(row) for _ in range(height)) + compressor.flush()
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)) +
+            chunk(b'IDAT', pixels) + chunk(b'IEND', b''))
+
+def address_space() -> int:
+    """Current virtual memory size of this process in bytes"""
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmSize:'):
+                return int(line.split()[1]) * 1024
+    pytest.skip('no /proc/self/status')
+
+@pytest.fixture
+def sandbox():
+    sandbox = ConversionSandbox({'default': 30.0})
+    sandbox.enabled = True
+    return sandbox
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / 'input.txt'
+    path.write_text('hello\n')
+    return str(path)
+
+def test_timeout(sandbox, source, tmp_path):
+    sandbox.timeouts = {'default': 0.5}
+    converter = ScriptedConverter(lambda output_path: time.sleep(60))
+    
+    started = time.monotonic()
+    result = sandbox.convert(converter, 'default', source, str(tmp_path / 'out.txt'), 'txt')
+    
+    assert result['error_code'] == 'timeout'
+    assert time.monotonic() - started < 10
+
+def test_cpu_limit(sandbox, source, tmp_path):
+    sandbox.max_cpu = 1
+    
+    def spin(output_path):
+        while True:
+            pass
+    
+    result = sandbox.convert(ScriptedConverter(spin), 'default', source, str(tmp_path / 'out.txt'), 'txt')
+    assert result['error_code'] == 'cpu_limit'
+
+def test_output_limit(sandbox, source, tmp_path):
+    sandbox.max_output = 64 * 1024
+    output_path = tmp_path / 'out.txt'
+    
+    def write_too_much(output_path):
+        with open(output_path, 'wb') as f:
+            for _ in range(64):
+                f.write(b'x' * 4096)
+    
+    result = sandbox.convert(ScriptedConverter(write_too_much), 'default', source, str(output_path), 'txt')
+    assert result['error_code'] == 'output_limit'
+    assert not output_path.exists()
+
+def test_memory_limit_reaches_the_sandbox(sandbox, tmp_path):
+    # Compresses to a few hundred KB, decodes to ~100 MB
+    source = tmp_path / 'huge.png'
+    source.write_bytes(blank_png(6000, 6000))
+    converter = FileConverter()
+    # Whatever the worker has mapped already, plus far less than the decoded image
+    sandbox.max_memory = address_space() + 32 * 1024 * 1024
+    
+    result = sandbox.convert(converter, 'pillow', str(source), str(tmp_path / 'out.gif'), 'gif')
+    
+    assert result['success'] is False
+    assert result['error_code'] == 'memory_limit'
+
+def test_memory_limit_is_a_422(app_module, client, monkeypatch):
+    image = io.BytesIO(blank_png(6000, 6000))
+    monkeypatch.setattr(app_module.sandbox, 'enabled', True)
+    monkeypatch.setattr(app_module.sandbox, 'max_memory', address_space() + 32 * 1024 * 1024)
+    
+    response = client.post('/api/upload', data={'file': (image, 'huge.png'), 'target_format': 'gif'},
+                           content_type='multipart/form-data')
+    
+    assert response.status_code == 422
+    assert response.get_json()['error_code'] == 'memory_limit'
@@ -0,0 +1,40 @@
+import os
+
+from utils.scheduler import LaneMetrics
+
+def snapshot_files(directory) -> list:
+    return [name for name in os.listdir(directory) if name.startswith('lane-metrics.')]
+
+def test_snapshot_is_written_every_n_jobs(tmp_path):
+    metrics = LaneMetrics(str(tmp_path), flush_jobs=10, flush_seconds=3600)
+    for _ in range(9):
+        metrics.record('fast', 0.001, 0.01)
+    assert snapshot_files(tmp_path) == []
+    
+    metrics.record('fast', 0.001, 0.01)
+    assert snapshot_files(tmp_path) == [f'lane-metrics.{os.getpid()}.json']
+
+def test_snapshot_is_written_when_old(tmp_path):
+    metrics = LaneMetrics(str(tmp_path), flush_jobs=1000, flush_seconds=0)
+    metrics.record('bulk', rejected=True)
+    assert len(snapshot_files(tmp_path)) == 1
+
+def test_merged_includes_unflushed_samples(tmp_path):
+    metrics = LaneMetrics(str(tmp_path), flush_jobs=1000, flush_seconds=3600)
+    metrics.record('fast', 0.002, 0.02)
+    metrics.record('bulk', rejected=True)
+    
+    merged = metrics.merged()
+    
+    assert merged['workers'] == 1
+    assert merged['lanes']['fast']['jobs'] == 1
+    assert merged['lanes']['fast']['latency_ms']['p50'] == 20.0
+    assert merged['lanes']['bulk']['rejected'] == 1
+
+def test_flush_writes_only_new_samples(tmp_path):
+    metrics = LaneMetrics(str(tmp_path), flush_jobs=1000, flush_seconds=3600)
+    metrics.flush()
+    assert snapshot_files(tmp_path) == []
+    metrics.record('fast', 0.001, 0.01)
+    metrics.flush()
+    assert len(snapshot_files(tmp_path)) == 1
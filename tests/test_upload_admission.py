@@ -0,0 +1,81 @@
+import io
+
+import pytest
+
+from config import Config
+
+BOUNDARY = 'test-boundary'
+
+class CountingStream(io.BytesIO):
+    """Request body that remembers how many bytes the server read"""
+    
+    def __init__(self, data: bytes):
+        super().__init__(data)
+        self.consumed = 0
+    
+    def read(self, size=-1):
+        data = super().read(size)
+        self.consumed += len(data)
+        return data
+    
+    def readline(self, size=-1):
+        data = super().readline(size)
+        self.consumed += len(data)
+        return data
+
+def multipart(filename: str, content: bytes, target_format: str, format_first: bool) -> bytes:
+    format_part = (f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="target_format"\r\n\r\n'
+                   f'{target_format}\r\n').encode()
+    file_part = (f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+                 f'Content-Type: application/octet-stream\r\n\r\n').encode() + content + b'\r\n'
+    parts = format_part + file_part if format_first else file_part + format_part
+    return parts + f'--{BOUNDARY}--\r\n'.encode()
+
+def post(client, body: bytes, headers: dict = None):
+    stream = CountingStream(body)
+    response = client.post('/api/upload', input_stream=stream,
+                           content_type=f'multipart/form-data; boundary={BOUNDARY}',
+                           headers={'Content-Length': str(len(body)), **(headers or {})})
+    return response, stream
+
+@pytest.fixture
+def small_limits(app_module, monkeypatch):
+    """Every format limited to 4 KB except spreadsheets, so the header check is not skipped"""
+    limits = {category: 4 * 1024 for category in app_module.validator.MAX_FILE_SIZES}
+    limits['spreadsheets'] = 1024 * 1024
+    monkeypatch.setattr(app_module.validator, 'MAX_FILE_SIZES', limits)
+    monkeypatch.setattr(Config, 'UPLOAD_FORM_OVERHEAD', 1024)
+    return limits
+
+@pytest.mark.parametrize('format_first', [False, True])
+def test_oversized_upload_is_rejected_from_the_headers(client, small_limits, format_first):
+    content = b'x' * (256 * 1024)
+    body = multipart('notes.txt', content, 'html', format_first)
+    
+    response, stream = post(client, body)
+    
+    assert response.status_code == 413
+    assert response.headers['Connection'] == 'close'
+    assert response.get_json()['error'] == 'File too large'
+    # Only the peek window was read to find the filename; the rest of the body never was
+    assert stream.consumed <= Config.UPLOAD_PEEK_BYTES
+
+def test_declared_name_needs_no_peek(client, small_limits):
+    body = multipart('notes.txt', b'x' * (64 * 1024), 'html', True)
+    
+    response, stream = post(client, body, {'X-File-Name': 'notes.txt'})
+    
+    assert response.status_code == 413
+    assert response.headers['Connection'] == 'close'
+    assert stream.consumed == 0
+
+@pytest.mark.parametrize('format_first', [False, True])
+def test_peeked_head_is_replayed_for_admitted_uploads(client, small_limits, format_first):
+    # Larger than the peek window, so the form parser reads across the replayed head
+    content = b'name,value\n' + b''.join(b'row%d,%d\n' % (i, i) for i in range(4000))
+    assert len(content) > Config.UPLOAD_PEEK_BYTES
+    
+    response, stream = post(client, multipart('data.csv', content, 'json', format_first))
+    
+    assert response.status_code == 200
+    assert response.get_json()['file_size'] == len(content)
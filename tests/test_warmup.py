@@ -0,0 +1,29 @@
+from utils.warmup import WarmupState
+
+def test_ready_without_tracking():
+    assert WarmupState().snapshot()['ready'] is True
+
+def test_host_is_ready_once_every_worker_warmed(tmp_path):
+    path = str(tmp_path / 'warmup')
+    workers = [WarmupState() for _ in range(3)]
+    for state in workers:
+        state.track(path, 3)
+    
+    workers[0].finish({'default': 1.0})
+    workers[1].finish({'default': 1.0})
+    assert workers[0].snapshot()['ready'] is False
+    assert workers[0].snapshot()['workers_warmed'] == 2
+    
+    workers[2].finish({'default': 1.0})
+    assert all(state.snapshot()['ready'] for state in workers)
+
+def test_ready_endpoint(client, app_module, monkeypatch, tmp_path):
+    state = WarmupState()
+    state.track(str(tmp_path / 'warmup'), 1)
+    monkeypatch.setattr(app_module, 'warmup_state', state)
+    assert client.get('/ready').status_code == 503
+    
+    state.finish({'pillow': 3.0})
+    response = client.get('/ready')
+    assert response.status_code == 200
+    assert response.get_json()['warmup_ms'] == {'pillow': 3.0}
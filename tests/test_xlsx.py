@@ -0,0 +1,74 @@
+import zipfile
+
+import pytest
+
+from utils.converter import FileConverter
+
+MAIN_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+
+def sheet_xml(rows: list) -> str:
+    cells = ''.join(
+        f'<row r="{r}">' + ''.join(f'<c r="{chr(65 + c)}{r}" t="inlineStr"><is><t>{value}</t></is></c>'
+                                   for c, value in enumerate(row)) + '</row>'
+        for r, row in enumerate(rows, start=1)
+    )
+    return f'<worksheet xmlns="{MAIN_NS}"><sheetData>{cells}</sheetData></worksheet>'
+
+def write_workbook(path, sheets: dict):
+    """Minimal XLSX with inline strings, one part per sheet"""
+    with zipfile.ZipFile(path, 'w') as archive:
+        entries = ''.join(f'<sheet name="{name}" sheetId="{i}" r:id="rId{i}"/>'
+                          for i, name in enumerate(sheets, start=1))
+        archive.writestr('xl/workbook.xml', f'<workbook xmlns="{MAIN_NS}" xmlns:r="{REL_NS}"><sheets>{entries}</sheets></workbook>')
+        rels = ''.join(f'<Relationship Id="rId{i}" Type="{REL_NS}/worksheet" Target="worksheets/sheet{i}.xml"/>'
+                       for i in range(1, len(sheets) + 1))
+        archive.writestr('xl/_rels/workbook.xml.rels',
+                         f'<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">{rels}</Relationships>')
+        for i, rows in enumerate(sheets.values(), start=1):
+            archive.writestr(f'xl/worksheets/sheet{i}.xml', sheet_xml(rows))
+
+@pytest.fixture
+def workbook(tmp_path):
+    path = tmp_path / 'book.xlsx'
+    write_workbook(path, {'Summary': [['Label', 'Value'], ['Total', '10']], 'Details': [['Item', 'Qty'], ['Apples', '4']]})
+    return path
+
+@pytest.fixture
+def converter():
+    converter = FileConverter()
+    converter.libreoffice_available = False
+    return converter
+
+def pdf_text(path) -> str:
+    import fitz
+    with fitz.open(str(path)) as document:
+        return ''.join(page.get_text() for page in document)
+
+def test_csv_export_of_a_chosen_sheet(converter, workbook, tmp_path):
+    output = tmp_path / 'book.csv'
+    assert converter.convert_file(str(workbook), str(output), 'csv', {'sheet': 'Details'})['success']
+    assert output.read_text().splitlines() == ['Item,Qty', 'Apples,4']
+
+@pytest.mark.parametrize('sheet, expected, absent', [
+    ('', 'Total', 'Apples'),
+    ('Details', 'Apples', 'Total'),
+    ('2', 'Apples', 'Total'),
+])
+def test_pdf_renders_the_chosen_sheet(converter, workbook, tmp_path, sheet, expected, absent):
+    pytest.importorskip('reportlab')
+    pytest.importorskip('fitz')
+    output = tmp_path / 'book.pdf'
+    
+    assert converter.convert_file(str(workbook), str(output), 'pdf', {'sheet': sheet})['success']
+    
+    text = pdf_text(output)
+    assert expected in text
+    assert absent not in text
+
+def test_pdf_of_an_unknown_sheet_fails(converter, workbook, tmp_path):
+    pytest.importorskip('reportlab')
+    output = tmp_path / 'book.pdf'
+    result = converter.convert_file(str(workbook), str(output), 'pdf', {'sheet': 'Missing'})
+    assert result['success'] is False
+    assert not output.exists()
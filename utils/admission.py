@@ -0,0 +1,117 @@
+import os
+import time
+import fcntl
+import random
+import logging
+import threading
+from contextlib import contextmanager
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+def parse_limits(spec: str) -> dict:
+    """Parse 'engine=slots:queue,...' into {engine: (slots, queue)}"""
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        engine, _, values = item.partition('=')
+        slots, _, queue = values.partition(':')
+        limits[engine.strip()] = (max(1, int(slots)), max(0, int(queue or 0)))
+    limits.setdefault('default', (16, 64))
+    return limits
+
+class AdmissionRejected(Exception):
+    """The engine's slots and queue are full; the client should retry later"""
+    
+    def __init__(self, engine: str, retry_after: int, reason: str):
+        super().__init__(f'{engine} busy: {reason}')
+        self.engine = engine
+        self.retry_after = retry_after
+        self.reason = reason
+
+class AdmissionController:
+    """Bounded per-engine concurrency shared by every worker on the host
+
+    Each engine has N slot lock files and M queue lock files. A job runs
+    while it holds an flock on a slot; a job that finds no free slot must
+    first hold a queue file while it waits, and is rejected outright when
+    those are taken too. The kernel drops the locks of a crashed worker.
+    """
+    
+    def __init__(self, lock_dir: str = None, limits: dict = None, wait_seconds: float = None):
+        self.lock_dir = lock_dir or Config.ADMISSION_LOCK_DIR
+        self.limits = limits or parse_limits(Config.ADMISSION_LIMITS)
+        self.wait_seconds = Config.ADMISSION_WAIT_SECONDS if wait_seconds is None else wait_seconds
+        self.enabled = Config.ADMISSION_ENABLED
+        self._durations = {}
+        self._lock = threading.Lock()
+        os.makedirs(self.lock_dir, exist_ok=True)
+    
+    def limits_for(self, engine: str) -> tuple:
+        return self.limits.get(engine) or self.limits['default']
+    
+    def _try_any(self, engine: str, kind: str, count: int):
+        """flock one free file of this kind, or return None"""
+        indexes = list(range(count))
+        random.shuffle(indexes)  # spread contention across the files
+        for index in indexes:
+            lock_file = open(os.path.join(self.lock_dir, f'{engine}.{kind}{index}.lock'), 'a')
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return lock_file
+            except OSError:
+                lock_file.close()
+        return None
+    
+    @staticmethod
+    def _release(lock_file):
+        if lock_file is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
+    
+    def retry_after(self, engine: str) -> int:
+        """Seconds until a slot is likely free, from recent job durations"""
+        with self._lock:
+            duration = self._durations.get(engine, 1.0)
+        return max(1, min(60, int(duration + 0.999)))
+    
+    def _record(self, engine: str, seconds: float):
+        with self._lock:
+            previous = self._durations.get(engine)
+            self._durations[engine] = seconds if previous is None else previous * 0.8 + seconds * 0.2
+    
+    @contextmanager
+    def slot(self, engine: str, reserve: int = 0):
+        """Run the body in one of the engine's slots, queueing briefly or raising AdmissionRejected
+        
+        reserve keeps that many slots out of reach of this caller (never all of them).
+        """
+        if not self.enabled:
+            yield
+            return
+        
+        slots, queue = self.limits_for(engine)
+        slots = max(1, slots - reserve)
+        held = self._try_any(engine, 'slot', slots)
+        if held is None:
+            ticket = self._try_any(engine, 'queue', queue)
+            if ticket is None:
+                logger.warning(f"Admission rejected for {engine}: {slots} running, {queue} queued")
+                raise AdmissionRejected(engine, self.retry_after(engine), 'queue full')
+            try:
+                deadline = time.monotonic() + self.wait_seconds
+                delay = 0.01
+                while held is None:
+                    if time.monotonic() >= deadline:
+                        raise AdmissionRejected(engine, self.retry_after(engine), 'timed out waiting for a slot')
+                    time.sleep(delay)
+                    delay = min(delay * 2, 0.1)
+                    held = self._try_any(engine, 'slot', slots)
+            finally:
+                self._release(ticket)
+        
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._release(held)
+            self._record(engine, time.monotonic() - started)
@@ -0,0 +1,89 @@
+import os
+import sys
+import json
+import logging
+import importlib
+from functools import lru_cache
+from importlib.util import find_spec
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Optional engine -> top-level module whose presence means it can be used
+OPTIONAL_MODULES = {
+    'pil': 'PIL',
+    'pymupdf': 'fitz',
+    'reportlab': 'reportlab',
+    'docx': 'docx',
+}
+
+# Modules a conversion engine imports on first use (see FileConverter.engine_for)
+ENGINE_MODULES = {
+    'pillow': ('PIL.Image',),
+    'pymupdf': ('fitz', 'PIL.Image', 'docx'),
+    'reportlab': ('reportlab.platypus', 'reportlab.lib.styles', 'PIL.Image'),
+}
+
+# Per-engine setup run after the imports, filling caches that forked children inherit
+ENGINE_SETUP = {
+    'reportlab': ('utils.pdf_layout', 'prime_reportlab'),
+}
+
+def _fingerprint() -> list:
+    """Changes whenever the interpreter or an import path (site-packages) changes"""
+    paths = []
+    for entry in sys.path:
+        try:
+            paths.append([entry, os.stat(entry or '.').st_mtime_ns])
+        except OSError:
+            continue
+    return [sys.executable, sys.version, paths]
+
+def _probe() -> dict:
+    # find_spec locates a package without executing it
+    found = {}
+    for name, module in OPTIONAL_MODULES.items():
+        try:
+            found[name] = find_spec(module) is not None
+        except (ImportError, ValueError):
+            found[name] = False
+    return found
+
+@lru_cache(maxsize=1)
+def probe_capabilities() -> dict:
+    """Which optional engines are installed, from the startup manifest when it is still valid"""
+    manifest_path = Config.CAPABILITY_MANIFEST
+    fingerprint = _fingerprint()
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('fingerprint') == fingerprint and set(manifest.get('modules', {})) == set(OPTIONAL_MODULES):
+            return manifest['modules']
+    except (OSError, ValueError, AttributeError):
+        pass
+    
+    modules = _probe()
+    try:
+        with open(f'{manifest_path}.{os.getpid()}.tmp', 'w', encoding='utf-8') as f:
+            json.dump({'fingerprint': fingerprint, 'modules': modules}, f)
+        os.replace(f'{manifest_path}.{os.getpid()}.tmp', manifest_path)
+    except OSError as e:
+        logger.debug("Capability manifest not written: %s", e)
+    return modules
+
+@lru_cache(maxsize=None)
+def preload(engine: str) -> bool:
+    """Import an engine's modules once in this process (before forking sandboxed jobs)"""
+    loaded = True
+    for module in ENGINE_MODULES.get(engine, ()):
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            loaded = False
+    setup = ENGINE_SETUP.get(engine)
+    if loaded and setup:
+        try:
+            getattr(importlib.import_module(setup[0]), setup[1])()
+        except Exception as e:
+            logger.warning(f"Preloading {engine} error: {str(e)}")
+    return loaded
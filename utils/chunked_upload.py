@@ -0,0 +1,201 @@
+import os
+import json
+import time
+import uuid
+import fcntl
+import hashlib
+import logging
+from contextlib import contextmanager
+from pathlib import Path
+from werkzeug.utils import secure_filename
+from config import Config
+from utils.validators import SNIFF_BYTES
+
+logger = logging.getLogger(__name__)
+
+class ChunkedUploadError(Exception):
+    """Client-visible chunked upload failure with an HTTP status"""
+    
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+class ChunkedUploadManager:
+    """Resumable uploads: a JSON session plus a sparse .part file per upload
+
+    Chunks are fixed-size slices of the file; each one may arrive in any
+    order, from any worker, and is written with pwrite at its offset. Only
+    the session metadata is updated under an exclusive flock.
+    """
+    
+    def __init__(self, session_folder: str = None, chunk_size: int = None):
+        self.session_folder = session_folder or Config.CHUNKED_UPLOAD_FOLDER
+        self.chunk_size = chunk_size or Config.CHUNKED_UPLOAD_CHUNK_SIZE
+        self.session_ttl = Config.CHUNKED_UPLOAD_TTL_HOURS * 3600
+        os.makedirs(self.session_folder, exist_ok=True)
+    
+    def _paths(self, upload_id: str) -> tuple:
+        if not upload_id.isalnum():
+            raise ChunkedUploadError('Unknown upload', 404)
+        base = os.path.join(self.session_folder, upload_id)
+        return f'{base}.json', f'{base}.part', f'{base}.lock'
+    
+    @contextmanager
+    def _locked(self, upload_id: str):
+        """Hold the session lock across a read-modify-write of its metadata"""
+        _, _, lock_path = self._paths(upload_id)
+        self.get_session(upload_id)  # 404 before creating a stray lock file
+        with open(lock_path, 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield self.get_session(upload_id)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+    
+    @staticmethod
+    def _write_meta(meta_path: str, session: dict):
+        tmp_path = f'{meta_path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(session, f)
+        os.replace(tmp_path, meta_path)
+    
+    def create_session(self, filename: str, size: int, target_format: str, options: dict = None) -> dict:
+        """Reserve a sparse file of the final size and return the session"""
+        self.purge_expired()
+        
+        upload_id = uuid.uuid4().hex
+        meta_path, part_path, _ = self._paths(upload_id)
+        session = {
+            'upload_id': upload_id,
+            'filename': secure_filename(filename),
+            'size': size,
+            'chunk_size': self.chunk_size,
+            'chunk_count': max(1, -(-size // self.chunk_size)),
+            'target_format': target_format,
+            'options': options or {},
+            'created': time.time(),
+            'chunks': {},
+        }
+        with open(part_path, 'wb') as f:
+            f.truncate(size)  # sparse until the chunks land
+        self._write_meta(meta_path, session)
+        logger.info(f"Chunked upload {upload_id} created: {session['filename']} ({size} bytes)")
+        return session
+    
+    def write_chunk(self, upload_id: str, offset: int, stream, length: int, expected_sha256: str = None) -> dict:
+        """Stream one chunk from the request body into place at offset"""
+        _, part_path, _ = self._paths(upload_id)
+        session = self.get_session(upload_id)
+        
+        chunk_size = session['chunk_size']
+        if offset < 0 or offset % chunk_size or offset >= max(session['size'], 1):
+            raise ChunkedUploadError(f'Offset must be a multiple of {chunk_size} inside the file')
+        expected_length = min(chunk_size, session['size'] - offset)
+        if length != expected_length:
+            raise ChunkedUploadError(f'Chunk at offset {offset} must be {expected_length} bytes, got {length}')
+        
+        digest = hashlib.sha256()
+        written = 0
+        try:
+            fd = os.open(part_path, os.O_WRONLY)
+        except FileNotFoundError:
+            raise ChunkedUploadError('Unknown upload', 404)
+        try:
+            while written < length:
+                data = stream.read(min(Config.INGEST_CHUNK_BYTES, length - written))
+                if not data:
+                    break
+                digest.update(data)
+                os.pwrite(fd, data, offset + written)
+                written += len(data)
+        finally:
+            os.close(fd)
+        
+        if written != length:
+            raise ChunkedUploadError(f'Chunk at offset {offset} was cut short ({written} of {length} bytes)')
+        checksum = digest.hexdigest()
+        if expected_sha256 and expected_sha256.lower() != checksum:
+            raise ChunkedUploadError(f'Checksum mismatch for chunk at offset {offset}', 422)
+        
+        with self._locked(upload_id) as session:
+            session['chunks'][str(offset // chunk_size)] = checksum
+            self._write_meta(self._paths(upload_id)[0], session)
+            return self._status(session)
+    
+    def get_session(self, upload_id: str) -> dict:
+        meta_path, _, _ = self._paths(upload_id)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise ChunkedUploadError('Unknown upload', 404)
+    
+    def status(self, upload_id: str) -> dict:
+        return self._status(self.get_session(upload_id))
+    
+    def _status(self, session: dict) -> dict:
+        received = sorted(int(index) for index in session['chunks'])
+        missing = [index for index in range(session['chunk_count']) if str(index) not in session['chunks']]
+        received_bytes = sum(min(session['chunk_size'], session['size'] - index * session['chunk_size'])
+                             for index in received)
+        return {
+            'upload_id': session['upload_id'],
+            'filename': session['filename'],
+            'size': session['size'],
+            'chunk_size': session['chunk_size'],
+            'received_bytes': received_bytes,
+            'received_chunks': received,
+            'missing_offsets': [index * session['chunk_size'] for index in missing],
+            'complete': not missing,
+        }
+    
+    def complete(self, upload_id: str, destination: str, validator, expected_sha256: str = None) -> dict:
+        """Check the upload is whole and move it to destination; returns the session"""
+        _, part_path, _ = self._paths(upload_id)
+        with self._locked(upload_id) as session:
+            status = self._status(session)
+            if not status['complete']:
+                raise ChunkedUploadError(f"Upload incomplete: {len(status['missing_offsets'])} chunks missing", 409)
+            
+            extension = Path(session['filename']).suffix[1:].lower()
+            with open(part_path, 'rb') as f:
+                head = f.read(SNIFF_BYTES)
+            if not validator.check_signature(extension, head):
+                raise ChunkedUploadError(validator.signature_error(extension)['details'], 415)
+            
+            if expected_sha256:
+                digest = hashlib.sha256()
+                with open(part_path, 'rb') as f:
+                    for block in iter(lambda: f.read(1024 * 1024), b''):
+                        digest.update(block)
+                if digest.hexdigest() != expected_sha256.lower():
+                    raise ChunkedUploadError('Checksum mismatch for the assembled file', 422)
+            
+            os.replace(part_path, destination)
+        self.discard(upload_id)
+        return session
+    
+    def discard(self, upload_id: str):
+        """Remove every file belonging to a session"""
+        for path in self._paths(upload_id):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+    
+    def purge_expired(self) -> int:
+        """Drop sessions that were abandoned for longer than the TTL"""
+        removed = 0
+        cutoff = time.time() - self.session_ttl
+        for name in os.listdir(self.session_folder):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.session_folder, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    self.discard(name[:-5])
+                    removed += 1
+            except (OSError, ChunkedUploadError):
+                continue
+        return removed
@@ -3,18 +3,31 @@ import time
 import threading
 import logging
 from config import Config
+from utils.compression import SIDECAR_SUFFIXES
+from utils.expiry_index import CleanerElection, ExpiryIndex
+from utils.storage_layout import iter_stored_files
 
 logger = logging.getLogger(__name__)
 
 class CleanupManager:
-    """Manages automatic cleanup of old files"""
+    """Manages automatic cleanup of old files
+    
+    Files are registered in an expiry index when they are written; one
+    elected process deletes the entries that are due. A rare directory
+    sweep remains as a backstop for files that were never registered.
+    """
     
     def __init__(self):
         self.cleanup_interval = Config.CLEANUP_INTERVAL
         # Convert hours to seconds for file retention time
         self.file_retention_time = Config.FILE_RETENTION_HOURS * 3600
+        self.sweep_interval = Config.CLEANUP_SWEEP_HOURS * 3600
         self.upload_folder = Config.UPLOAD_FOLDER
         self.converted_folder = Config.CONVERTED_FOLDER
+        self.spool_folder = Config.SPOOL_DIR or None
+        self.index = ExpiryIndex()
+        self.election = CleanerElection(f'{self.index.db_path}.lock')
+        self.last_sweep = 0
         self.cleanup_thread = None
         self.running = False
     
@@ -32,29 +45,52 @@ class CleanupManager:
         if self.cleanup_thread and self.cleanup_thread.is_alive():
             self.cleanup_thread.join(timeout=5)
             logger.info("Cleanup thread stopped")
+        self.election.release()
     
     def _cleanup_loop(self):
         """Main cleanup loop"""
         while self.running:
             try:
-                self._cleanup_old_files()
+                # Other processes keep retrying so one takes over if the cleaner exits
+                if self.election.try_acquire():
+                    self._delete_due_files()
+                    if self.sweep_interval and time.time() - self.last_sweep >= self.sweep_interval:
+                        self._cleanup_old_files()
+                        self.last_sweep = time.time()
                 time.sleep(self.cleanup_interval)
             except Exception as e:
                 logger.error(f"Cleanup error: {e}")
                 time.sleep(60)  # Wait 1 minute before retrying
     
+    def _delete_due_files(self) -> int:
+        """Delete every indexed file whose expiry has passed"""
+        deleted_count = 0
+        while True:
+            paths = self.index.due()
+            if not paths:
+                break
+            for file_path in paths:
+                if self._delete_file_safely(file_path):
+                    deleted_count += 1
+                for suffix in SIDECAR_SUFFIXES.values():
+                    self._delete_file_safely(file_path + suffix)
+            self.index.remove(paths)
+        
+        if deleted_count > 0:
+            logger.info(f"Expired {deleted_count} files")
+        return deleted_count
+    
     def _cleanup_old_files(self):
-        """Clean up old files from upload and converted folders"""
+        """Sweep upload and converted folders for old files the index does not know"""
         try:
             current_time = time.time()
             deleted_count = 0
             
-            for folder in [self.upload_folder, self.converted_folder]:
-                if not os.path.exists(folder):
+            for folder in [self.upload_folder, self.converted_folder, self.spool_folder]:
+                if not folder or not os.path.exists(folder):
                     continue
                 
-                for filename in os.listdir(folder):
-                    file_path = os.path.join(folder, filename)
+                for file_path in iter_stored_files(folder):
                     try:
                         # Check file age
                         file_age = current_time - os.path.getmtime(file_path)
@@ -76,7 +112,7 @@ class CleanupManager:
         try:
             if os.path.exists(file_path) and os.path.isfile(file_path):
                 os.remove(file_path)
-                logger.debug(f"Deleted file: {file_path}")
+                logger.debug("Deleted file: %s", file_path)
                 return True
             return False
         except Exception as e:
@@ -87,14 +123,13 @@ class CleanupManager:
         """Trigger immediate cleanup and return number of deleted files"""
         try:
             current_time = time.time()
-            deleted_count = 0
+            deleted_count = self._delete_due_files()
             
-            for folder in [self.upload_folder, self.converted_folder]:
-                if not os.path.exists(folder):
+            for folder in [self.upload_folder, self.converted_folder, self.spool_folder]:
+                if not folder or not os.path.exists(folder):
                     continue
                 
-                for filename in os.listdir(folder):
-                    file_path = os.path.join(folder, filename)
+                for file_path in iter_stored_files(folder):
                     try:
                         file_age = current_time - os.path.getmtime(file_path)
                         if file_age > self.file_retention_time:
@@ -112,7 +147,12 @@ class CleanupManager:
             logger.error(f"Error during manual cleanup: {e}")
             return 0
     
-    def schedule_cleanup(self, file_path: str):
-        """Schedule a file for cleanup (this is handled by the cleanup loop)"""
-        # The cleanup loop will automatically handle files based on their modification time
-        logger.debug(f"File scheduled for cleanup: {file_path}") 
\ No newline at end of file
+    def schedule_cleanup(self, file_path: str, retention_seconds: int = None):
+        """Register a file in the expiry index"""
+        try:
+            retention = self.file_retention_time if retention_seconds is None else retention_seconds
+            self.index.schedule(file_path, time.time() + retention)
+            logger.debug("File scheduled for cleanup: %s", file_path)
+        except Exception as e:
+            # The backstop sweep still catches files that could not be indexed
+            logger.error(f"Error scheduling cleanup for {file_path}: {e}")
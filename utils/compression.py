@@ -0,0 +1,114 @@
+import os
+import zlib
+import logging
+from functools import lru_cache
+from importlib.util import find_spec
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Text-type outputs worth compressing; binary formats are already compressed
+COMPRESSIBLE_FORMATS = {
+    'txt', 'html', 'htm', 'json', 'ndjson', 'csv', 'tsv', 'xml', 'svg',
+    'md', 'rtf', 'css', 'js', 'yaml', 'yml', 'log'
+}
+
+# Server preference when the client rates several encodings equally
+ENCODING_PREFERENCE = ('zstd', 'br', 'gzip')
+SIDECAR_SUFFIXES = {'zstd': '.zst', 'br': '.br', 'gzip': '.gz'}
+
+# Sidecars that save less than this fraction are not kept
+MIN_SAVING = 0.1
+
+def is_compressible(filename: str) -> bool:
+    return '.' in filename and filename.rsplit('.', 1)[-1].lower() in COMPRESSIBLE_FORMATS
+
+@lru_cache(maxsize=None)
+def available_encodings() -> tuple:
+    """gzip always; brotli and zstd when their modules are installed"""
+    encodings = []
+    if find_spec('zstandard') is not None:
+        encodings.append('zstd')
+    if find_spec('brotli') is not None:
+        encodings.append('br')
+    encodings.append('gzip')
+    return tuple(encodings)
+
+def compressor(encoding: str):
+    """Return (compress, finish) callables for a streaming encoder"""
+    if encoding == 'gzip':
+        encoder = zlib.compressobj(Config.COMPRESS_GZIP_LEVEL, zlib.DEFLATED, 31)
+        return encoder.compress, encoder.flush
+    if encoding == 'br':
+        import brotli
+        encoder = brotli.Compressor(quality=Config.COMPRESS_BROTLI_QUALITY)
+        return encoder.process, encoder.finish
+    if encoding == 'zstd':
+        import zstandard
+        encoder = zstandard.ZstdCompressor(level=Config.COMPRESS_ZSTD_LEVEL).compressobj()
+        return encoder.compress, encoder.flush
+    raise ValueError(f'Unsupported encoding: {encoding}')
+
+def negotiate(accept_encodings, offered) -> str:
+    """Pick the best encoding in offered for a werkzeug Accept-Encoding header"""
+    best, best_quality = None, 0
+    for encoding in ENCODING_PREFERENCE:
+        if encoding not in offered:
+            continue
+        quality = accept_encodings.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+def iter_compressed(file_path: str, encoding: str, block_size: int = 64 * 1024):
+    """Yield the encoded bytes of a file as it is read"""
+    compress, finish = compressor(encoding)
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            data = compress(block)
+            if data:
+                yield data
+    yield finish()
+
+def write_sidecars(file_path: str) -> list:
+    """Write .gz/.br/.zst copies next to a large text output; returns the encodings kept"""
+    written = []
+    try:
+        if not is_compressible(file_path):
+            return written
+        size = os.path.getsize(file_path)
+        if size < Config.COMPRESS_SIDECAR_MIN_BYTES:
+            return written
+        
+        for encoding in available_encodings():
+            sidecar_path = file_path + SIDECAR_SUFFIXES[encoding]
+            tmp_path = f'{sidecar_path}.tmp'
+            compressed = 0
+            with open(tmp_path, 'wb') as out:
+                for data in iter_compressed(file_path, encoding, Config.INGEST_CHUNK_BYTES):
+                    out.write(data)
+                    compressed += len(data)
+            if compressed > size * (1 - MIN_SAVING):
+                os.remove(tmp_path)
+                continue
+            os.replace(tmp_path, sidecar_path)
+            written.append(encoding)
+        
+        if written:
+            logger.info(f"Compressed sidecars for {os.path.basename(file_path)}: {', '.join(written)}")
+        return written
+    except Exception as e:
+        logger.error(f"Sidecar compression error: {str(e)}")
+        return written
+
+def sidecar_encodings(file_path: str, st) -> dict:
+    """Map encoding -> stat of each sidecar that is at least as new as the file"""
+    sidecars = {}
+    for encoding in SIDECAR_SUFFIXES:
+        try:
+            sidecar_stat = os.stat(file_path + SIDECAR_SUFFIXES[encoding])
+        except OSError:
+            continue
+        if sidecar_stat.st_mtime_ns >= st.st_mtime_ns:
+            sidecars[encoding] = sidecar_stat
+    return sidecars
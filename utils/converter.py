@@ -1,17 +1,44 @@
 import os
 import io
-import tempfile
+import functools
 import subprocess
 import logging
 import json
 import csv
 import xml.etree.ElementTree as ET
 from pathlib import Path
-from PIL import Image
 from config import Config
+from utils.capabilities import probe_capabilities
+from utils.office_pool import LibreOfficePool
+from utils.render_cache import RenderCache
+from utils.fastcopy import canonical_format, fast_copy
+from utils.spool import get_spool
 
 logger = logging.getLogger(__name__)
 
+# Source code and config files: plain text, passed through byte for byte
+CODE_FORMATS = ['py', 'js', 'css', 'php', 'java', 'cpp', 'c', 'cs', 'rb', 'go', 'rs', 'log', 'ini', 'cfg', 'conf', 'yaml', 'yml', 'toml']
+
+def conversion_step(label: str):
+    """Log and return False when a conversion helper fails, so callers can fall back
+
+    MemoryError is the one exception passed on: under the sandbox's
+    RLIMIT_AS it means the job hit its memory limit, which the sandbox
+    reports as memory_limit rather than a plain conversion failure.
+    """
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            try:
+                return method(*args, **kwargs)
+            except MemoryError:
+                raise
+            except Exception as e:
+                logger.error(f"{label} error: {str(e)}")
+                return False
+        return wrapper
+    return decorate
+
 class FileConverter:
     """Handles file conversion between different formats - Universal version"""
     
@@ -20,58 +47,54 @@ class FileConverter:
         self.image_max_dimension = Config.IMAGE_MAX_DIMENSION
         self.pdf_resolution = Config.PDF_RESOLUTION
         
-        # Check available libraries
-        self.pil_available = self._check_pil()
-        self.pymupdf_available = self._check_pymupdf()
-        self.reportlab_available = self._check_reportlab()
-        self.docx_available = self._check_docx()
+        # Check available libraries (located, not imported: engines load on first use)
+        capabilities = probe_capabilities()
+        self.pil_available = capabilities['pil']
+        self.pymupdf_available = capabilities['pymupdf']
+        self.reportlab_available = capabilities['reportlab']
+        self.docx_available = capabilities['docx']
+        
+        # Headless LibreOffice instances are started on first use
+        self.office_pool = LibreOfficePool()
+        self.libreoffice_available = self.office_pool.is_available()
+        
+        # Shared by the Markdown and code renderers
+        self.render_cache = RenderCache()
         
         logger.info(f"Universal Converter initialized - PIL: {self.pil_available}, PyMuPDF: {self.pymupdf_available}, "
-                   f"ReportLab: {self.reportlab_available}, DOCX: {self.docx_available}")
-    
-    def _check_pil(self):
-        """Check if PIL/Pillow is available"""
-        try:
-            from PIL import Image
-            return True
-        except ImportError:
-            return False
-    
-    def _check_pymupdf(self):
-        """Check if PyMuPDF is available"""
-        try:
-            import fitz
-            return True
-        except ImportError:
-            return False
-    
-    def _check_reportlab(self):
-        """Check if ReportLab is available"""
-        try:
-            from reportlab.lib.pagesizes import A4
-            from reportlab.platypus import SimpleDocTemplate
-            return True
-        except ImportError:
-            return False
-    
-    def _check_docx(self):
-        """Check if python-docx is available"""
-        try:
-            from docx import Document
-            return True
-        except ImportError:
-            return False
-    
-    def convert_file(self, input_path: str, output_path: str, target_format: str) -> dict:
+                   f"ReportLab: {self.reportlab_available}, DOCX: {self.docx_available}, "
+                   f"LibreOffice: {self.libreoffice_available}")
+    
+    def engine_for(self, input_path: str, target_format: str) -> str:
+        """Name the engine that does the heavy lifting for a pair (for admission control)"""
+        input_ext = Path(input_path).suffix[1:].lower()
+        target_format = target_format.lower()
+        raster_formats = {'jpg', 'jpeg', 'png', 'gif', 'bmp', 'tiff', 'tif', 'webp', 'ico'}
+        
+        if input_ext in ('doc', 'xls', 'xlsx', 'ppt', 'pptx', 'rtf') and self.libreoffice_available and \
+                self.office_pool.can_convert(input_ext, target_format) and \
+                not (input_ext == 'xlsx' and target_format in ('csv', 'json', 'ndjson', 'xml', 'zip')):
+            return 'libreoffice'
+        if input_ext == 'pdf' and target_format in raster_formats | {'docx'}:
+            return 'pymupdf'
+        if input_ext in raster_formats | {'svg'} or target_format in raster_formats:
+            return 'pillow'
+        if target_format == 'pdf':
+            return 'reportlab'
+        return 'default'
+    
+    def convert_file(self, input_path: str, output_path: str, target_format: str, options: dict = None) -> dict:
         """Main conversion method with universal format support"""
         try:
+            options = options or {}
+            
             if not os.path.exists(input_path):
                 return {'success': False, 'error': 'Input file not found'}
             
             input_ext = Path(input_path).suffix[1:].lower()
             target_format = target_format.lower()
             
-            logger.info(f"Converting {input_ext} to {target_format}")
+            logger.debug("Converting %s to %s", input_ext, target_format)
             
             # Universal format mappings
             image_formats = ['jpg', 'jpeg', 'png', 'gif', 'bmp', 'tiff', 'tif', 'webp', 'ico', 'svg']
@@ -79,10 +102,30 @@ class FileConverter:
             spreadsheet_formats = ['xlsx', 'xls', 'csv']
             presentation_formats = ['pptx', 'ppt']
             data_formats = ['json', 'xml']
-            code_formats = ['py', 'js', 'css', 'php', 'java', 'cpp', 'c', 'cs', 'rb', 'go', 'rs', 'log', 'ini', 'cfg', 'conf', 'yaml', 'yml', 'toml']
+            code_formats = CODE_FORMATS
+            office_formats = ['doc', 'xls', 'xlsx', 'ppt', 'pptx', 'rtf']
+            xlsx_data_formats = ['csv', 'json', 'ndjson', 'xml', 'zip']
             
             success = False  # Initialize success variable
             
+            # Identity and plain-text passthroughs are byte copies: serve them
+            # with a hardlink or in-kernel copy instead of decoding the file
+            if canonical_format(input_ext) == canonical_format(target_format) or \
+                    (target_format == 'txt' and input_ext in code_formats + ['txt']):
+                method = fast_copy(input_path, output_path)
+                logger.debug("Passthrough %s -> %s via %s", input_ext, target_format, method)
+                return {'success': True, 'output_path': output_path}
+            
+            # Office formats go through the LibreOffice pool first, the
+            # native converters below remain the fallback
+            # (XLSX data exports stream natively instead of loading the workbook)
+            if input_ext in office_formats and self.libreoffice_available and \
+                    self.office_pool.can_convert(input_ext, target_format) and \
+                    not (input_ext == 'xlsx' and target_format in xlsx_data_formats):
+                if self.office_pool.convert(input_path, output_path, target_format):
+                    return {'success': True, 'output_path': output_path}
+                logger.warning(f"LibreOffice conversion {input_ext} -> {target_format} failed, trying fallback")
+            
             # Image conversions
             if input_ext in image_formats and target_format in image_formats:
                 success = self._convert_image(input_path, output_path, target_format)
@@ -93,17 +136,19 @@ class FileConverter:
             
             # Special conversions (must come before general document conversions)
             elif input_ext == 'pdf' and target_format == 'docx':
-                logger.info(f"Attempting PDF to DOCX conversion: {input_path} -> {output_path}")
+                logger.debug("Attempting PDF to DOCX conversion: %s -> %s", input_path, output_path)
                 success = self._convert_pdf_to_docx(input_path, output_path)
-                logger.info(f"PDF to DOCX conversion result: {success}")
+                logger.debug("PDF to DOCX conversion result: %s", success)
             elif input_ext == 'pdf' and target_format == 'doc':
-                logger.info(f"Attempting PDF to DOC conversion: {input_path} -> {output_path}")
+                logger.debug("Attempting PDF to DOC conversion: %s -> %s", input_path, output_path)
                 success = self._convert_pdf_to_doc(input_path, output_path)
-                logger.info(f"PDF to DOC conversion result: {success}")
+                logger.debug("PDF to DOC conversion result: %s", success)
             elif input_ext == 'pdf' and target_format == 'txt':
                 success = self._convert_pdf_to_text(input_path, output_path)
             elif input_ext == 'txt' and target_format == 'pdf':
                 success = self._convert_text_to_pdf(input_path, output_path)
+            elif input_ext == 'md' and target_format == 'pdf':
+                success = self._convert_markdown_to_pdf(input_path, output_path)
             elif input_ext == 'docx' and target_format == 'pdf':
                 success = self._convert_docx_to_pdf(input_path, output_path)
             elif input_ext == 'docx' and target_format == 'txt':
@@ -114,17 +159,19 @@ class FileConverter:
                 success = self._convert_document(input_path, output_path, target_format)
             
             # Spreadsheet conversions
+            elif input_ext == 'xlsx' and target_format in xlsx_data_formats:
+                success = self._convert_xlsx(input_path, output_path, target_format, options.get('sheet'))
             elif input_ext in spreadsheet_formats and target_format in spreadsheet_formats:
                 success = self._convert_spreadsheet(input_path, output_path, target_format)
             elif input_ext in spreadsheet_formats and target_format == 'pdf':
-                success = self._convert_spreadsheet_to_pdf(input_path, output_path)
+                success = self._convert_spreadsheet_to_pdf(input_path, output_path, options.get('sheet'))
             
             # Data format conversions
             elif input_ext in data_formats and target_format in data_formats:
                 success = self._convert_data_format(input_path, output_path, target_format)
             
             # Code format conversions
-            elif input_ext in code_formats and target_format in code_formats:
+            elif input_ext in code_formats and target_format in ['html', 'txt']:
                 success = self._convert_code_format(input_path, output_path, target_format)
             
             # Cross-format conversions
@@ -149,448 +196,404 @@ class FileConverter:
             else:
                 return {'success': False, 'error': 'Conversion failed'}
                 
+        except MemoryError:
+            # Let the sandbox report memory_limit instead of a generic failure
+            raise
         except Exception as e:
             logger.error(f"Conversion error: {str(e)}")
             return {'success': False, 'error': f'Conversion error: {str(e)}'}
     
+    @conversion_step('Image conversion')
     def _convert_image(self, input_path: str, output_path: str, target_format: str) -> bool:
         """Convert between image formats"""
-        try:
-            input_ext = Path(input_path).suffix[1:].lower()
-            
-            # Handle SVG conversions
-            if target_format == 'svg':
-                return self._convert_to_svg(input_path, output_path)
-            elif input_ext == 'svg':
-                return self._convert_from_svg(input_path, output_path, target_format)
-            
-            # Handle regular image conversions with PIL
-            if not self.pil_available:
-                return False
-            
-            with Image.open(input_path) as img:
-                # Convert to RGB if necessary
-                if target_format in ['jpg', 'jpeg'] and img.mode in ['RGBA', 'LA', 'P']:
-                    img = img.convert('RGB')
-                elif target_format in ['png', 'webp'] and img.mode == 'P':
-                    img = img.convert('RGBA')
-                
-                # Resize if too large
-                if max(img.size) > self.image_max_dimension:
-                    img.thumbnail((self.image_max_dimension, self.image_max_dimension), Image.Resampling.LANCZOS)
-                
-                # Save with appropriate options
-                save_kwargs = {}
-                if target_format in ['jpg', 'jpeg']:
-                    save_kwargs['quality'] = self.image_quality
-                    save_kwargs['optimize'] = True
-                elif target_format == 'webp':
-                    save_kwargs['quality'] = self.image_quality
-                    save_kwargs['method'] = 6
-                elif target_format == 'png':
-                    save_kwargs['optimize'] = True
-                
-                img.save(output_path, format=target_format.upper(), **save_kwargs)
-                return True
-                
-        except Exception as e:
-            logger.error(f"Image conversion error: {str(e)}")
+        input_ext = Path(input_path).suffix[1:].lower()
+        
+        # Handle SVG conversions
+        if target_format == 'svg':
+            return self._convert_to_svg(input_path, output_path)
+        elif input_ext == 'svg':
+            return self._convert_from_svg(input_path, output_path, target_format)
+        
+        # Handle regular image conversions with PIL
+        if not self.pil_available:
             return False
+        from PIL import Image
+        
+        with Image.open(input_path) as img:
+            # Convert to RGB if necessary
+            if target_format in ['jpg', 'jpeg'] and img.mode in ['RGBA', 'LA', 'P']:
+                img = img.convert('RGB')
+            elif target_format in ['png', 'webp'] and img.mode == 'P':
+                img = img.convert('RGBA')
+            
+            # Resize if too large
+            if max(img.size) > self.image_max_dimension:
+                img.thumbnail((self.image_max_dimension, self.image_max_dimension), Image.Resampling.LANCZOS)
+            
+            # Save with appropriate options
+            save_kwargs = {}
+            if target_format in ['jpg', 'jpeg']:
+                save_kwargs['quality'] = self.image_quality
+                save_kwargs['optimize'] = True
+            elif target_format == 'webp':
+                save_kwargs['quality'] = self.image_quality
+                save_kwargs['method'] = 6
+            elif target_format == 'png':
+                save_kwargs['optimize'] = True
+            
+            img.save(output_path, format=target_format.upper(), **save_kwargs)
+            return True
     
+    @conversion_step('Image to PDF conversion')
     def _convert_image_to_pdf(self, input_path: str, output_path: str) -> bool:
         """Convert image to PDF"""
-        try:
-            if self.reportlab_available:
-                return self._convert_image_to_pdf_reportlab(input_path, output_path)
-            elif self.pil_available:
-                return self._convert_image_to_pdf_pil(input_path, output_path)
-            
-            return False
-            
-        except Exception as e:
-            logger.error(f"Image to PDF conversion error: {str(e)}")
-            return False
+        if self.reportlab_available:
+            return self._convert_image_to_pdf_reportlab(input_path, output_path)
+        elif self.pil_available:
+            return self._convert_image_to_pdf_pil(input_path, output_path)
+        
+        return False
     
+    @conversion_step('ReportLab image to PDF')
     def _convert_image_to_pdf_reportlab(self, input_path: str, output_path: str) -> bool:
         """Convert image to PDF using ReportLab"""
-        try:
-            from reportlab.lib.pagesizes import A4
-            from reportlab.platypus import SimpleDocTemplate, Image as RLImage
-            from reportlab.lib.units import inch
-            
-            doc = SimpleDocTemplate(output_path, pagesize=A4)
-            story = []
-            
-            # Add image to PDF
-            img = RLImage(input_path, width=6*inch, height=4*inch)
-            story.append(img)
-            
-            doc.build(story)
-            return True
-            
-        except Exception as e:
-            logger.error(f"ReportLab image to PDF error: {str(e)}")
-            return False
+        from reportlab.lib.pagesizes import A4
+        from reportlab.platypus import SimpleDocTemplate, Image as RLImage
+        from reportlab.lib.units import inch
+        
+        doc = SimpleDocTemplate(output_path, pagesize=A4)
+        story = []
+        
+        # Add image to PDF
+        img = RLImage(input_path, width=6*inch, height=4*inch)
+        story.append(img)
+        
+        doc.build(story)
+        return True
     
+    @conversion_step('PIL image to PDF')
     def _convert_image_to_pdf_pil(self, input_path: str, output_path: str) -> bool:
         """Convert image to PDF using PIL"""
-        try:
-            with Image.open(input_path) as img:
-                if img.mode in ['RGBA', 'LA', 'P']:
-                    img = img.convert('RGB')
-                img.save(output_path, 'PDF', resolution=self.pdf_resolution)
-                return True
-                
-        except Exception as e:
-            logger.error(f"PIL image to PDF error: {str(e)}")
-            return False
+        from PIL import Image
+        
+        with Image.open(input_path) as img:
+            if img.mode in ['RGBA', 'LA', 'P']:
+                img = img.convert('RGB')
+            img.save(output_path, 'PDF', resolution=self.pdf_resolution)
+            return True
     
+    @conversion_step('PDF to image conversion')
     def _convert_pdf_to_image(self, input_path: str, output_path: str, target_format: str) -> bool:
         """Convert PDF to image"""
-        try:
-            if self.pymupdf_available:
-                import fitz
-                doc = fitz.open(input_path)
-                page = doc[0]  # First page
-                
-                # Calculate zoom for high resolution
-                zoom = self.pdf_resolution / 72
-                mat = fitz.Matrix(zoom, zoom)
-                pix = page.get_pixmap(matrix=mat)
-                
-                # Convert to PIL Image for format conversion
-                img_data = pix.tobytes("png")
-                with Image.open(io.BytesIO(img_data)) as img:
-                    img.save(output_path, format=target_format.upper())
-                
-                doc.close()
-                return True
+        if self.pymupdf_available:
+            import fitz
+            from PIL import Image
+            doc = fitz.open(input_path)
+            page = doc[0]  # First page
             
-            return False
+            # Calculate zoom for high resolution
+            zoom = self.pdf_resolution / 72
+            mat = fitz.Matrix(zoom, zoom)
+            pix = page.get_pixmap(matrix=mat)
             
-        except Exception as e:
-            logger.error(f"PDF to image conversion error: {str(e)}")
-            return False
+            # Convert to PIL Image for format conversion
+            img_data = pix.tobytes("png")
+            with Image.open(io.BytesIO(img_data)) as img:
+                img.save(output_path, format=target_format.upper())
+            
+            doc.close()
+            return True
+        
+        return False
     
+    @conversion_step('Convert to SVG')
     def _convert_to_svg(self, input_path: str, output_path: str) -> bool:
         """Convert image to SVG format"""
-        try:
-            # For now, create a simple SVG wrapper around the image
-            # This is a basic approach - for better results, consider using vectorization libraries
-            if not self.pil_available:
-                return False
+        # For now, create a simple SVG wrapper around the image
+        # This is a basic approach - for better results, consider using vectorization libraries
+        if not self.pil_available:
+            return False
+        from PIL import Image
+        
+        with Image.open(input_path) as img:
+            width, height = img.size
             
-            with Image.open(input_path) as img:
-                width, height = img.size
-                
-                # Create a simple SVG that embeds the image as base64
-                import base64
-                import io
-                
-                # Convert image to base64
-                buffer = io.BytesIO()
-                img.save(buffer, format='PNG')
-                img_base64 = base64.b64encode(buffer.getvalue()).decode()
-                
-                svg_content = f'''<?xml version="1.0" encoding="UTF-8"?>
+            # Create a simple SVG that embeds the image as base64
+            import base64
+            import io
+            
+            # Convert image to base64
+            buffer = io.BytesIO()
+            img.save(buffer, format='PNG')
+            img_base64 = base64.b64encode(buffer.getvalue()).decode()
+            
+            svg_content = f'''<?xml version="1.0" encoding="UTF-8"?>
 <svg width="{width}" height="{height}" xmlns="http://www.w3.org/2000/svg">
     <image width="{width}" height="{height}" href="data:image/png;base64,{img_base64}"/>
 </svg>'''
-                
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    f.write(svg_content)
-                
-                return True
-                
-        except Exception as e:
-            logger.error(f"Convert to SVG error: {str(e)}")
-            return False
+            
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.write(svg_content)
+            
+            return True
     
+    @conversion_step('Convert from SVG')
     def _convert_from_svg(self, input_path: str, output_path: str, target_format: str) -> bool:
         """Convert SVG to other image formats"""
+        # Try using cairosvg if available and Cairo is installed
         try:
-            # Try using cairosvg if available and Cairo is installed
-            try:
-                import cairosvg
-                cairosvg.svg2png(url=input_path, write_to=output_path.replace(f'.{target_format}', '.png'))
-                
-                # If target format is not PNG, convert the PNG to target format
-                if target_format != 'png':
-                    temp_png = output_path.replace(f'.{target_format}', '.png')
-                    if os.path.exists(temp_png):
-                        with Image.open(temp_png) as img:
-                            img.save(output_path, format=target_format.upper())
-                        os.remove(temp_png)
-                
-                return True
-                
-            except (ImportError, OSError) as e:
-                logger.warning(f"cairosvg not available or Cairo library missing: {str(e)}")
+            import cairosvg
             
-            # Fallback: try using svglib if available
-            try:
-                from svglib.svglib import svg2rlg
-                from reportlab.graphics import renderPM
-                
-                drawing = svg2rlg(input_path)
-                if drawing:
-                    renderPM.drawToFile(drawing, output_path, fmt=target_format.upper())
-                    return True
-                    
-            except ImportError:
-                logger.warning("svglib not available")
-            
-            # Final fallback: create a simple rasterized version
-            if self.pil_available:
-                # Create a simple colored rectangle as placeholder
-                img = Image.new('RGB', (800, 600), color='white')
-                img.save(output_path, format=target_format.upper())
-                logger.warning("SVG conversion using fallback method - result may be basic")
-                return True
+            if target_format == 'png':
+                cairosvg.svg2png(url=input_path, write_to=output_path)
+            else:
+                # Rasterise to a spooled PNG, then convert the PNG to target format
+                size_hint = os.path.getsize(input_path) * 4  # rasters outgrow their SVG
+                with get_spool().temp_path('.png', size_hint, os.path.dirname(output_path)) as temp_png:
+                    cairosvg.svg2png(url=input_path, write_to=temp_png)
+                    from PIL import Image
+                    with Image.open(temp_png) as img:
+                        img.save(output_path, format=target_format.upper())
             
-            return False
+            return True
+        
+        except (ImportError, OSError) as e:
+            logger.warning(f"cairosvg not available or Cairo library missing: {str(e)}")
+        
+        # Fallback: try using svglib if available
+        try:
+            from svglib.svglib import svg2rlg
+            from reportlab.graphics import renderPM
             
-        except Exception as e:
-            logger.error(f"Convert from SVG error: {str(e)}")
-            return False
+            drawing = svg2rlg(input_path)
+            if drawing:
+                renderPM.drawToFile(drawing, output_path, fmt=target_format.upper())
+                return True
+        
+        except ImportError:
+            logger.warning("svglib not available")
+        
+        # Final fallback: create a simple rasterized version
+        if self.pil_available:
+            # Create a simple colored rectangle as placeholder
+            from PIL import Image
+            img = Image.new('RGB', (800, 600), color='white')
+            img.save(output_path, format=target_format.upper())
+            logger.warning("SVG conversion using fallback method - result may be basic")
+            return True
+        
+        return False
     
+    @conversion_step('Document conversion')
     def _convert_document(self, input_path: str, output_path: str, target_format: str) -> bool:
         """Convert between document formats"""
-        try:
-            input_ext = Path(input_path).suffix[1:].lower()
-            
-            # Simple text-based conversions
-            if input_ext == 'txt' and target_format == 'html':
-                return self._convert_text_to_html(input_path, output_path)
-            elif input_ext == 'html' and target_format == 'txt':
-                return self._convert_html_to_text(input_path, output_path)
-            elif input_ext == 'md' and target_format == 'html':
-                return self._convert_markdown_to_html(input_path, output_path)
-            elif input_ext == 'md' and target_format == 'txt':
-                return self._convert_markdown_to_text(input_path, output_path)
-            
-            # For other conversions, try to extract text and convert
-            if target_format == 'txt':
-                return self._extract_text_to_file(input_path, output_path)
-            elif target_format == 'html':
-                return self._convert_to_html(input_path, output_path)
-            
-            return False
-            
-        except Exception as e:
-            logger.error(f"Document conversion error: {str(e)}")
-            return False
+        input_ext = Path(input_path).suffix[1:].lower()
+        
+        # Simple text-based conversions
+        if input_ext == 'txt' and target_format == 'html':
+            return self._convert_text_to_html(input_path, output_path)
+        elif input_ext in ['html', 'htm'] and target_format == 'txt':
+            return self._convert_html_to_text(input_path, output_path)
+        elif input_ext == 'md' and target_format == 'html':
+            return self._convert_markdown_to_html(input_path, output_path)
+        elif input_ext == 'md' and target_format == 'txt':
+            return self._convert_markdown_to_text(input_path, output_path)
+        
+        # For other conversions, try to extract text and convert
+        if target_format == 'txt':
+            return self._extract_text_to_file(input_path, output_path)
+        elif target_format == 'html':
+            return self._convert_to_html(input_path, output_path)
+        
+        return False
     
+    @conversion_step('Spreadsheet conversion')
     def _convert_spreadsheet(self, input_path: str, output_path: str, target_format: str) -> bool:
         """Convert between spreadsheet formats"""
-        try:
-            input_ext = Path(input_path).suffix[1:].lower()
-            
-            if input_ext == 'csv' and target_format == 'json':
-                return self._convert_csv_to_json(input_path, output_path)
-            elif input_ext == 'csv' and target_format == 'xml':
-                return self._convert_csv_to_xml(input_path, output_path)
-            elif input_ext == 'json' and target_format == 'csv':
-                return self._convert_json_to_csv(input_path, output_path)
-            
-            return False
-            
-        except Exception as e:
-            logger.error(f"Spreadsheet conversion error: {str(e)}")
-            return False
+        input_ext = Path(input_path).suffix[1:].lower()
+        
+        if input_ext == 'csv' and target_format == 'json':
+            return self._convert_csv_to_json(input_path, output_path)
+        elif input_ext == 'csv' and target_format == 'xml':
+            return self._convert_csv_to_xml(input_path, output_path)
+        elif input_ext == 'json' and target_format == 'csv':
+            return self._convert_json_to_csv(input_path, output_path)
+        
+        return False
     
+    @conversion_step('XLSX conversion')
+    def _convert_xlsx(self, input_path: str, output_path: str, target_format: str, sheet=None) -> bool:
+        """Stream XLSX sheets to CSV/JSON/NDJSON/XML, or every sheet into a ZIP"""
+        from utils.xlsx_reader import XlsxReader, export_all_sheets_zip
+        
+        if target_format == 'zip':
+            return export_all_sheets_zip(input_path, output_path, 'csv')
+        
+        with XlsxReader(input_path) as reader:
+            reader.write_sheet(output_path, target_format, sheet)
+        return True
+    
+    @conversion_step('Data format conversion')
     def _convert_data_format(self, input_path: str, output_path: str, target_format: str) -> bool:
         """Convert between data formats"""
-        try:
-            input_ext = Path(input_path).suffix[1:].lower()
-            
-            if input_ext == 'json' and target_format == 'xml':
-                return self._convert_json_to_xml(input_path, output_path)
-            elif input_ext == 'xml' and target_format == 'json':
-                return self._convert_xml_to_json(input_path, output_path)
-            elif input_ext == 'json' and target_format == 'csv':
-                return self._convert_json_to_csv(input_path, output_path)
-            elif input_ext == 'csv' and target_format == 'json':
-                return self._convert_csv_to_json(input_path, output_path)
-            
-            return False
-            
-        except Exception as e:
-            logger.error(f"Data format conversion error: {str(e)}")
-            return False
+        input_ext = Path(input_path).suffix[1:].lower()
+        
+        if input_ext == 'json' and target_format == 'xml':
+            return self._convert_json_to_xml(input_path, output_path)
+        elif input_ext == 'xml' and target_format == 'json':
+            return self._convert_xml_to_json(input_path, output_path)
+        elif input_ext == 'json' and target_format == 'csv':
+            return self._convert_json_to_csv(input_path, output_path)
+        elif input_ext == 'csv' and target_format == 'json':
+            return self._convert_csv_to_json(input_path, output_path)
+        
+        return False
     
+    @conversion_step('Code format conversion')
     def _convert_code_format(self, input_path: str, output_path: str, target_format: str) -> bool:
-        """Convert between code formats (mostly syntax highlighting)"""
-        try:
-            # For code files, we'll just copy the content with appropriate headers
-            with open(input_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-            
-            if target_format == 'html':
-                return self._convert_code_to_html(input_path, output_path, content)
-            elif target_format == 'txt':
-                # Just copy the content
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
-                return True
-            
-            return False
-            
-        except Exception as e:
-            logger.error(f"Code format conversion error: {str(e)}")
-            return False
+        """Convert source code to highlighted HTML or plain text"""
+        if target_format == 'html':
+            return self._convert_code_to_html(input_path, output_path)
+        elif target_format == 'txt':
+            fast_copy(input_path, output_path)
+            return True
+        
+        return False
     
+    @conversion_step('PDF to text')
     def _convert_pdf_to_text(self, input_path: str, output_path: str) -> bool:
         """Convert PDF to text"""
-        try:
-            if self.pymupdf_available:
-                import fitz
-                doc = fitz.open(input_path)
-                text_content = ""
-                
-                for page_num in range(len(doc)):
-                    page = doc[page_num]
-                    text_content += page.get_text()
-                    if page_num < len(doc) - 1:
-                        text_content += "\n\n"
-                
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    f.write(text_content)
-                
-                doc.close()
-                return True
-            
-            return False
-        except Exception as e:
-            logger.error(f"PDF to text error: {str(e)}")
-            return False
-    
-    def _convert_pdf_to_docx(self, input_path: str, output_path: str) -> bool:
-        """Convert PDF to DOCX"""
-        try:
-            if self.pymupdf_available and self.docx_available:
-                return self._convert_pdf_to_docx_with_libraries(input_path, output_path)
-            
-            return False
-        except Exception as e:
-            logger.error(f"PDF to DOCX error: {str(e)}")
-            return False
-    
-    def _convert_pdf_to_docx_with_libraries(self, input_path: str, output_path: str) -> bool:
-        """Convert PDF to DOCX using PyMuPDF + python-docx"""
-        try:
+        if self.pymupdf_available:
             import fitz
-            from docx import Document
-            from docx.shared import Inches
-            
-            # Extract text from PDF
             doc = fitz.open(input_path)
-            document = Document()
-            
-            # Add title
-            document.add_heading('Converted PDF Document', 0)
+            text_content = ""
             
-            # Process each page
             for page_num in range(len(doc)):
                 page = doc[page_num]
-                text = page.get_text()
-                
-                if text.strip():
-                    # Split text into paragraphs
-                    paragraphs = text.split('\n\n')
-                    
-                    for para in paragraphs:
-                        if para.strip():
-                            # Clean up the paragraph
-                            clean_para = para.strip().replace('\n', ' ')
-                            if clean_para:
-                                document.add_paragraph(clean_para)
-                    
-                    # Add page break if not the last page
-                    if page_num < len(doc) - 1:
-                        document.add_page_break()
+                text_content += page.get_text()
+                if page_num < len(doc) - 1:
+                    text_content += "\n\n"
+            
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.write(text_content)
             
-            # Save the DOCX file
-            document.save(output_path)
             doc.close()
             return True
-            
-        except Exception as e:
-            logger.error(f"PDF to DOCX with libraries error: {str(e)}")
-            return False
+        
+        return False
     
+    @conversion_step('PDF to DOCX')
+    def _convert_pdf_to_docx(self, input_path: str, output_path: str) -> bool:
+        """Convert PDF to DOCX"""
+        if self.pymupdf_available and self.docx_available:
+            return self._convert_pdf_to_docx_with_libraries(input_path, output_path)
+        
+        return False
+    
+    @conversion_step('PDF to DOCX with libraries')
+    def _convert_pdf_to_docx_with_libraries(self, input_path: str, output_path: str) -> bool:
+        """Convert PDF to DOCX using PyMuPDF + python-docx"""
+        import fitz
+        from docx import Document
+        from docx.shared import Inches
+        
+        # Extract text from PDF
+        doc = fitz.open(input_path)
+        document = Document()
+        
+        # Add title
+        document.add_heading('Converted PDF Document', 0)
+        
+        # Process each page
+        for page_num in range(len(doc)):
+            page = doc[page_num]
+            text = page.get_text()
+            
+            if text.strip():
+                # Split text into paragraphs
+                paragraphs = text.split('\n\n')
+                
+                for para in paragraphs:
+                    if para.strip():
+                        # Clean up the paragraph
+                        clean_para = para.strip().replace('\n', ' ')
+                        if clean_para:
+                            document.add_paragraph(clean_para)
+                
+                # Add page break if not the last page
+                if page_num < len(doc) - 1:
+                    document.add_page_break()
+        
+        # Save the DOCX file
+        document.save(output_path)
+        doc.close()
+        return True
+    
+    @conversion_step('Text to PDF')
     def _convert_text_to_pdf(self, input_path: str, output_path: str) -> bool:
         """Convert text to PDF"""
-        try:
-            if self.reportlab_available:
-                return self._convert_text_to_pdf_reportlab(input_path, output_path)
-            
-            return False
-        except Exception as e:
-            logger.error(f"Text to PDF error: {str(e)}")
-            return False
+        if self.reportlab_available:
+            return self._convert_text_to_pdf_reportlab(input_path, output_path)
+        
+        return False
     
+    @conversion_step('ReportLab text to PDF')
     def _convert_text_to_pdf_reportlab(self, input_path: str, output_path: str) -> bool:
         """Convert text to PDF using ReportLab"""
-        try:
-            from reportlab.lib.pagesizes import A4
-            from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-            from reportlab.lib.styles import getSampleStyleSheet
-            
-            # Read text file
-            with open(input_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-            
-            # Create PDF document
-            doc = SimpleDocTemplate(
-                output_path,
-                pagesize=A4,
-                rightMargin=72,
-                leftMargin=72,
-                topMargin=72,
-                bottomMargin=18
-            )
-            
-            styles = getSampleStyleSheet()
-            story = []
-            
-            # Split content into paragraphs
-            paragraphs = content.split('\n\n')
-            
-            for para in paragraphs:
-                if para.strip():
-                    clean_para = para.strip().replace('\n', ' ')
-                    p = Paragraph(clean_para, styles['Normal'])
-                    story.append(p)
-                    story.append(Spacer(1, 12))
-            
-            doc.build(story)
-            return True
-            
-        except Exception as e:
-            logger.error(f"ReportLab text to PDF error: {str(e)}")
-            return False
+        from reportlab.lib.pagesizes import A4
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+        from utils.pdf_layout import sample_styles
+        
+        # Read text file
+        with open(input_path, 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+        
+        # Create PDF document
+        doc = SimpleDocTemplate(
+            output_path,
+            pagesize=A4,
+            rightMargin=72,
+            leftMargin=72,
+            topMargin=72,
+            bottomMargin=18
+        )
+        
+        styles = sample_styles()
+        story = []
+        
+        # Split content into paragraphs
+        paragraphs = content.split('\n\n')
+        
+        for para in paragraphs:
+            if para.strip():
+                clean_para = para.strip().replace('\n', ' ')
+                p = Paragraph(clean_para, styles['Normal'])
+                story.append(p)
+                story.append(Spacer(1, 12))
+        
+        doc.build(story)
+        return True
     
+    @conversion_step('DOCX to PDF')
     def _convert_docx_to_pdf(self, input_path: str, output_path: str) -> bool:
         """Convert DOCX to PDF"""
-        try:
-            if self.docx_available and self.reportlab_available:
-                return self._convert_docx_to_pdf_reportlab(input_path, output_path)
-            
-            return False
-        except Exception as e:
-            logger.error(f"DOCX to PDF error: {str(e)}")
-            return False
+        if self.docx_available and self.reportlab_available:
+            return self._convert_docx_to_pdf_reportlab(input_path, output_path)
+        
+        return False
     
+    @conversion_step('DOCX to PDF ReportLab')
     def _convert_docx_to_pdf_reportlab(self, input_path: str, output_path: str) -> bool:
         """Convert DOCX to PDF using python-docx + ReportLab"""
-        try:
+        from utils.docx_renderer import DocxPdfRenderer
+        
+        return DocxPdfRenderer().render(input_path, output_path)
+    
+    @conversion_step('DOCX to text')
+    def _convert_docx_to_text(self, input_path: str, output_path: str) -> bool:
+        """Convert DOCX to text"""
+        if self.docx_available:
             from docx import Document
-            from reportlab.lib.pagesizes import A4
-            from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-            from reportlab.lib.styles import getSampleStyleSheet
-            
-            # Extract text from DOCX
             doc = Document(input_path)
             content = []
             
@@ -598,54 +601,21 @@ class FileConverter:
                 if paragraph.text.strip():
                     content.append(paragraph.text.strip())
             
-            # Create temporary text file
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False, encoding='utf-8') as temp_file:
-                temp_file.write('\n\n'.join(content))
-                temp_path = temp_file.name
-            
-            try:
-                # Convert using ReportLab
-                result = self._convert_text_to_pdf_reportlab(temp_path, output_path)
-                return result
-            finally:
-                # Clean up temp file
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
-                    
-        except Exception as e:
-            logger.error(f"DOCX to PDF ReportLab error: {str(e)}")
-            return False
-    
-    def _convert_docx_to_text(self, input_path: str, output_path: str) -> bool:
-        """Convert DOCX to text"""
-        try:
-            if self.docx_available:
-                from docx import Document
-                doc = Document(input_path)
-                content = []
-                
-                for paragraph in doc.paragraphs:
-                    if paragraph.text.strip():
-                        content.append(paragraph.text.strip())
-                
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    f.write('\n\n'.join(content))
-                
-                return True
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.write('\n\n'.join(content))
             
-            return False
-        except Exception as e:
-            logger.error(f"DOCX to text error: {str(e)}")
-            return False
+            return True
+        
+        return False
     
     # Helper conversion methods
+    @conversion_step('Text to HTML')
     def _convert_text_to_html(self, input_path: str, output_path: str) -> bool:
         """Convert text to HTML"""
-        try:
-            with open(input_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-            
-            html_content = f"""<!DOCTYPE html>
+        with open(input_path, 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+        
+        html_content = f"""<!DOCTYPE html>
 <html>
 <head>
     <meta charset="utf-8">
@@ -659,302 +629,201 @@ class FileConverter:
     <pre>{content}</pre>
 </body>
 </html>"""
-            
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            
-            return True
-        except Exception as e:
-            logger.error(f"Text to HTML error: {str(e)}")
-            return False
+        
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(html_content)
+        
+        return True
     
+    @conversion_step('HTML to text')
     def _convert_html_to_text(self, input_path: str, output_path: str) -> bool:
         """Convert HTML to text"""
-        try:
-            with open(input_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-            
-            # Simple HTML to text conversion
-            import re
-            # Remove HTML tags
-            text = re.sub(r'<[^>]+>', '', content)
-            # Remove extra whitespace
-            text = re.sub(r'\s+', ' ', text).strip()
-            
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(text)
-            
-            return True
-        except Exception as e:
-            logger.error(f"HTML to text error: {str(e)}")
-            return False
+        from utils.html_text import extract_html_text
+        
+        extract_html_text(input_path, output_path)
+        return True
     
+    @conversion_step('Markdown to HTML')
     def _convert_markdown_to_html(self, input_path: str, output_path: str) -> bool:
         """Convert Markdown to HTML"""
-        try:
-            with open(input_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-            
-            # Simple markdown to HTML conversion
-            html_content = f"""<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="utf-8">
-    <title>Converted Markdown</title>
-    <style>
-        body {{ font-family: Arial, sans-serif; margin: 40px; line-height: 1.6; }}
-        h1, h2, h3 {{ color: #333; }}
-        code {{ background-color: #f5f5f5; padding: 2px 4px; border-radius: 3px; }}
-        pre {{ background-color: #f5f5f5; padding: 15px; border-radius: 5px; }}
-    </style>
-</head>
-<body>
-    <pre>{content}</pre>
-</body>
-</html>"""
-            
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            
-            return True
-        except Exception as e:
-            logger.error(f"Markdown to HTML error: {str(e)}")
-            return False
+        from utils.markdown_renderer import MarkdownRenderer
+        
+        return MarkdownRenderer(self.render_cache).render_html(input_path, output_path)
     
+    @conversion_step('Markdown to text')
     def _convert_markdown_to_text(self, input_path: str, output_path: str) -> bool:
         """Convert Markdown to text"""
-        try:
-            with open(input_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-            
-            # Simple markdown to text conversion
-            import re
-            # Remove markdown syntax
-            text = re.sub(r'#+\s*', '', content)  # Remove headers
-            text = re.sub(r'\*\*(.*?)\*\*', r'\1', text)  # Remove bold
-            text = re.sub(r'\*(.*?)\*', r'\1', text)  # Remove italic
-            text = re.sub(r'`(.*?)`', r'\1', text)  # Remove inline code
-            text = re.sub(r'\[(.*?)\]\(.*?\)', r'\1', text)  # Remove links
-            
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(text)
-            
-            return True
-        except Exception as e:
-            logger.error(f"Markdown to text error: {str(e)}")
+        from utils.markdown_renderer import MarkdownRenderer
+        
+        return MarkdownRenderer(self.render_cache).render_text(input_path, output_path)
+    
+    @conversion_step('Markdown to PDF')
+    def _convert_markdown_to_pdf(self, input_path: str, output_path: str) -> bool:
+        """Convert Markdown to PDF"""
+        if not self.reportlab_available:
             return False
+        from utils.markdown_renderer import MarkdownRenderer
+        
+        return MarkdownRenderer().render_pdf(input_path, output_path)
     
+    @conversion_step('CSV to JSON')
     def _convert_csv_to_json(self, input_path: str, output_path: str) -> bool:
         """Convert CSV to JSON"""
-        try:
-            data = []
-            with open(input_path, 'r', encoding='utf-8', errors='ignore') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    data.append(row)
-            
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2)
-            
-            return True
-        except Exception as e:
-            logger.error(f"CSV to JSON error: {str(e)}")
-            return False
+        data = []
+        with open(input_path, 'r', encoding='utf-8', errors='ignore') as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                data.append(row)
+        
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        
+        return True
     
+    @conversion_step('JSON to CSV')
     def _convert_json_to_csv(self, input_path: str, output_path: str) -> bool:
         """Convert JSON to CSV"""
-        try:
-            with open(input_path, 'r', encoding='utf-8', errors='ignore') as f:
-                data = json.load(f)
-            
-            if isinstance(data, list) and len(data) > 0:
-                fieldnames = data[0].keys()
-                with open(output_path, 'w', newline='', encoding='utf-8') as f:
-                    writer = csv.DictWriter(f, fieldnames=fieldnames)
-                    writer.writeheader()
-                    writer.writerows(data)
-                return True
-            return False
-        except Exception as e:
-            logger.error(f"JSON to CSV error: {str(e)}")
-            return False
+        with open(input_path, 'r', encoding='utf-8', errors='ignore') as f:
+            data = json.load(f)
+        
+        if isinstance(data, list) and len(data) > 0:
+            fieldnames = data[0].keys()
+            with open(output_path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=fieldnames)
+                writer.writeheader()
+                writer.writerows(data)
+            return True
+        return False
     
+    @conversion_step('JSON to XML')
     def _convert_json_to_xml(self, input_path: str, output_path: str) -> bool:
         """Convert JSON to XML"""
-        try:
-            with open(input_path, 'r', encoding='utf-8', errors='ignore') as f:
-                data = json.load(f)
-            
-            root = ET.Element("root")
-            self._dict_to_xml(data, root)
-            
-            tree = ET.ElementTree(root)
-            tree.write(output_path, encoding='utf-8', xml_declaration=True)
-            return True
-        except Exception as e:
-            logger.error(f"JSON to XML error: {str(e)}")
-            return False
+        with open(input_path, 'r', encoding='utf-8', errors='ignore') as f:
+            data = json.load(f)
+        
+        root = ET.Element("root")
+        self._dict_to_xml(data, root)
+        
+        tree = ET.ElementTree(root)
+        tree.write(output_path, encoding='utf-8', xml_declaration=True)
+        return True
     
+    @conversion_step('XML to JSON')
     def _convert_xml_to_json(self, input_path: str, output_path: str) -> bool:
         """Convert XML to JSON"""
-        try:
-            tree = ET.parse(input_path)
-            root = tree.getroot()
-            
-            data = self._xml_to_dict(root)
-            
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2)
-            return True
-        except Exception as e:
-            logger.error(f"XML to JSON error: {str(e)}")
-            return False
+        tree = ET.parse(input_path)
+        root = tree.getroot()
+        
+        data = self._xml_to_dict(root)
+        
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        return True
     
+    @conversion_step('CSV to XML')
     def _convert_csv_to_xml(self, input_path: str, output_path: str) -> bool:
         """Convert CSV to XML"""
-        try:
-            import csv
-            import xml.etree.ElementTree as ET
-            
-            root = ET.Element("data")
-            
-            with open(input_path, 'r', encoding='utf-8', newline='') as csvfile:
-                reader = csv.DictReader(csvfile)
-                
-                for row in reader:
-                    record = ET.SubElement(root, "record")
-                    for key, value in row.items():
-                        field = ET.SubElement(record, key.replace(' ', '_').lower())
-                        field.text = str(value) if value else ""
-            
-            tree = ET.ElementTree(root)
-            tree.write(output_path, encoding='utf-8', xml_declaration=True)
-            return True
-            
-        except Exception as e:
-            logger.error(f"CSV to XML error: {str(e)}")
-            return False
-
-    def _convert_spreadsheet_to_pdf(self, input_path: str, output_path: str) -> bool:
-        """Convert spreadsheet files to PDF"""
-        try:
-            input_ext = Path(input_path).suffix[1:].lower()
-            
-            if input_ext == 'csv':
-                # Convert CSV to text first, then to PDF
-                temp_txt = output_path.replace('.pdf', '.txt')
-                if self._convert_csv_to_text(input_path, temp_txt):
-                    result = self._convert_text_to_pdf(temp_txt, output_path)
-                    if os.path.exists(temp_txt):
-                        os.remove(temp_txt)
-                    return result
-            
-            return False
-            
-        except Exception as e:
-            logger.error(f"Spreadsheet to PDF error: {str(e)}")
+        import csv
+        import xml.etree.ElementTree as ET
+        
+        root = ET.Element("data")
+        
+        with open(input_path, 'r', encoding='utf-8', newline='') as csvfile:
+            reader = csv.DictReader(csvfile)
+            
+            for row in reader:
+                record = ET.SubElement(root, "record")
+                for key, value in row.items():
+                    field = ET.SubElement(record, key.replace(' ', '_').lower())
+                    field.text = str(value) if value else ""
+        
+        tree = ET.ElementTree(root)
+        tree.write(output_path, encoding='utf-8', xml_declaration=True)
+        return True
+    
+    @conversion_step('Spreadsheet to PDF')
+    def _convert_spreadsheet_to_pdf(self, input_path: str, output_path: str, sheet=None) -> bool:
+        """Convert spreadsheet files to PDF (one sheet of an XLSX, the first by default)"""
+        if not self.reportlab_available:
             return False
-
-    def _convert_csv_to_text(self, input_path: str, output_path: str) -> bool:
-        """Convert CSV to formatted text"""
-        try:
-            import csv
+        
+        input_ext = Path(input_path).suffix[1:].lower()
+        
+        if input_ext == 'csv':
+            from utils.pdf_layout import TablePdfRenderer
             
-            with open(input_path, 'r', encoding='utf-8', newline='') as csvfile:
+            with open(input_path, 'r', encoding='utf-8', errors='replace', newline='') as csvfile:
                 reader = csv.reader(csvfile)
-                
-                with open(output_path, 'w', encoding='utf-8') as txtfile:
-                    for row in reader:
-                        txtfile.write(' | '.join(str(cell) for cell in row) + '\n')
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"CSV to text error: {str(e)}")
-            return False
-
+                return TablePdfRenderer().render(reader, output_path, title=Path(input_path).name)
+        elif input_ext == 'xlsx':
+            from utils.pdf_layout import TablePdfRenderer
+            from utils.xlsx_reader import XlsxReader
+            
+            with XlsxReader(input_path) as reader:
+                # Resolve up front so an unknown sheet fails before anything is rendered
+                name = reader.resolve_sheet(sheet)
+                return TablePdfRenderer().render(reader.iter_rows(name), output_path, title=Path(input_path).name)
+        
+        return False
+    
+    @conversion_step('PDF to DOC')
     def _convert_pdf_to_doc(self, input_path: str, output_path: str) -> bool:
         """Convert PDF to DOC format (simple text-based approach)"""
-        try:
-            # Convert PDF to text first
-            temp_txt = output_path.replace('.doc', '.txt')
-            if self._convert_pdf_to_text(input_path, temp_txt):
-                # Create a simple RTF-like document
-                with open(temp_txt, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # Create a simple document format
-                doc_content = f"""{{\\rtf1\\ansi\\deff0 {{\\fonttbl {{\\f0 Times New Roman;}}}}
+        # Convert PDF to text first, in a spooled intermediate
+        with get_spool().temp_path('.txt', os.path.getsize(input_path), os.path.dirname(output_path)) as temp_txt:
+            if not self._convert_pdf_to_text(input_path, temp_txt):
+                return False
+            with open(temp_txt, 'r', encoding='utf-8') as f:
+                content = f.read()
+        
+        # Create a simple RTF-like document
+        escaped = content.replace('\\', '\\\\').replace('{', '\\{').replace('}', '\\}')
+        doc_content = f"""{{\\rtf1\\ansi\\deff0 {{\\fonttbl {{\\f0 Times New Roman;}}}}
 \\f0\\fs24
-{content.replace('\\', '\\\\').replace('{', '\\{').replace('}', '\\}')}
+{escaped}
 }}"""
-                
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    f.write(doc_content)
-                
-                # Clean up temp file
-                if os.path.exists(temp_txt):
-                    os.remove(temp_txt)
-                
-                return True
-            
-            return False
-            
-        except Exception as e:
-            logger.error(f"PDF to DOC error: {str(e)}")
-            return False
+        
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(doc_content)
+        
+        return True
     
-    def _convert_code_to_html(self, input_path: str, output_path: str, content: str) -> bool:
+    @conversion_step('Code to HTML')
+    def _convert_code_to_html(self, input_path: str, output_path: str) -> bool:
         """Convert code to HTML with syntax highlighting"""
-        try:
-            file_ext = Path(input_path).suffix[1:].lower()
-            
-            html_content = f"""<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="utf-8">
-    <title>Code: {Path(input_path).name}</title>
-    <style>
-        body {{ font-family: 'Courier New', monospace; margin: 40px; background-color: #f8f8f8; }}
-        pre {{ background-color: #ffffff; padding: 20px; border-radius: 5px; border: 1px solid #ddd; overflow-x: auto; }}
-        .filename {{ color: #666; margin-bottom: 10px; }}
-    </style>
-</head>
-<body>
-    <div class="filename">File: {Path(input_path).name}</div>
-    <pre><code>{content}</code></pre>
-</body>
-</html>"""
-            
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            
-            return True
-        except Exception as e:
-            logger.error(f"Code to HTML error: {str(e)}")
-            return False
+        from utils.highlighter import CodeHighlighter
+        
+        path = Path(input_path)
+        highlighter = CodeHighlighter(self.render_cache)
+        return highlighter.render_html(input_path, output_path, path.name, path.suffix[1:].lower(),
+                                       path.stat().st_size)
     
+    @conversion_step('Text extraction')
     def _extract_text_to_file(self, input_path: str, output_path: str) -> bool:
-        """Extract text from various file formats"""
-        try:
-            with open(input_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-            
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            
+        """Write the text of a text-based source (plain text, code, HTML, Markdown)
+
+        Binary and markup formats without an extractor here (doc, rtf, ...)
+        fail instead of being copied into a .txt as they are.
+        """
+        input_ext = Path(input_path).suffix[1:].lower()
+        if input_ext in ['html', 'htm']:
+            return self._convert_html_to_text(input_path, output_path)
+        if input_ext == 'md':
+            return self._convert_markdown_to_text(input_path, output_path)
+        if input_ext == 'txt' or input_ext in CODE_FORMATS:
+            # Plain-text sources are copied byte for byte, never through Python memory
+            fast_copy(input_path, output_path)
             return True
-        except Exception as e:
-            logger.error(f"Text extraction error: {str(e)}")
-            return False
+        logger.warning(f"No text extractor for .{input_ext} files")
+        return False
     
+    @conversion_step('Convert to HTML')
     def _convert_to_html(self, input_path: str, output_path: str) -> bool:
         """Convert various formats to HTML"""
-        try:
-            with open(input_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-            
-            html_content = f"""<!DOCTYPE html>
+        with open(input_path, 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+        
+        html_content = f"""<!DOCTYPE html>
 <html>
 <head>
     <meta charset="utf-8">
@@ -968,42 +837,31 @@ class FileConverter:
     <pre>{content}</pre>
 </body>
 </html>"""
-            
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            
-            return True
-        except Exception as e:
-            logger.error(f"Convert to HTML error: {str(e)}")
-            return False
+        
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(html_content)
+        
+        return True
     
+    @conversion_step('Convert to PDF')
     def _convert_to_pdf(self, input_path: str, output_path: str) -> bool:
         """Convert various formats to PDF"""
-        try:
-            # Extract text and convert to PDF
-            return self._extract_text_to_file(input_path, output_path.replace('.pdf', '.txt')) and \
-                   self._convert_text_to_pdf(output_path.replace('.pdf', '.txt'), output_path)
-        except Exception as e:
-            logger.error(f"Convert to PDF error: {str(e)}")
-            return False
+        # Extract text into a spooled intermediate and convert that to PDF
+        with get_spool().temp_path('.txt', os.path.getsize(input_path), os.path.dirname(output_path)) as temp_txt:
+            return self._extract_text_to_file(input_path, temp_txt) and \
+                   self._convert_text_to_pdf(temp_txt, output_path)
     
+    @conversion_step('Convert from PDF')
     def _convert_from_pdf(self, input_path: str, output_path: str, target_format: str) -> bool:
         """Convert PDF to various formats"""
-        try:
-            if target_format == 'txt':
-                return self._convert_pdf_to_text(input_path, output_path)
-            elif target_format == 'html':
-                # Convert to text first, then to HTML
-                temp_txt = output_path.replace('.html', '.txt')
+        if target_format == 'txt':
+            return self._convert_pdf_to_text(input_path, output_path)
+        elif target_format == 'html':
+            # Convert to text first, then to HTML
+            with get_spool().temp_path('.txt', os.path.getsize(input_path), os.path.dirname(output_path)) as temp_txt:
                 if self._convert_pdf_to_text(input_path, temp_txt):
-                    result = self._convert_text_to_html(temp_txt, output_path)
-                    if os.path.exists(temp_txt):
-                        os.remove(temp_txt)
-                    return result
-            return False
-        except Exception as e:
-            logger.error(f"Convert from PDF error: {str(e)}")
-            return False
+                    return self._convert_text_to_html(temp_txt, output_path)
+        return False
     
     def _dict_to_xml(self, data, parent):
         """Helper method to convert dictionary to XML"""
@@ -1058,17 +916,21 @@ class FileConverter:
             'pdf': ['jpg', 'jpeg', 'png', 'gif', 'bmp', 'tiff', 'tif', 'webp', 'ico', 'svg', 'txt', 'html', 'docx', 'doc'],
             'txt': ['pdf', 'html', 'md'],
             'docx': ['pdf', 'txt', 'html'],
-            'doc': ['pdf', 'txt', 'html'],
-            'rtf': ['pdf', 'txt', 'html'],
+            'doc': ['pdf', 'txt', 'html', 'docx'],
+            'rtf': ['pdf', 'txt', 'html', 'docx'],
             'md': ['pdf', 'html', 'txt'],
             'html': ['pdf', 'txt', 'md'],
             'htm': ['pdf', 'txt', 'md'],
             
             # Spreadsheet formats
-            'xlsx': ['csv', 'json', 'xml', 'pdf'],
+            'xlsx': ['csv', 'json', 'ndjson', 'xml', 'pdf', 'zip'],
             'xls': ['csv', 'json', 'xml', 'pdf'],
             'csv': ['json', 'xml', 'pdf'],
             
+            # Presentation formats
+            'pptx': ['pdf'],
+            'ppt': ['pdf', 'pptx'],
+            
             # Data formats
             'json': ['xml', 'csv'],
             'xml': ['json', 'csv'],
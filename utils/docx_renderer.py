@@ -0,0 +1,291 @@
+import io
+import logging
+from xml.sax.saxutils import escape
+from utils.pdf_layout import StreamingStory, paragraph_style, sample_styles
+
+logger = logging.getLogger(__name__)
+
+W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+A_NS = 'http://schemas.openxmlformats.org/drawingml/2006/main'
+R_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+WP_NS = 'http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing'
+
+def _w(tag: str) -> str:
+    return f'{{{W_NS}}}{tag}'
+
+EMU_PER_POINT = 12700
+
+HEADING_STYLES = {
+    'title': 'Title',
+    'subtitle': 'Heading2',
+    'heading 1': 'Heading1',
+    'heading 2': 'Heading2',
+    'heading 3': 'Heading3',
+    'heading 4': 'Heading4',
+    'heading 5': 'Heading5',
+    'heading 6': 'Heading6',
+}
+
+def _make_lazy_image_class():
+    """Build the lazy image flowable once ReportLab has been imported"""
+    from reportlab.platypus import Flowable
+    
+    class LazyImage(Flowable):
+        """Image flowable that only decodes the embedded blob when drawn"""
+        
+        def __init__(self, image_part, width: float, height: float):
+            super().__init__()
+            self.image_part = image_part
+            self.img_width = width
+            self.img_height = height
+        
+        def wrap(self, avail_width, avail_height):
+            # Scale down to the frame using the size recorded in the DOCX,
+            # so layout never needs the pixels.
+            scale = min(1.0, avail_width / self.img_width) if self.img_width else 1.0
+            if self.img_height * scale > avail_height > 0:
+                scale = min(scale, avail_height / self.img_height)
+            self.draw_width = self.img_width * scale
+            self.draw_height = self.img_height * scale
+            return self.draw_width, self.draw_height
+        
+        def draw(self):
+            from reportlab.lib.utils import ImageReader
+            reader = ImageReader(io.BytesIO(self.image_part.blob))
+            self.canv.drawImage(reader, 0, 0, self.draw_width, self.draw_height, mask='auto')
+    
+    return LazyImage
+
+class DocxPdfRenderer:
+    """Renders a DOCX body (paragraphs, runs, tables, inline images) straight into a PDF"""
+    
+    def __init__(self):
+        self.base_styles = sample_styles()
+        self._style_cache = {}
+        self._lazy_image_class = None
+    
+    def render(self, input_path: str, output_path: str) -> bool:
+        """Walk the document body once and stream the flowables into the PDF"""
+        from docx import Document
+        from reportlab.platypus import SimpleDocTemplate
+        
+        document = Document(input_path)
+        page = self._page_geometry(document)
+        
+        doc = SimpleDocTemplate(output_path, **page)
+        doc.build(StreamingStory(self._iter_body(document, doc.width)))
+        return True
+    
+    def _page_geometry(self, document) -> dict:
+        """Take page size and margins from the first section"""
+        from reportlab.lib.pagesizes import A4
+        
+        geometry = {'pagesize': A4, 'leftMargin': 72, 'rightMargin': 72, 'topMargin': 72, 'bottomMargin': 72}
+        try:
+            section = document.sections[0]
+            if section.page_width and section.page_height:
+                geometry['pagesize'] = (section.page_width.pt, section.page_height.pt)
+            for key, value in (('leftMargin', section.left_margin), ('rightMargin', section.right_margin),
+                               ('topMargin', section.top_margin), ('bottomMargin', section.bottom_margin)):
+                if value is not None:
+                    geometry[key] = value.pt
+        except (IndexError, AttributeError):
+            pass
+        return geometry
+    
+    def _iter_body(self, document, frame_width: float):
+        """Map body elements to flowables in document order"""
+        from docx.table import Table as DocxTable
+        from docx.text.paragraph import Paragraph as DocxParagraph
+        
+        for element in document.element.body.iterchildren():
+            if element.tag == _w('p'):
+                yield from self._paragraph_flowables(DocxParagraph(element, document))
+            elif element.tag == _w('tbl'):
+                table = self._table_flowable(DocxTable(element, document), frame_width)
+                if table is not None:
+                    yield table
+    
+    def _paragraph_flowables(self, paragraph):
+        """Convert one paragraph into text, image and page-break flowables"""
+        from reportlab.platypus import PageBreak, Paragraph, Spacer
+        
+        markup, images, page_break = self._runs_markup(paragraph)
+        style = self._paragraph_style(paragraph)
+        
+        if markup.strip():
+            if paragraph.style is not None and paragraph.style.name.lower().startswith('list'):
+                markup = '\u2022 ' + markup
+            try:
+                yield Paragraph(markup, style)
+            except ValueError:
+                # Malformed markup from unusual run content; fall back to plain text
+                yield Paragraph(escape(paragraph.text), style)
+        elif not images and not page_break:
+            yield Spacer(1, style.fontSize * 0.6)
+        
+        for image in images:
+            yield image
+        if page_break:
+            yield PageBreak()
+    
+    def _runs_markup(self, paragraph):
+        """Build ReportLab inline markup from the paragraph runs"""
+        from docx.text.run import Run
+        
+        parts = []
+        images = []
+        page_break = False
+        
+        run_elements = []
+        for child in paragraph._p.iterchildren():
+            if child.tag == _w('r'):
+                run_elements.append(child)
+            elif child.tag == _w('hyperlink'):
+                run_elements.extend(c for c in child.iterchildren() if c.tag == _w('r'))
+        
+        for r_element in run_elements:
+            run = Run(r_element, paragraph)
+            text_parts = []
+            for node in r_element.iterchildren():
+                if node.tag == _w('t'):
+                    text_parts.append(escape(node.text or ''))
+                elif node.tag == _w('tab'):
+                    text_parts.append('&nbsp;' * 4)
+                elif node.tag == _w('br'):
+                    if node.get(_w('type')) == 'page':
+                        page_break = True
+                    else:
+                        text_parts.append('<br/>')
+                elif node.tag == _w('drawing'):
+                    images.extend(self._drawing_images(node, paragraph.part))
+            
+            text = ''.join(text_parts)
+            if text:
+                parts.append(self._wrap_run(run, text))
+        
+        return ''.join(parts), images, page_break
+    
+    def _wrap_run(self, run, text: str) -> str:
+        """Apply run-level formatting as inline tags"""
+        font = run.font
+        attrs = []
+        if font.size is not None:
+            attrs.append(f'size="{font.size.pt:g}"')
+        try:
+            if font.color.type is not None and font.color.rgb is not None:
+                attrs.append(f'color="#{font.color.rgb}"')
+        except (AttributeError, ValueError):
+            pass
+        if attrs:
+            text = f'<font {" ".join(attrs)}>{text}</font>'
+        if run.bold:
+            text = f'<b>{text}</b>'
+        if run.italic:
+            text = f'<i>{text}</i>'
+        if run.underline:
+            text = f'<u>{text}</u>'
+        if font.strike:
+            text = f'<strike>{text}</strike>'
+        if font.superscript:
+            text = f'<super>{text}</super>'
+        elif font.subscript:
+            text = f'<sub>{text}</sub>'
+        return text
+    
+    def _drawing_images(self, drawing, part) -> list:
+        """Create lazy image flowables for the pictures inside a w:drawing"""
+        if self._lazy_image_class is None:
+            self._lazy_image_class = _make_lazy_image_class()
+        
+        images = []
+        extent = drawing.find(f'.//{{{WP_NS}}}extent')
+        for blip in drawing.iter(f'{{{A_NS}}}blip'):
+            rel_id = blip.get(f'{{{R_NS}}}embed')
+            if not rel_id or rel_id not in part.related_parts:
+                continue
+            if extent is None:
+                continue
+            width = int(extent.get('cx', 0)) / EMU_PER_POINT
+            height = int(extent.get('cy', 0)) / EMU_PER_POINT
+            if width <= 0 or height <= 0:
+                continue
+            images.append(self._lazy_image_class(part.related_parts[rel_id], width, height))
+        return images
+    
+    def _paragraph_style(self, paragraph):
+        """Return the ReportLab style for a DOCX paragraph style, converting each style once"""
+        from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY, TA_LEFT, TA_RIGHT
+        
+        docx_style = paragraph.style
+        style_name = docx_style.name if docx_style is not None else 'Normal'
+        alignment = paragraph.alignment
+        key = (style_name, alignment)
+        
+        cached = self._style_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        parent = HEADING_STYLES.get(style_name.lower(), 'Normal')
+        overrides = {}
+        try:
+            if docx_style is not None and docx_style.font.size is not None and style_name.lower() not in HEADING_STYLES:
+                overrides['fontSize'] = docx_style.font.size.pt
+                overrides['leading'] = docx_style.font.size.pt * 1.2
+        except AttributeError:
+            pass
+        
+        alignments = {0: TA_LEFT, 1: TA_CENTER, 2: TA_RIGHT, 3: TA_JUSTIFY}
+        if alignment is not None and int(alignment) in alignments:
+            overrides['alignment'] = alignments[int(alignment)]
+        
+        style = paragraph_style(f'docx-{style_name}-{alignment}', parent, spaceAfter=6, **overrides)
+        self._style_cache[key] = style
+        return style
+    
+    def _table_flowable(self, table, frame_width: float):
+        """Convert a DOCX table into a ReportLab table of paragraphs"""
+        from reportlab.lib import colors
+        from reportlab.platypus import Paragraph, Table, TableStyle
+        
+        cell_style = self.base_styles['BodyText']
+        data = []
+        for row in table.rows:
+            cells = []
+            for cell in row.cells:
+                text = '<br/>'.join(escape(p.text) for p in cell.paragraphs if p.text)
+                cells.append(Paragraph(text, cell_style))
+            data.append(cells)
+        
+        if not data:
+            return None
+        
+        column_count = max(len(row) for row in data)
+        for row in data:
+            row.extend(Paragraph('', cell_style) for _ in range(column_count - len(row)))
+        
+        col_widths = self._table_column_widths(table, column_count, frame_width)
+        flowable = Table(data, colWidths=col_widths, repeatRows=0)
+        flowable.setStyle(TableStyle([
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ]))
+        return flowable
+    
+    def _table_column_widths(self, table, column_count: int, frame_width: float) -> list:
+        """Use the table grid widths from the DOCX, scaled to the frame"""
+        widths = []
+        grid = table._tbl.find(_w('tblGrid'))
+        if grid is not None:
+            for col in grid.iterchildren():
+                try:
+                    widths.append(int(col.get(_w('w'))) / 20.0)  # twips to points
+                except (TypeError, ValueError):
+                    widths.append(0)
+        
+        if len(widths) != column_count or not all(widths):
+            return [frame_width / column_count] * column_count
+        
+        total = sum(widths)
+        scale = min(1.0, frame_width / total)
+        return [width * scale for width in widths]
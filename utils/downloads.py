@@ -0,0 +1,199 @@
+import os
+import shutil
+import hashlib
+import logging
+import mimetypes
+import threading
+from collections import OrderedDict
+from flask import Response, request, send_file
+from werkzeug.wsgi import wrap_file
+from config import Config
+from utils import compression
+from utils.storage_layout import sharded_path
+
+logger = logging.getLogger(__name__)
+
+# Types the mimetypes module does not know (or gets wrong) for our outputs
+EXTRA_MIMETYPES = {
+    'md': 'text/markdown',
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+    'yaml': 'application/yaml',
+    'yml': 'application/yaml',
+    'toml': 'application/toml',
+    'log': 'text/plain',
+    'webp': 'image/webp',
+    'ico': 'image/vnd.microsoft.icon',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'pptx': 'application/vnd.openxmlformats-officedocument.presentationml.presentation',
+}
+
+def guess_mimetype(filename: str) -> str:
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    mimetype = EXTRA_MIMETYPES.get(extension) or mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    if mimetype.startswith('text/') or mimetype in ('application/json', 'application/xml', 'image/svg+xml'):
+        mimetype += '; charset=utf-8'
+    return mimetype
+
+class DownloadManager:
+    """Serves converted files with content-hash ETags, Range and optional proxy offload"""
+    
+    def __init__(self, folder: str = None, max_cached_etags: int = 4096):
+        self.folder = os.path.abspath(folder or Config.CONVERTED_FOLDER)
+        self.offload = Config.DOWNLOAD_OFFLOAD.lower()
+        self.accel_prefix = Config.DOWNLOAD_ACCEL_PREFIX.rstrip('/') + '/'
+        self.max_age = Config.DOWNLOAD_MAX_AGE
+        self.max_cached_etags = max_cached_etags
+        self._etags = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def locate(self, filename: str) -> tuple:
+        """Path and stat of a converted file; (None, None) when it is missing"""
+        # The flat path covers files written before the sharded layout, until migrated
+        for file_path in (sharded_path(self.folder, filename), os.path.join(self.folder, filename)):
+            try:
+                return file_path, os.stat(file_path)
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+        return None, None
+    
+    def stat(self, filename: str):
+        """One stat per request; None when the file is missing"""
+        return self.locate(filename)[1]
+    
+    def content_etag(self, file_path: str, st) -> str:
+        """sha256 of the content, computed once per file version"""
+        key = (file_path, st.st_ino, st.st_size, st.st_mtime_ns)
+        with self._lock:
+            etag = self._etags.get(key)
+            if etag is not None:
+                self._etags.move_to_end(key)
+                return etag
+        
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        etag = digest.hexdigest()
+        
+        with self._lock:
+            self._etags[key] = etag
+            while len(self._etags) > self.max_cached_etags:
+                self._etags.popitem(last=False)
+        return etag
+    
+    def send(self, filename: str, download_name: str):
+        """Build the download response, honouring If-None-Match, Range and Accept-Encoding"""
+        file_path, st = self.locate(filename)
+        if st is None:
+            return None
+        
+        etag = self.content_etag(file_path, st)
+        mimetype = guess_mimetype(download_name)
+        
+        if self.offload in ('x-accel', 'x-sendfile'):
+            # The fronting proxy streams the bytes (and handles Range itself)
+            if request.if_none_match.contains(etag):
+                response = Response(status=304)
+            else:
+                response = Response(mimetype=mimetype)
+                if self.offload == 'x-accel':
+                    response.headers['X-Accel-Redirect'] = self.accel_prefix + os.path.relpath(file_path, self.folder)
+                else:
+                    response.headers['X-Sendfile'] = file_path
+                response.headers['Content-Disposition'] = attachment_header(download_name)
+            response.set_etag(etag)
+            response.last_modified = st.st_mtime
+            return self._private(response)
+        
+        if not compression.is_compressible(download_name):
+            return self._send_file(file_path, mimetype, download_name, etag, st)
+        
+        # Large outputs have precompressed sidecars; Range then applies to the encoded bytes
+        sidecars = compression.sidecar_encodings(file_path, st)
+        encoding = compression.negotiate(request.accept_encodings, sidecars)
+        if encoding:
+            response = self._send_file(file_path + compression.SIDECAR_SUFFIXES[encoding], mimetype,
+                                       download_name, f'{etag}-{encoding}', st)
+            response.headers['Content-Encoding'] = encoding
+        elif (Config.COMPRESS_MIN_BYTES <= st.st_size < Config.COMPRESS_SIDECAR_MIN_BYTES
+              and not request.range):
+            encoding = compression.negotiate(request.accept_encodings, compression.available_encodings())
+            response = self._stream_compressed(file_path, mimetype, download_name, etag, st, encoding)
+        else:
+            response = self._send_file(file_path, mimetype, download_name, etag, st)
+        response.vary.add('Accept-Encoding')
+        return response
+    
+    def _send_file(self, path: str, mimetype: str, download_name: str, etag: str, st):
+        response = send_file(
+            path,
+            mimetype=mimetype,
+            as_attachment=True,
+            download_name=download_name,
+            conditional=True,
+            etag=etag,
+            last_modified=st.st_mtime,
+            max_age=self.max_age
+        )
+        return self._private(response)
+    
+    def _stream_compressed(self, file_path: str, mimetype: str, download_name: str, etag: str, st, encoding: str):
+        """Small text outputs are encoded on the fly instead of keeping sidecars"""
+        if not encoding:
+            return self._send_file(file_path, mimetype, download_name, etag, st)
+        response = Response(compression.iter_compressed(file_path, encoding), mimetype=mimetype)
+        response.headers['Content-Encoding'] = encoding
+        response.headers['Content-Disposition'] = attachment_header(download_name)
+        response.set_etag(f'{etag}-{encoding}')
+        response.last_modified = st.st_mtime
+        response.make_conditional(request)
+        return self._private(response)
+    
+    def _private(self, response):
+        # Converted files belong to one user; shared caches must not keep them
+        response.cache_control.public = False
+        response.cache_control.private = True
+        response.cache_control.max_age = self.max_age
+        return response
+
+def send_ephemeral(file_path: str, download_name: str, scratch_dir: str = None):
+    """Stream a file that must not outlive the response
+
+    The file is opened and its scratch directory removed before the first
+    byte is sent; the open descriptor keeps the data readable, so nothing is
+    left on disk even if the client goes away mid-transfer.
+    """
+    f = open(file_path, 'rb')
+    try:
+        size = os.fstat(f.fileno()).st_size
+    finally:
+        if scratch_dir:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+        else:
+            os.remove(file_path)
+    
+    # wsgi.file_wrapper lets gunicorn use sendfile on the open descriptor
+    response = Response(
+        wrap_file(request.environ, f, Config.INGEST_CHUNK_BYTES),
+        mimetype=guess_mimetype(download_name),
+        direct_passthrough=True
+    )
+    response.content_length = size
+    response.headers['Content-Disposition'] = attachment_header(download_name)
+    response.cache_control.no_store = True
+    return response
+
+def attachment_header(download_name: str) -> str:
+    from werkzeug.http import dump_options_header
+    from urllib.parse import quote
+    
+    try:
+        download_name.encode('ascii')
+        return dump_options_header('attachment', {'filename': download_name})
+    except UnicodeEncodeError:
+        return dump_options_header('attachment', {
+            'filename': download_name.encode('ascii', 'ignore').decode('ascii') or 'download',
+            'filename*': f"UTF-8''{quote(download_name, safe='')}",
+        })
@@ -0,0 +1,100 @@
+import os
+import time
+import fcntl
+import sqlite3
+import logging
+import threading
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS expiry (
+    path TEXT PRIMARY KEY,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS expiry_due ON expiry (expires_at);
+"""
+
+class ExpiryIndex:
+    """SQLite table of (path, expires_at) shared by every worker process
+
+    Finding what is due is an index range scan, so the cost of a cleanup
+    pass follows the number of expiring files, not the number stored.
+    """
+    
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or Config.CLEANUP_INDEX_PATH
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+    
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread and process; connections must not cross a fork
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+    
+    def schedule(self, path: str, expires_at: float):
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT INTO expiry (path, expires_at) VALUES (?, ?) '
+                'ON CONFLICT(path) DO UPDATE SET expires_at = excluded.expires_at',
+                (os.path.abspath(path), expires_at)
+            )
+    
+    def cancel(self, path: str):
+        with self._connect() as conn:
+            conn.execute('DELETE FROM expiry WHERE path = ?', (os.path.abspath(path),))
+    
+    def rename(self, old_path: str, new_path: str):
+        with self._connect() as conn:
+            conn.execute('UPDATE OR REPLACE expiry SET path = ? WHERE path = ?',
+                         (os.path.abspath(new_path), os.path.abspath(old_path)))
+    
+    def due(self, now: float = None, limit: int = 500) -> list:
+        """Paths whose expiry has passed, oldest first"""
+        rows = self._connect().execute(
+            'SELECT path FROM expiry WHERE expires_at <= ? ORDER BY expires_at LIMIT ?',
+            (now if now is not None else time.time(), limit)
+        ).fetchall()
+        return [row[0] for row in rows]
+    
+    def remove(self, paths: list):
+        with self._connect() as conn:
+            conn.executemany('DELETE FROM expiry WHERE path = ?', [(path,) for path in paths])
+    
+    def count(self) -> int:
+        return self._connect().execute('SELECT COUNT(*) FROM expiry').fetchone()[0]
+
+class CleanerElection:
+    """Non-blocking flock: whichever process holds it is the only cleaner"""
+    
+    def __init__(self, lock_path: str):
+        self.lock_path = lock_path
+        self._file = None
+    
+    def try_acquire(self) -> bool:
+        if self._file is not None:
+            return True
+        lock_file = open(self.lock_path, 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._file = lock_file
+        logger.info(f"Cleanup leadership acquired by pid {os.getpid()}")
+        return True
+    
+    def release(self):
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
@@ -0,0 +1,76 @@
+import os
+import errno
+import shutil
+import logging
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Extensions that name the same format
+FORMAT_ALIASES = {'jpeg': 'jpg', 'tif': 'tiff', 'htm': 'html', 'yml': 'yaml'}
+
+# Errors that mean "this copy method is not supported here", not a failed copy
+_UNSUPPORTED = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EPERM, errno.EBADF}
+
+def canonical_format(extension: str) -> str:
+    extension = extension.lower()
+    return FORMAT_ALIASES.get(extension, extension)
+
+def fast_copy(src: str, dst: str, allow_link: bool = None) -> str:
+    """Copy src to dst in the kernel and return the method used
+
+    Tries a hardlink first, then copy_file_range (reflink-capable), then
+    sendfile, and only falls back to a buffered copy when none are available.
+    """
+    if allow_link is None:
+        allow_link = Config.FAST_COPY_HARDLINK
+    if allow_link:
+        try:
+            os.link(src, dst)
+            return 'link'
+        except OSError:
+            pass
+    
+    with open(src, 'rb') as source, open(dst, 'wb') as target:
+        size = os.fstat(source.fileno()).st_size
+        in_fd, out_fd = source.fileno(), target.fileno()
+        
+        if hasattr(os, 'copy_file_range') and _copy_loop(os.copy_file_range, in_fd, out_fd, size):
+            return 'copy_file_range'
+        if hasattr(os, 'sendfile') and _sendfile_loop(in_fd, out_fd, size):
+            return 'sendfile'
+        
+        source.seek(0)
+        target.seek(0)
+        target.truncate()
+        shutil.copyfileobj(source, target, 1024 * 1024)
+        return 'buffered'
+
+def _copy_loop(copy_range, in_fd: int, out_fd: int, size: int) -> bool:
+    """Run copy_file_range to completion; False if the kernel/filesystem refuses it"""
+    copied = 0
+    while copied < size:
+        try:
+            sent = copy_range(in_fd, out_fd, size - copied, copied, copied)
+        except OSError as e:
+            if copied == 0 and e.errno in _UNSUPPORTED:
+                return False
+            raise
+        if sent == 0:
+            break
+        copied += sent
+    return True
+
+def _sendfile_loop(in_fd: int, out_fd: int, size: int) -> bool:
+    copied = 0
+    while copied < size:
+        try:
+            sent = os.sendfile(out_fd, in_fd, copied, size - copied)
+        except OSError as e:
+            if copied == 0 and e.errno in _UNSUPPORTED:
+                return False
+            raise
+        if sent == 0:
+            break
+        copied += sent
+    return True
@@ -4,6 +4,8 @@ import logging
 from pathlib import Path
 from werkzeug.datastructures import FileStorage
 from config import Config
+from utils.spool import get_spool
+from utils.storage_layout import sharded_path
 
 logger = logging.getLogger(__name__)
 
@@ -21,25 +23,41 @@ class FileHandler:
     def save_uploaded_file(self, file: FileStorage, filename: str) -> str:
         """Save uploaded file to upload folder"""
         try:
-            file_path = os.path.join(self.upload_folder, filename)
-            file.save(file_path)
-            logger.info(f"File saved: {filename}")
+            from utils.ingest import IngestWriter
+            
+            if isinstance(file.stream, IngestWriter) and get_spool().owns(file.stream.path):
+                # Small uploads stay on the RAM spool they were streamed to
+                file_path = get_spool().path_for(filename)
+            else:
+                file_path = self.get_upload_path(filename)
+            
+            if isinstance(file.stream, IngestWriter):
+                # Already on disk from streaming ingestion: just rename it into place
+                file.stream.commit(file_path)
+                logger.debug("File saved: %s (sha256 %s)", filename, file.stream.sha256)
+            else:
+                file.save(file_path)
+                logger.debug("File saved: %s", filename)
             return file_path
         except Exception as e:
             logger.error(f"Error saving file {filename}: {e}")
             raise
     
+    def get_upload_path(self, filename: str) -> str:
+        """Get full (sharded) path for an uploaded file, creating its directory"""
+        return sharded_path(self.upload_folder, filename, create=True)
+    
     def get_output_path(self, filename: str) -> str:
-        """Get full path for output file"""
-        return os.path.join(self.converted_folder, filename)
+        """Get full (sharded) path for output file, creating its directory"""
+        return sharded_path(self.converted_folder, filename, create=True)
     
     def delete_file(self, file_path: str) -> bool:
         """Delete a file safely"""
         try:
-            if os.path.exists(file_path):
-                os.remove(file_path)
-                logger.info(f"File deleted: {file_path}")
-                return True
+            os.remove(file_path)
+            logger.debug("File deleted: %s", file_path)
+            return True
+        except FileNotFoundError:
             return False
         except Exception as e:
             logger.error(f"Error deleting file {file_path}: {e}")
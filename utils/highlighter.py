@@ -0,0 +1,149 @@
+import logging
+from functools import lru_cache
+from html import escape
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Pygments lexer alias for each code extension we accept
+LEXER_ALIASES = {
+    'py': 'python', 'js': 'javascript', 'css': 'css', 'php': 'php', 'java': 'java',
+    'cpp': 'cpp', 'c': 'c', 'cs': 'csharp', 'rb': 'ruby', 'go': 'go', 'rs': 'rust',
+    'ini': 'ini', 'cfg': 'ini', 'conf': 'ini', 'yaml': 'yaml', 'yml': 'yaml', 'toml': 'toml',
+    'log': 'text',
+}
+
+# Extra lexer options per alias
+LEXER_OPTIONS = {
+    'php': {'startinline': True},  # highlight files that omit the opening <?php
+}
+
+PAGE_HEADER = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>Code: {name}</title>
+    <style>
+        body {{ font-family: 'Courier New', monospace; margin: 40px; background-color: #f8f8f8; }}
+        pre {{ background-color: #ffffff; padding: 20px; border-radius: 5px; border: 1px solid #ddd; overflow-x: auto; }}
+        .filename {{ color: #666; margin-bottom: 10px; }}
+{styles}
+    </style>
+</head>
+<body>
+    <div class="filename">File: {name}</div>
+    <pre class="highlight"><code>"""
+
+PAGE_FOOTER = """</code></pre>
+</body>
+</html>
+"""
+
+@lru_cache(maxsize=1)
+def pygments_available() -> bool:
+    try:
+        import pygments
+        return True
+    except ImportError:
+        return False
+
+@lru_cache(maxsize=None)
+def get_lexer(extension: str):
+    """Return the lexer for an extension, building it once per process"""
+    if not pygments_available():
+        return None
+    from pygments.lexers import get_lexer_by_name
+    from pygments.util import ClassNotFound
+    
+    alias = LEXER_ALIASES.get(extension.lower(), 'text')
+    try:
+        # Keep newlines exactly as they are: the source is lexed in chunks
+        return get_lexer_by_name(alias, stripnl=False, ensurenl=False, **LEXER_OPTIONS.get(alias, {}))
+    except ClassNotFound:
+        return None
+
+@lru_cache(maxsize=1)
+def _formatter():
+    from pygments.formatters import HtmlFormatter
+    return HtmlFormatter(nowrap=True)
+
+@lru_cache(maxsize=1)
+def _style_defs() -> str:
+    if not pygments_available():
+        return ''
+    return _formatter().get_style_defs('.highlight')
+
+def iter_chunks(source, chunk_size: int):
+    """Yield runs of whole lines of at least chunk_size characters
+
+    A chunk only ends before an unindented line that follows a blank line,
+    which is where lexer state (strings, comments, blocks) is almost always
+    back at the top level.
+    """
+    lines = []
+    size = 0
+    previous_blank = False
+    for line in source:
+        if size >= chunk_size and previous_blank and line[:1] not in (' ', '\t', '\n', '\r', ''):
+            yield ''.join(lines)
+            lines = []
+            size = 0
+        lines.append(line)
+        size += len(line)
+        previous_blank = not line.strip()
+    if lines:
+        yield ''.join(lines)
+
+class CodeHighlighter:
+    """Streams source files into highlighted HTML pages"""
+    
+    def __init__(self, cache=None, max_bytes: int = None, chunk_size: int = None):
+        self.cache = cache
+        self.max_bytes = max_bytes if max_bytes is not None else Config.HIGHLIGHT_MAX_BYTES
+        self.chunk_size = chunk_size or Config.HIGHLIGHT_CHUNK_BYTES
+    
+    def render_html(self, input_path: str, output_path: str, name: str, extension: str, size: int) -> bool:
+        """Write a highlighted page; huge files or missing Pygments get escaped plain text"""
+        lexer = get_lexer(extension) if size <= self.max_bytes else None
+        header = PAGE_HEADER.format(name=escape(name), styles=_style_defs() if lexer is not None else '')
+        
+        key = None
+        if self.cache is not None and lexer is not None:
+            key = self.cache.file_digest(input_path, f'code-html:{extension}')
+            cached = self.cache.get(key)
+            if cached is not None:
+                with open(output_path, 'w', encoding='utf-8') as out:
+                    out.write(header)
+                    out.write(cached)
+                    out.write(PAGE_FOOTER)
+                return True
+        
+        with open(input_path, 'r', encoding='utf-8', errors='replace') as source, \
+                open(output_path, 'w', encoding='utf-8') as out:
+            out.write(header)
+            if lexer is None:
+                for chunk in iter_chunks(source, self.chunk_size):
+                    out.write(escape(chunk, quote=False))
+            else:
+                body = self._highlight(source, lexer, out, collect=key is not None)
+                if body is not None:
+                    self.cache.put(key, body)
+            out.write(PAGE_FOOTER)
+        return True
+    
+    def _highlight(self, source, lexer, out, collect: bool = False):
+        """Highlight chunk by chunk into out; return the markup when it is small enough to cache"""
+        from pygments import format as format_tokens
+        
+        formatter = _formatter()
+        collected = [] if collect else None
+        collected_size = 0
+        for chunk in iter_chunks(source, self.chunk_size):
+            markup = format_tokens(lexer.get_tokens(chunk), formatter)
+            out.write(markup)
+            if collected is not None:
+                collected.append(markup)
+                collected_size += len(markup)
+                if collected_size > self.cache.max_entry_bytes:
+                    collected = None
+        return ''.join(collected) if collected is not None else None
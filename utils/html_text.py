@@ -0,0 +1,221 @@
+import re
+import logging
+from html import unescape
+
+logger = logging.getLogger(__name__)
+
+# Elements whose content never reaches the text output
+SKIP_TAGS = {'script', 'style', 'noscript', 'template', 'iframe', 'object'}
+
+# Elements that start and end on their own line
+BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'caption', 'dd', 'div', 'dl', 'dt',
+    'fieldset', 'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5',
+    'h6', 'header', 'hr', 'li', 'main', 'nav', 'ol', 'p', 'pre', 'section', 'table',
+    'title', 'tr', 'ul',
+}
+
+# Blocks that get a blank line around them rather than a single line break
+PARAGRAPH_TAGS = {'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'blockquote', 'pre', 'table', 'title'}
+
+# Tags that change the text layout; every other tag only separates text
+LAYOUT_TAGS = BLOCK_TAGS | SKIP_TAGS | {'br', 'td', 'th', 'pre'}
+
+# Text run followed by one markup token (comment, CDATA, doctype/PI or tag)
+_TOKEN = re.compile(
+    r'([^<]*)(?:<!--.*?-->|<!\[CDATA\[.*?\]\]>|<!(?!--|\[CDATA\[)[^>]*>|<\?[^>]*>'
+    r'|<(/?)([a-zA-Z][a-zA-Z0-9:-]*)((?:[^>"\']|"[^"]*"|\'[^\']*\')*)>)',
+    re.S
+)
+_SKIP_END = {tag: re.compile(rf'</{tag}\s*>', re.I) for tag in SKIP_TAGS}
+# Comments and CDATA left open at the end of a chunk are skipped the same way
+_SKIP_END.update({'<!--': re.compile('-->'), '<![CDATA[': re.compile(r'\]\]>')})
+_PARTIAL_ENTITY = re.compile(r'&[#a-zA-Z0-9]{0,31}$')
+
+# Longest unterminated '<' kept across chunks before it is treated as text
+MAX_PENDING_MARKUP = 64 * 1024
+
+class HtmlTextExtractor:
+    """Incremental HTML to text converter that writes as it parses
+
+    Markup is tokenized with one compiled pattern over each chunk; only an
+    unterminated tag or entity at the end of a chunk is carried over, and
+    script/style bodies, comments and CDATA are skipped by searching for
+    their end, however many chunks later it comes.
+    """
+    
+    def __init__(self, out, flush_size: int = 64 * 1024):
+        self.out = out
+        self.flush_size = flush_size
+        self._buffer = []
+        self._buffered = 0
+        self._pre_depth = 0
+        self._pending_space = False
+        self._newlines = 2  # treat the start of output as a paragraph boundary
+        self._cell_index = 0
+        self._pending = ''
+        self._skip_tag = None
+    
+    def feed(self, chunk: str):
+        self._parse(self._pending + chunk, final=False)
+    
+    def _parse(self, data: str, final: bool):
+        pos = 0
+        length = len(data)
+        texts = []
+        self._pending = ''
+        while pos < length:
+            if self._skip_tag:
+                end = _SKIP_END[self._skip_tag].search(data, pos)
+                if end is None:
+                    # Keep just enough to recognise an end tag split across chunks
+                    self._pending = '' if final else data[max(pos, length - len(self._skip_tag) - 8):]
+                    break
+                self._skip_tag = None
+                pos = end.end()
+                continue
+            
+            match = _TOKEN.match(data, pos)
+            if match is None:
+                # No complete token left: trailing text or an unterminated '<'
+                lt = data.find('<', pos)
+                if lt < 0:
+                    text = data[pos:]
+                    partial = None if final else _PARTIAL_ENTITY.search(text)
+                    if partial:
+                        self._pending = text[partial.start():]
+                        text = text[:partial.start()]
+                    texts.append(text)
+                    break
+                texts.append(data[pos:lt])
+                opener = next((key for key in ('<!--', '<![CDATA[') if data.startswith(key, lt)), None)
+                if opener:
+                    self._skip_tag = opener
+                    pos = lt + len(opener)
+                    continue
+                if not final and length - lt < MAX_PENDING_MARKUP:
+                    self._pending = data[lt:]
+                    break
+                texts.append('<')
+                pos = lt + 1
+                continue
+            
+            pos = match.end()
+            if match.group(1):
+                texts.append(match.group(1))
+            name = match.group(3)
+            if name is None:
+                continue  # comment, doctype or processing instruction
+            tag = name.lower()
+            if tag not in LAYOUT_TAGS:
+                continue
+            
+            if texts:
+                self.handle_data(''.join(texts))
+                texts = []
+            if match.group(2):
+                self.handle_endtag(tag)
+            elif match.group(4).rstrip().endswith('/'):
+                self.handle_startendtag(tag)
+            else:
+                self.handle_starttag(tag)
+                if tag in SKIP_TAGS:
+                    self._skip_tag = tag
+        
+        if texts:
+            self.handle_data(''.join(texts))
+    
+    def handle_starttag(self, tag):
+        if tag in SKIP_TAGS:
+            return
+        if tag == 'br':
+            self._line_break(1)
+        elif tag in BLOCK_TAGS:
+            self._line_break(2 if tag in PARAGRAPH_TAGS else 1)
+            if tag == 'li':
+                self._write('- ')
+            elif tag == 'tr':
+                self._cell_index = 0
+        elif tag in ('td', 'th'):
+            if self._cell_index:
+                self._write('\t')
+            self._cell_index += 1
+            self._pending_space = False
+        if tag == 'pre':
+            self._pre_depth += 1
+    
+    def handle_startendtag(self, tag):
+        if tag in SKIP_TAGS:
+            return
+        if tag == 'br' or tag in BLOCK_TAGS:
+            self._line_break(1)
+    
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            return
+        if tag == 'pre' and self._pre_depth:
+            self._pre_depth -= 1
+        if tag in BLOCK_TAGS:
+            self._line_break(2 if tag in PARAGRAPH_TAGS else 1)
+    
+    def handle_data(self, data):
+        if not data:
+            return
+        if '&' in data:
+            data = unescape(data)
+        if self._pre_depth:
+            self._write(data)
+            trailing = len(data) - len(data.rstrip('\n'))
+            self._newlines = trailing if trailing < len(data) else self._newlines + trailing
+            return
+        
+        words = data.split()
+        if not words:
+            if data:
+                self._pending_space = True
+            return
+        if data[0].isspace():
+            self._pending_space = True
+        if self._pending_space and self._newlines == 0:
+            self._write(' ')
+        self._write(' '.join(words))
+        self._pending_space = data[-1].isspace()
+        self._newlines = 0
+    
+    def _line_break(self, count: int):
+        """Emit line breaks without ever producing more than one blank line"""
+        if self._newlines < count:
+            self._write('\n' * (count - self._newlines))
+            self._newlines = count
+        self._pending_space = False
+    
+    def _write(self, text: str):
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self._buffered >= self.flush_size:
+            self.flush()
+    
+    def flush(self):
+        if self._buffer:
+            self.out.write(''.join(self._buffer))
+            self._buffer = []
+            self._buffered = 0
+    
+    def close(self):
+        if self._pending:
+            self._parse(self._pending, final=True)
+        if self._newlines == 0:
+            self._write('\n')
+        self.flush()
+
+def extract_html_text(input_path: str, output_path: str, chunk_size: int = 256 * 1024):
+    """Convert an HTML file to plain text in chunks of chunk_size characters"""
+    with open(input_path, 'r', encoding='utf-8', errors='replace') as source, \
+            open(output_path, 'w', encoding='utf-8') as target:
+        parser = HtmlTextExtractor(target)
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                break
+            parser.feed(chunk)
+        parser.close()
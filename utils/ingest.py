@@ -0,0 +1,238 @@
+import os
+import re
+import hashlib
+import logging
+import tempfile
+from pathlib import Path
+from flask import Request
+from werkzeug.exceptions import HTTPException
+from werkzeug.formparser import FormDataParser, MultiPartParser
+from config import Config
+from utils.spool import get_spool
+from utils.validators import SNIFF_BYTES
+
+logger = logging.getLogger(__name__)
+
+# filename parameter of a multipart part header
+_PART_FILENAME = re.compile(rb'filename="([^"\r\n]*)"|filename=([^\s;"]+)', re.I)
+
+class UploadRejected(HTTPException):
+    """Raised while the body is still streaming, so the rest is never stored"""
+    
+    def __init__(self, code: int, error: str, details: str = None):
+        super().__init__(description=details or error)
+        self.code = code
+        self.error = error
+        self.details = details or error
+    
+    def get_headers(self, environ=None, scope=None):
+        # The unread remainder of the body cannot be reused on this connection
+        return super().get_headers(environ, scope) + [('Connection', 'close')]
+
+class IngestWriter:
+    """Upload sink: writes to the upload folder while hashing, counting and sniffing"""
+    
+    def __init__(self, directory: str, extension: str, max_size: int, validator, buffer_size: int = None):
+        self.extension = extension
+        self.max_size = max_size
+        self.validator = validator
+        self.size = 0
+        self.signature_ok = None
+        self._hash = hashlib.sha256()
+        self._head = b''
+        self._committed = False
+        fd, self.path = tempfile.mkstemp(prefix='.ingest_', suffix='.part', dir=directory)
+        self._file = os.fdopen(fd, 'w+b', buffering=buffer_size or Config.INGEST_CHUNK_BYTES)
+    
+    def write(self, data: bytes) -> int:
+        self.size += len(data)
+        if self.size > self.max_size:
+            self.abort()
+            error = self.validator.size_limit_error(self.extension)
+            raise UploadRejected(413, error['error'], error['details'])
+        
+        if self.signature_ok is None:
+            self._head += data[:SNIFF_BYTES - len(self._head)]
+            if len(self._head) >= SNIFF_BYTES:
+                self._sniff()
+        
+        self._hash.update(data)
+        return self._file.write(data)
+    
+    def _sniff(self):
+        self.signature_ok = self.validator.check_signature(self.extension, self._head)
+        if not self.signature_ok:
+            self.abort()
+            error = self.validator.signature_error(self.extension)
+            raise UploadRejected(415, error['error'], error['details'])
+    
+    def seek(self, offset: int, whence: int = 0) -> int:
+        # The form parser rewinds once the part is complete
+        if self.signature_ok is None:
+            self._sniff()
+        self._file.flush()
+        return self._file.seek(offset, whence)
+    
+    def read(self, size: int = -1) -> bytes:
+        return self._file.read(size)
+    
+    def tell(self) -> int:
+        return self._file.tell()
+    
+    def flush(self):
+        self._file.flush()
+    
+    def readable(self) -> bool:
+        return True
+    
+    def writable(self) -> bool:
+        return True
+    
+    def seekable(self) -> bool:
+        return True
+    
+    @property
+    def sha256(self) -> str:
+        return self._hash.hexdigest()
+    
+    def summary(self) -> dict:
+        return {'size': self.size, 'sha256': self.sha256, 'signature_ok': bool(self.signature_ok)}
+    
+    def commit(self, destination: str) -> str:
+        """Move the received file into place; a rename, never a copy"""
+        self._file.flush()
+        self._file.close()
+        os.replace(self.path, destination)
+        self._committed = True
+        self.path = destination
+        return destination
+    
+    def abort(self):
+        if not self._file.closed:
+            self._file.close()
+        if not self._committed and os.path.exists(self.path):
+            os.remove(self.path)
+    
+    def close(self):
+        # Parts that were never committed (rejected or unused) leave nothing behind
+        if not self._committed:
+            self.abort()
+    
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+class IngestFormDataParser(FormDataParser):
+    """Multipart parser that reads the body in INGEST_CHUNK_BYTES pieces"""
+    
+    def _parse_multipart(self, stream, mimetype, content_length, options):
+        parser = MultiPartParser(
+            stream_factory=self.stream_factory,
+            max_form_memory_size=self.max_form_memory_size,
+            max_form_parts=self.max_form_parts,
+            cls=self.cls,
+            buffer_size=Config.INGEST_CHUNK_BYTES
+        )
+        boundary = options.get('boundary', '').encode('ascii')
+        if not boundary:
+            raise ValueError('Missing boundary')
+        form, files = parser.parse(stream, boundary, content_length)
+        return stream, form, files
+
+def ingest_request_class(validator, upload_folder: str = None):
+    """Build the Flask request class whose file parts stream through IngestWriter"""
+    directory = upload_folder or Config.UPLOAD_FOLDER
+    
+    class IngestRequest(Request):
+        form_data_parser_class = IngestFormDataParser
+        
+        def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+            extension = Path(filename or '').suffix[1:].lower()
+            max_size = validator.get_max_size_for_format(extension)
+            # Small bodies land on the RAM spool; the whole request bounds the file size
+            spool = get_spool()
+            target = spool.directory if spool.accepts(total_content_length) else directory
+            return IngestWriter(target, extension, max_size, validator)
+    
+    return IngestRequest
+
+def ingest_summary(file) -> dict:
+    """Return the ingestion summary of an uploaded FileStorage, if it was streamed"""
+    stream = getattr(file, 'stream', None)
+    return stream.summary() if isinstance(stream, IngestWriter) else None
+
+class _PrefixedStream:
+    """Replays bytes already read from wsgi.input before the rest of the stream"""
+    
+    def __init__(self, prefix: bytes, stream):
+        self._prefix = prefix
+        self._stream = stream
+    
+    def read(self, size: int = -1) -> bytes:
+        if not self._prefix:
+            return self._stream.read(size)
+        if size is None or size < 0:
+            data, self._prefix = self._prefix + self._stream.read(), b''
+            return data
+        data, self._prefix = self._prefix[:size], self._prefix[size:]
+        if len(data) < size:
+            data += self._stream.read(size - len(data))
+        return data
+    
+    def readline(self, size: int = -1) -> bytes:
+        if not self._prefix:
+            return self._stream.readline(size)
+        end = self._prefix.find(b'\n') + 1 or len(self._prefix)
+        if size is not None and 0 <= size < end:
+            end = size
+        data, self._prefix = self._prefix[:end], self._prefix[end:]
+        return data
+
+def declared_upload_extension(request, peek_bytes: int = None) -> str:
+    """Find the extension of the file being uploaded without reading the body
+
+    Clients may declare the name with an X-File-Name header or a filename
+    query argument; otherwise the head of a multipart body is peeked for the
+    first part's filename and put back for the form parser.
+    """
+    name = request.headers.get('X-File-Name') or request.args.get('filename')
+    if name:
+        return Path(name).suffix[1:].lower() or None
+    if request.mimetype != 'multipart/form-data':
+        return None
+    
+    environ = request.environ
+    stream = environ.get('wsgi.input')
+    if stream is None:
+        return None
+    limit = min(peek_bytes or Config.UPLOAD_PEEK_BYTES, request.content_length or 0)
+    head = b''
+    while len(head) < limit:
+        data = stream.read(limit - len(head))
+        if not data:
+            break
+        head += data
+    environ['wsgi.input'] = _PrefixedStream(head, stream)
+    
+    match = _PART_FILENAME.search(head)
+    if match is None:
+        return None
+    name = (match.group(1) or match.group(2)).decode('utf-8', 'replace')
+    return Path(name).suffix[1:].lower() or None
+
+def check_upload_admission(request, validator):
+    """Reject a request whose Content-Length already exceeds the per-format limit"""
+    length = request.content_length
+    if not length or request.method not in ('POST', 'PUT'):
+        return
+    # Nothing this small can break any limit, so skip the header/body lookup
+    if length <= min(validator.MAX_FILE_SIZES.values()):
+        return
+    
+    extension = declared_upload_extension(request)
+    if extension is None:
+        return
+    # Other form fields and multipart framing add a little on top of the file
+    if length - Config.UPLOAD_FORM_OVERHEAD > validator.get_max_size_for_format(extension):
+        error = validator.size_limit_error(extension)
+        raise UploadRejected(413, error['error'], error['details'])
@@ -0,0 +1,155 @@
+import os
+import sys
+import copy
+import json
+import queue
+import atexit
+import logging
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from config import Config
+
+# Attributes every LogRecord has; anything else came in through extra={...}
+_RECORD_FIELDS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, pid and any extra fields"""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'pid': record.process,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_FIELDS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class SamplingFilter(logging.Filter):
+    """Keep 1 in N records at or below a level, counted per call site
+
+    The first record from each call site always passes, so rare debug
+    events are never lost while a per-chunk one is thinned out.
+    """
+    
+    def __init__(self, rate: int, level: int = logging.DEBUG):
+        super().__init__()
+        self.rate = max(1, rate)
+        self.level = level
+        self._counts = {}
+        self._lock = threading.Lock()
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate == 1 or record.levelno > self.level:
+            return True
+        key = (record.pathname, record.lineno)
+        with self._lock:
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+        return count % self.rate == 0
+
+class DeferredQueueHandler(QueueHandler):
+    """Hands records to the listener thread without formatting them first
+
+    The stock QueueHandler renders the message in the calling thread; here
+    %-args are rendered by the listener, so callers should pass values that
+    are not mutated afterwards (strings, numbers). Past max_size queued
+    records, new ones are dropped instead of blocking the request.
+    """
+    
+    def __init__(self, log_queue, max_size: int):
+        super().__init__(log_queue)
+        self.max_size = max_size
+        self.dropped = 0
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info:
+            # Render now: the traceback would keep the request's frames alive
+            record = copy.copy(record)
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+    
+    def enqueue(self, record: logging.LogRecord):
+        # SimpleQueue.put never blocks and is far cheaper than a bounded Queue
+        if self.queue.qsize() >= self.max_size:
+            self.dropped += 1
+            return
+        self.queue.put(record)
+
+class LogPipeline:
+    """Root logging through a bounded queue and one background listener per process"""
+    
+    def __init__(self, level: str = None, log_file: str = None, queue_size: int = None, sample_rate: int = None):
+        self.level = getattr(logging, (level or Config.LOG_LEVEL).upper(), logging.INFO)
+        self.log_file = log_file if log_file is not None else Config.LOG_FILE
+        self.queue_size = queue_size if queue_size is not None else Config.LOG_QUEUE_SIZE
+        self.sample_rate = sample_rate if sample_rate is not None else Config.LOG_DEBUG_SAMPLE_RATE
+        self.handlers = self._build_handlers()
+        self.queue_handler = None
+        self.listener = None
+        self.running = False
+    
+    def _build_handlers(self) -> list:
+        if Config.LOG_FORMAT.lower() == 'json':
+            formatter = JsonFormatter()
+        else:
+            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        handlers = [logging.StreamHandler(sys.stderr)]
+        if self.log_file:
+            handlers.append(logging.FileHandler(self.log_file))
+        for handler in handlers:
+            handler.setFormatter(formatter)
+        return handlers
+    
+    def start(self):
+        log_queue = queue.SimpleQueue()
+        self.queue_handler = DeferredQueueHandler(log_queue, self.queue_size)
+        self.queue_handler.addFilter(SamplingFilter(self.sample_rate))
+        self.listener = QueueListener(log_queue, *self.handlers, respect_handler_level=True)
+        self.listener.start()
+        self.running = True
+        
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(self.queue_handler)
+        root.setLevel(self.level)
+    
+    def stop(self):
+        """Drain the queue and stop the listener (at exit, or before a forked child exits)"""
+        if self.running:
+            self.running = False
+            self.listener.stop()
+    
+    def _after_fork_in_child(self):
+        # The listener thread did not survive the fork: start a fresh one on a
+        # fresh queue (records the parent had not written yet are the parent's)
+        self.running = False
+        self.start()
+
+_pipeline = None
+
+def configure_logging() -> LogPipeline:
+    """Install the queue pipeline once per process tree"""
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = LogPipeline()
+        _pipeline.start()
+        atexit.register(_pipeline.stop)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=_pipeline._after_fork_in_child)
+    return _pipeline
+
+def flush_logging():
+    """Write out queued records now; call before os._exit()"""
+    if _pipeline is not None:
+        _pipeline.stop()
@@ -0,0 +1,555 @@
+import re
+import logging
+from html import escape, unescape
+from utils.pdf_layout import StreamingStory, paragraph_style, sample_styles
+
+logger = logging.getLogger(__name__)
+
+# Block-level patterns, matched once per line
+_ATX_HEADING = re.compile(r'^ {0,3}(#{1,6})(?:[ \t]+(.*?))?(?:[ \t]+#+)?[ \t]*$')
+_SETEXT_UNDERLINE = re.compile(r'^ {0,3}(=+|-+)[ \t]*$')
+_FENCE = re.compile(r'^( {0,3})(`{3,}|~{3,})[ \t]*([^`\s]*)')
+_HR = re.compile(r'^ {0,3}([-*_])(?:[ \t]*\1){2,}[ \t]*$')
+_QUOTE = re.compile(r'^ {0,3}> ?(.*)$')
+_LIST_ITEM = re.compile(r'^([ \t]*)([-*+]|\d{1,9}[.)])[ \t]+(.*)$')
+_TABLE_DIVIDER = re.compile(r'^ {0,3}\|?[ \t]*:?-+:?[ \t]*(?:\|[ \t]*:?-+:?[ \t]*)*\|?[ \t]*$')
+_CELL_SPLIT = re.compile(r'(?<!\\)\|')
+
+# First characters that can open a block other than a paragraph
+_BLOCK_START = frozenset('#`~>-*_+|0123456789')
+
+# Inline patterns, applied to each block's text in this order
+_CODE_SPAN = re.compile(r'(`+)(.+?)\1', re.S)
+_IMAGE = re.compile(r'!\[([^\]]*)\]\(([^)\s]+)(?:\s+(?:"[^"]*"|&quot;.*?&quot;))?\)')
+_LINK = re.compile(r'\[([^\]]+)\]\(([^)\s]+)(?:\s+(?:"[^"]*"|&quot;.*?&quot;))?\)')
+_AUTOLINK = re.compile(r'&lt;((?:https?|mailto):[^\s&]+)&gt;')
+_TEXT_AUTOLINK = re.compile(r'<((?:https?|ftp|mailto):[^\s>]+)>')
+_BOLD = re.compile(r'(\*\*|__)(?=\S)(.+?)(?<=\S)\1', re.S)
+_ITALIC_STAR = re.compile(r'\*(?=\S)(.+?)(?<=\S)\*', re.S)
+_ITALIC_UNDERSCORE = re.compile(r'(?<!\w)_(?=\S)(.+?)(?<=\S)_(?!\w)', re.S)
+_STRIKE = re.compile(r'~~(?=\S)(.+?)(?<=\S)~~', re.S)
+_HARD_BREAK = re.compile(r'(?: {2,}|\\)\n')
+_BACKSLASH_ESCAPE = re.compile(r'\\([\\`*_{}\[\]()#+\-.!|~>])')
+
+# Link and image targets may be relative or use one of these schemes;
+# anything else (javascript:, data:, vbscript:, ...) is rendered as plain text
+SAFE_URL_SCHEMES = {'http', 'https', 'mailto'}
+_URL_SCHEME = re.compile(r'^([a-zA-Z][a-zA-Z0-9+.-]*):')
+_URL_IGNORED = re.compile(r'[\x00-\x20\x7f]')
+
+# Replacement templates per output mode
+INLINE_TEMPLATES = {
+    'html': {
+        'code': '<code>{}</code>', 'image': '<img src="\\2" alt="\\1">', 'link': '<a href="\\2">\\1</a>',
+        'autolink': '<a href="\\1">\\1</a>', 'bold': '<strong>\\2</strong>', 'italic': '<em>\\1</em>',
+        'strike': '<del>\\1</del>', 'break': '<br>\n',
+    },
+    'pdf': {
+        'code': '<font face="Courier">{}</font>', 'image': '<i>\\1</i>', 'link': '<a href="\\2" color="blue">\\1</a>',
+        'autolink': '<a href="\\1" color="blue">\\1</a>', 'bold': '<b>\\2</b>', 'italic': '<i>\\1</i>',
+        'strike': '<strike>\\1</strike>', 'break': '<br/>',
+    },
+    'text': {
+        'code': '{}', 'image': '\\1', 'link': '\\1', 'autolink': '\\1', 'bold': '\\2', 'italic': '\\1',
+        'strike': '\\1', 'break': '\n',
+    },
+}
+
+HTML_HEADER = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>Converted Markdown</title>
+    <style>
+        body { font-family: Arial, sans-serif; margin: 40px; line-height: 1.6; }
+        h1, h2, h3 { color: #333; }
+        code { background-color: #f5f5f5; padding: 2px 4px; border-radius: 3px; }
+        pre { background-color: #f5f5f5; padding: 15px; border-radius: 5px; overflow-x: auto; }
+        pre code { padding: 0; }
+        blockquote { border-left: 4px solid #ddd; margin-left: 0; padding-left: 16px; color: #555; }
+        table { border-collapse: collapse; }
+        th, td { border: 1px solid #ccc; padding: 4px 8px; }
+    </style>
+</head>
+<body>
+"""
+
+HTML_FOOTER = """</body>
+</html>
+"""
+
+def render_inline(text: str, mode: str = 'html') -> str:
+    """Render inline Markdown (code, links, emphasis) for one output mode"""
+    templates = INLINE_TEMPLATES[mode]
+    parts = []
+    # Code spans are literal, so split them out before any other pattern runs
+    pos = 0
+    for match in _CODE_SPAN.finditer(text):
+        parts.append(_render_spans(text[pos:match.start()], mode, templates))
+        code = match.group(2).strip() if match.group(2).strip() else match.group(2)
+        parts.append(templates['code'].format(code if mode == 'text' else escape(code, quote=False)))
+        pos = match.end()
+    parts.append(_render_spans(text[pos:], mode, templates))
+    return ''.join(parts)
+
+def is_safe_url(url: str) -> bool:
+    """True for relative URLs and http(s)/mailto ones (url is HTML-escaped)"""
+    # Browsers decode the attribute and drop whitespace and control characters in the scheme
+    match = _URL_SCHEME.match(_URL_IGNORED.sub('', unescape(url)))
+    return match is None or match.group(1).lower() in SAFE_URL_SCHEMES
+
+def _safe_link(template: str):
+    """Substitution that renders the template, or only the text when the URL is unsafe"""
+    def replace(match):
+        return match.expand(template) if is_safe_url(match.group(2)) else match.group(1)
+    return replace
+
+def _render_spans(text: str, mode: str, templates: dict) -> str:
+    if not text:
+        return text
+    escapes = {}
+    if '\\' in text:
+        # Park escaped punctuation in private-use characters so no pattern sees it
+        def _park(match):
+            key = chr(0xE000 + len(escapes))
+            escapes[key] = match.group(1)
+            return key
+        text = _BACKSLASH_ESCAPE.sub(_park, text)
+    
+    if mode != 'text':
+        text = escape(text)
+    if '!' in text:
+        text = _IMAGE.sub(templates['image'] if mode == 'text' else _safe_link(templates['image']), text)
+    if '[' in text:
+        text = _LINK.sub(templates['link'] if mode == 'text' else _safe_link(templates['link']), text)
+    if mode != 'text' and '&lt;' in text:
+        text = _AUTOLINK.sub(templates['autolink'], text)
+    elif mode == 'text' and '<' in text:
+        text = _TEXT_AUTOLINK.sub(r'\1', text)
+    if '*' in text or '_' in text:
+        text = _BOLD.sub(templates['bold'], text)
+        text = _ITALIC_STAR.sub(templates['italic'], text)
+        text = _ITALIC_UNDERSCORE.sub(templates['italic'], text)
+    if '~~' in text:
+        text = _STRIKE.sub(templates['strike'], text)
+    if '\n' in text:
+        text = _HARD_BREAK.sub(templates['break'], text)
+    
+    for key, char in escapes.items():
+        text = text.replace(key, char if mode == 'text' else escape(char))
+    return text
+
+class _LineSource:
+    """Line iterator with one line of lookahead"""
+    
+    def __init__(self, lines):
+        self._lines = iter(lines)
+        self._peeked = None
+    
+    def next(self):
+        if self._peeked is not None:
+            line, self._peeked = self._peeked, None
+            return line
+        line = next(self._lines, None)
+        return line.rstrip('\r\n') if line is not None else None
+    
+    def peek(self):
+        if self._peeked is None:
+            self._peeked = self.next()
+        return self._peeked
+
+def iter_blocks(lines):
+    """Yield Markdown blocks as tuples, reading the source one line at a time
+
+    ('heading', level, text), ('paragraph', text), ('code', language, text),
+    ('hr',), ('quote', lines), ('list', node) and ('table', header, aligns, rows)
+    """
+    source = _LineSource(lines)
+    paragraph = []
+    
+    while True:
+        line = source.next()
+        if line is None:
+            break
+        
+        if not line.strip():
+            if paragraph:
+                yield ('paragraph', '\n'.join(paragraph))
+                paragraph = []
+            continue
+        
+        if paragraph and _SETEXT_UNDERLINE.match(line):
+            yield ('heading', 1 if line.strip()[0] == '=' else 2, '\n'.join(paragraph))
+            paragraph = []
+            continue
+        
+        # Plain prose cannot open a block, so skip the block patterns for it
+        # (trailing spaces are kept: two of them mark a hard line break)
+        stripped = line.lstrip()
+        if stripped[0] not in _BLOCK_START and (paragraph or (len(line) - len(stripped) < 4 and '|' not in line)):
+            paragraph.append(stripped)
+            continue
+        
+        fence = _FENCE.match(line)
+        heading = None if fence else _ATX_HEADING.match(line)
+        quote = None if fence or heading else _QUOTE.match(line)
+        is_hr = not (fence or heading or quote) and _HR.match(line) is not None
+        item = None if fence or heading or quote or is_hr else _LIST_ITEM.match(line)
+        # An indented line inside a paragraph is a lazy continuation, not code
+        is_indented_code = not paragraph and line.startswith('    ')
+        is_table = not paragraph and '|' in line and not item and _TABLE_DIVIDER.match(source.peek() or '') is not None
+        
+        if not (fence or heading or quote or is_hr or item or is_indented_code or is_table):
+            paragraph.append(stripped)
+            continue
+        
+        if paragraph:
+            yield ('paragraph', '\n'.join(paragraph))
+            paragraph = []
+        
+        if fence:
+            yield ('code', fence.group(3), _read_fence(source, fence))
+        elif heading:
+            yield ('heading', len(heading.group(1)), heading.group(2) or '')
+        elif quote:
+            yield ('quote', _read_quote(source, quote.group(1)))
+        elif is_hr:
+            yield ('hr',)
+        elif item:
+            yield ('list', _parse_list(_read_list(source, line)))
+        elif is_indented_code:
+            yield ('code', '', _read_indented_code(source, line))
+        else:
+            yield _read_table(source, line)
+    
+    if paragraph:
+        yield ('paragraph', '\n'.join(paragraph))
+
+def _read_fence(source, fence) -> str:
+    indent = len(fence.group(1))
+    marker = fence.group(2)
+    lines = []
+    while True:
+        line = source.next()
+        if line is None:
+            break
+        stripped = line.strip()
+        if stripped.startswith(marker[0] * len(marker)) and not stripped.strip(marker[0]):
+            break
+        # Drop up to the fence's own indentation from each content line
+        lines.append(line[min(indent, len(line) - len(line.lstrip(' '))):])
+    return '\n'.join(lines)
+
+def _read_quote(source, first: str) -> list:
+    lines = [first]
+    while True:
+        line = source.peek()
+        if line is None or not line.strip():
+            break
+        match = _QUOTE.match(line)
+        lines.append(match.group(1) if match else line)
+        source.next()
+    return lines
+
+def _read_list(source, first: str) -> list:
+    lines = [first]
+    first_item = _LIST_ITEM.match(first)
+    first_indent = len(first_item.group(1).expandtabs(4))
+    ordered = first_item.group(2)[0].isdigit()
+    while True:
+        line = source.peek()
+        if line is None:
+            break
+        item = _LIST_ITEM.match(line)
+        if item and len(item.group(1).expandtabs(4)) <= first_indent and item.group(2)[0].isdigit() != ordered:
+            break  # a different kind of list starts here
+        if not line.strip():
+            # A blank line ends the list unless an item or indented text follows
+            source.next()
+            following = source.peek()
+            if following is None or not (following.startswith((' ', '\t')) or _LIST_ITEM.match(following)) \
+                    or _HR.match(following):
+                break
+            continue
+        if _HR.match(line) or (not line.startswith((' ', '\t')) and not _LIST_ITEM.match(line)
+                               and (_ATX_HEADING.match(line) or _FENCE.match(line) or _QUOTE.match(line))):
+            break
+        lines.append(line)
+        source.next()
+    return lines
+
+def _parse_list(lines: list) -> dict:
+    """Build nested list nodes: {'ordered', 'start', 'items': [[text, child node]]}"""
+    root = None
+    stack = []  # (indent, node)
+    for line in lines:
+        match = _LIST_ITEM.match(line)
+        if match is None:
+            text = line.strip()
+            if text and stack and stack[-1][1]['items']:
+                stack[-1][1]['items'][-1][0] += '\n' + text
+            continue
+        
+        indent = len(match.group(1).expandtabs(4))
+        marker = match.group(2)
+        while len(stack) > 1 and indent < stack[-1][0]:
+            stack.pop()
+        
+        if stack and indent > stack[-1][0] + 1 and stack[-1][1]['items']:
+            parent = stack[-1][1]['items'][-1]
+            if parent[1] is None:
+                parent[1] = _new_list(marker)
+            stack.append((indent, parent[1]))
+        elif not stack:
+            root = _new_list(marker)
+            stack.append((indent, root))
+        stack[-1][1]['items'].append([match.group(3), None])
+    return root
+
+def _new_list(marker: str) -> dict:
+    ordered = marker[0].isdigit()
+    return {'ordered': ordered, 'start': int(marker[:-1]) if ordered else 1, 'items': []}
+
+def _read_indented_code(source, first: str) -> str:
+    lines = [first[4:]]
+    while True:
+        line = source.peek()
+        if line is None or not (line.startswith('    ') or not line.strip()):
+            break
+        lines.append(line[4:])
+        source.next()
+    while lines and not lines[-1].strip():
+        lines.pop()
+    return '\n'.join(lines)
+
+def _split_cells(line: str) -> list:
+    line = line.strip()
+    if line.startswith('|'):
+        line = line[1:]
+    if line.endswith('|') and not line.endswith('\\|'):
+        line = line[:-1]
+    return [cell.strip().replace('\\|', '|') for cell in _CELL_SPLIT.split(line)]
+
+def _read_table(source, header_line: str) -> tuple:
+    header = _split_cells(header_line)
+    aligns = []
+    for cell in _split_cells(source.next()):
+        if cell.startswith(':') and cell.endswith(':'):
+            aligns.append('center')
+        elif cell.endswith(':'):
+            aligns.append('right')
+        else:
+            aligns.append('left' if cell.startswith(':') else None)
+    rows = []
+    while True:
+        line = source.peek()
+        if line is None or not line.strip() or '|' not in line:
+            break
+        cells = _split_cells(line)
+        rows.append((cells + [''] * len(header))[:len(header)])
+        source.next()
+    return ('table', header, aligns, rows)
+
+class MarkdownRenderer:
+    """Single-pass Markdown renderer with HTML, text and PDF outputs"""
+    
+    def __init__(self, cache=None):
+        self.cache = cache
+    
+    def render_html(self, input_path: str, output_path: str) -> bool:
+        with open(output_path, 'w', encoding='utf-8') as out:
+            out.write(HTML_HEADER)
+            self._render_cached(input_path, out, 'markdown-html', self._html_blocks)
+            out.write(HTML_FOOTER)
+        return True
+    
+    def render_text(self, input_path: str, output_path: str) -> bool:
+        with open(output_path, 'w', encoding='utf-8') as out:
+            self._render_cached(input_path, out, 'markdown-text', self._text_blocks)
+        return True
+    
+    def render_pdf(self, input_path: str, output_path: str) -> bool:
+        from reportlab.lib.pagesizes import A4
+        from reportlab.platypus import SimpleDocTemplate
+        
+        doc = SimpleDocTemplate(output_path, pagesize=A4, rightMargin=72, leftMargin=72,
+                                topMargin=72, bottomMargin=54)
+        with open(input_path, 'r', encoding='utf-8', errors='replace') as source:
+            flowables = _PdfBlocks(doc.width).flowables(iter_blocks(source))
+            doc.build(StreamingStory(flowables))
+        return True
+    
+    def _render_cached(self, input_path: str, out, namespace: str, render_blocks):
+        """Write rendered fragments to out, serving and filling the content-hash cache"""
+        key = None
+        if self.cache is not None:
+            key = self.cache.file_digest(input_path, namespace)
+            cached = self.cache.get(key)
+            if cached is not None:
+                out.write(cached)
+                return
+        
+        collected = [] if key is not None else None
+        collected_size = 0
+        with open(input_path, 'r', encoding='utf-8', errors='replace') as source:
+            for fragment in render_blocks(iter_blocks(source)):
+                out.write(fragment)
+                if collected is not None:
+                    collected.append(fragment)
+                    collected_size += len(fragment)
+                    if collected_size > self.cache.max_entry_bytes:
+                        collected = None
+        
+        if collected is not None:
+            self.cache.put(key, ''.join(collected))
+    
+    def _html_blocks(self, blocks):
+        for block in blocks:
+            kind = block[0]
+            if kind == 'paragraph':
+                yield f'<p>{render_inline(block[1])}</p>\n'
+            elif kind == 'heading':
+                yield f'<h{block[1]}>{render_inline(block[2])}</h{block[1]}>\n'
+            elif kind == 'code':
+                language = f' class="language-{escape(block[1])}"' if block[1] else ''
+                yield f'<pre><code{language}>{escape(block[2], quote=False)}</code></pre>\n'
+            elif kind == 'hr':
+                yield '<hr>\n'
+            elif kind == 'quote':
+                yield '<blockquote>\n'
+                yield from self._html_blocks(iter_blocks(block[1]))
+                yield '</blockquote>\n'
+            elif kind == 'list':
+                yield self._html_list(block[1])
+            elif kind == 'table':
+                yield self._html_table(*block[1:])
+    
+    def _html_list(self, node: dict) -> str:
+        if node['ordered']:
+            parts = [f'<ol start="{node["start"]}">\n' if node['start'] != 1 else '<ol>\n']
+        else:
+            parts = ['<ul>\n']
+        for text, child in node['items']:
+            parts.append(f'<li>{render_inline(text)}')
+            if child is not None:
+                parts.append('\n' + self._html_list(child))
+            parts.append('</li>\n')
+        parts.append('</ol>\n' if node['ordered'] else '</ul>\n')
+        return ''.join(parts)
+    
+    def _html_table(self, header: list, aligns: list, rows: list) -> str:
+        def _cells(tag, cells):
+            out = []
+            for index, cell in enumerate(cells):
+                align = aligns[index] if index < len(aligns) else None
+                attr = f' style="text-align: {align}"' if align else ''
+                out.append(f'<{tag}{attr}>{render_inline(cell)}</{tag}>')
+            return ''.join(out)
+        
+        parts = ['<table>\n<thead><tr>', _cells('th', header), '</tr></thead>\n<tbody>\n']
+        for row in rows:
+            parts.append(f'<tr>{_cells("td", row)}</tr>\n')
+        parts.append('</tbody>\n</table>\n')
+        return ''.join(parts)
+    
+    def _text_blocks(self, blocks, prefix: str = ''):
+        for block in blocks:
+            kind = block[0]
+            if kind in ('paragraph', 'heading'):
+                text = render_inline(block[-1], 'text')
+            elif kind == 'code':
+                text = block[2]
+            elif kind == 'hr':
+                text = '-' * 40
+            elif kind == 'quote':
+                yield from self._text_blocks(iter_blocks(block[1]), prefix + '  ')
+                continue
+            elif kind == 'list':
+                text = self._text_list(block[1])
+            elif kind == 'table':
+                rows = [block[1]] + block[3]
+                text = '\n'.join('\t'.join(render_inline(cell, 'text') for cell in row) for row in rows)
+            else:
+                continue
+            if prefix:
+                text = '\n'.join(prefix + line for line in text.split('\n'))
+            yield text + '\n\n'
+    
+    def _text_list(self, node: dict, depth: int = 0) -> str:
+        lines = []
+        for index, (text, child) in enumerate(node['items']):
+            bullet = f"{node['start'] + index}." if node['ordered'] else '-'
+            indent = '  ' * depth
+            body = render_inline(text, 'text').replace('\n', '\n' + indent + ' ' * (len(bullet) + 1))
+            lines.append(f'{indent}{bullet} {body}')
+            if child is not None:
+                lines.append(self._text_list(child, depth + 1))
+        return '\n'.join(lines)
+
+class _PdfBlocks:
+    """Maps Markdown blocks to ReportLab flowables"""
+    
+    def __init__(self, frame_width: float):
+        self.styles = sample_styles()
+        self.frame_width = frame_width
+    
+    def flowables(self, blocks, indent: int = 0):
+        from reportlab.platypus import Preformatted
+        
+        for block in blocks:
+            kind = block[0]
+            if kind == 'paragraph':
+                yield self._paragraph(render_inline(block[1], 'pdf'), 'BodyText', indent)
+            elif kind == 'heading':
+                yield self._paragraph(render_inline(block[2], 'pdf'), f'Heading{min(block[1], 6)}', indent)
+            elif kind == 'code':
+                yield Preformatted(block[2], self._style('Code', indent))
+            elif kind == 'hr':
+                from reportlab.platypus.flowables import HRFlowable
+                yield HRFlowable(width='100%', thickness=0.5, spaceBefore=6, spaceAfter=6)
+            elif kind == 'quote':
+                yield from self.flowables(iter_blocks(block[1]), indent + 1)
+            elif kind == 'list':
+                yield from self._list(block[1], indent)
+            elif kind == 'table':
+                yield self._table(*block[1:])
+    
+    def _style(self, name: str, indent: int, bullet: bool = False):
+        """Return a style indented by nesting depth, creating each variant once per process"""
+        if not indent and not bullet:
+            return self.styles[name]
+        left = self.styles[name].leftIndent + 18 * indent
+        return paragraph_style(f'md-{name}-{indent}-{int(bullet)}', name,
+                               leftIndent=left + (18 if bullet else 0), bulletIndent=left)
+    
+    def _paragraph(self, markup: str, style_name: str, indent: int, bullet: str = None):
+        from reportlab.platypus import Paragraph
+        
+        style = self._style(style_name, indent, bullet is not None)
+        try:
+            return Paragraph(markup, style, bulletText=bullet)
+        except ValueError:
+            # Markup ReportLab cannot parse (odd nesting); keep the text readable
+            return Paragraph(escape(re.sub(r'<[^>]+>', '', markup)), style, bulletText=bullet)
+    
+    def _list(self, node: dict, indent: int):
+        for index, (text, child) in enumerate(node['items']):
+            bullet = f"{node['start'] + index}." if node['ordered'] else '•'
+            yield self._paragraph(render_inline(text, 'pdf'), 'BodyText', indent, bullet)
+            if child is not None:
+                yield from self._list(child, indent + 1)
+    
+    def _table(self, header: list, aligns: list, rows: list):
+        from reportlab.lib import colors
+        from reportlab.platypus import Table, TableStyle
+        
+        data = [[self._paragraph(f'<b>{render_inline(cell, "pdf")}</b>', 'BodyText', 0) for cell in header]]
+        data.extend([self._paragraph(render_inline(cell, 'pdf'), 'BodyText', 0) for cell in row] for row in rows)
+        column_width = self.frame_width / max(1, len(header))
+        table = Table(data, colWidths=[column_width] * len(header), repeatRows=1)
+        table.setStyle(TableStyle([
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ('BACKGROUND', (0, 0), (-1, 0), colors.whitesmoke),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ]))
+        return table
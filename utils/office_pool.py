@@ -0,0 +1,274 @@
+import os
+import sys
+import time
+import queue
+import shutil
+import atexit
+import signal
+import logging
+import threading
+import subprocess
+from pathlib import Path
+from importlib.util import find_spec
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Document family for each input format handled by LibreOffice
+OFFICE_FAMILIES = {
+    'doc': 'writer', 'docx': 'writer', 'rtf': 'writer', 'odt': 'writer',
+    'xls': 'calc', 'xlsx': 'calc', 'ods': 'calc',
+    'ppt': 'impress', 'pptx': 'impress', 'odp': 'impress',
+}
+
+# Export filter names per (family, target format)
+EXPORT_FILTERS = {
+    ('writer', 'pdf'): 'writer_pdf_Export',
+    ('writer', 'txt'): 'Text',
+    ('writer', 'html'): 'HTML (StarWriter)',
+    ('writer', 'docx'): 'MS Word 2007 XML',
+    ('calc', 'pdf'): 'calc_pdf_Export',
+    ('calc', 'csv'): 'Text - txt - csv (StarCalc)',
+    ('calc', 'xlsx'): 'Calc MS Excel 2007 XML',
+    ('impress', 'pdf'): 'impress_pdf_Export',
+    ('impress', 'pptx'): 'Impress MS PowerPoint 2007 XML',
+}
+
+class OfficeInstance:
+    """One long-lived headless soffice process with its own profile"""
+    
+    def __init__(self, index: int, soffice_path: str, profile_root: str):
+        self.index = index
+        self.soffice_path = soffice_path
+        self.pipe_name = f"dazzlodocs_{os.getpid()}_{index}"
+        self.profile_dir = os.path.join(profile_root, f"dazzlodocs_lo_{os.getpid()}_{index}")
+        self.process = None
+        self.desktop = None
+        self.jobs_done = 0
+        self.broken = False
+    
+    def is_running(self) -> bool:
+        return self.process is not None and self.process.poll() is None and self.desktop is not None
+    
+    def start(self, startup_timeout: float):
+        """Launch soffice and connect to it over the UNO pipe"""
+        import uno
+        
+        os.makedirs(self.profile_dir, exist_ok=True)
+        cmd = [
+            self.soffice_path,
+            '--headless', '--invisible', '--nologo', '--nodefault',
+            '--norestore', '--nolockcheck', '--nofirststartwizard',
+            f'-env:UserInstallation={uno.systemPathToFileUrl(self.profile_dir)}',
+            f'--accept=pipe,name={self.pipe_name};urp;StarOffice.ComponentContext',
+        ]
+        self.process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True
+        )
+        
+        local_context = uno.getComponentContext()
+        resolver = local_context.ServiceManager.createInstanceWithContext(
+            'com.sun.star.bridge.UnoUrlResolver', local_context)
+        url = f'uno:pipe,name={self.pipe_name};urp;StarOffice.ComponentContext'
+        
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            try:
+                context = resolver.resolve(url)
+                self.desktop = context.ServiceManager.createInstanceWithContext(
+                    'com.sun.star.frame.Desktop', context)
+                break
+            except Exception:
+                if self.process.poll() is not None or time.monotonic() > deadline:
+                    self.stop()
+                    raise RuntimeError(f"LibreOffice instance {self.index} failed to start")
+                time.sleep(0.25)
+        
+        self.jobs_done = 0
+        self.broken = False
+        logger.info(f"LibreOffice instance {self.index} started (pid {self.process.pid})")
+    
+    def convert(self, input_path: str, output_path: str, filter_name: str, timeout: float) -> bool:
+        """Run one export; kill the instance if it exceeds the timeout"""
+        outcome = {}
+        
+        def _job():
+            try:
+                outcome['result'] = self._export(input_path, output_path, filter_name)
+            except Exception as e:
+                outcome['error'] = e
+        
+        worker = threading.Thread(target=_job, daemon=True)
+        worker.start()
+        worker.join(timeout)
+        self.jobs_done += 1
+        
+        if worker.is_alive():
+            logger.error(f"LibreOffice instance {self.index} timed out after {timeout}s, killing it")
+            self.broken = True
+            self.kill()
+            return False
+        
+        if 'error' in outcome:
+            logger.error(f"LibreOffice conversion error: {outcome['error']}")
+            # A dead bridge means the instance is gone; a bad document does not
+            if self.process is None or self.process.poll() is not None:
+                self.broken = True
+            return False
+        
+        return outcome.get('result', False)
+    
+    def _export(self, input_path: str, output_path: str, filter_name: str) -> bool:
+        import uno
+        from com.sun.star.beans import PropertyValue
+        
+        def _props(**kwargs):
+            props = []
+            for name, value in kwargs.items():
+                prop = PropertyValue()
+                prop.Name = name
+                prop.Value = value
+                props.append(prop)
+            return tuple(props)
+        
+        document = self.desktop.loadComponentFromURL(
+            uno.systemPathToFileUrl(os.path.abspath(input_path)), '_blank', 0,
+            _props(Hidden=True, ReadOnly=True))
+        if document is None:
+            return False
+        try:
+            document.storeToURL(uno.systemPathToFileUrl(os.path.abspath(output_path)),
+                                _props(FilterName=filter_name, Overwrite=True))
+        finally:
+            try:
+                document.close(True)
+            except Exception:
+                document.dispose()
+        return os.path.exists(output_path)
+    
+    def kill(self):
+        """SIGKILL soffice without asking it first (it may be hung) and remove the profile"""
+        # A terminate() over the bridge of a hung instance can block forever
+        self.desktop = None
+        if self.process is not None:
+            try:
+                # start_new_session made soffice a group leader: take its helpers too
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            self.process.wait()
+            self.process = None
+        
+        shutil.rmtree(self.profile_dir, ignore_errors=True)
+    
+    def stop(self):
+        """Terminate soffice politely (normal recycling) and remove the profile"""
+        if self.desktop is not None and self.process is not None and self.process.poll() is None:
+            try:
+                self.desktop.terminate()
+            except Exception:
+                pass
+        self.desktop = None
+        
+        if self.process is not None:
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+            self.process = None
+        
+        shutil.rmtree(self.profile_dir, ignore_errors=True)
+
+class LibreOfficePool:
+    """Pool of persistent headless LibreOffice instances for Office formats"""
+    
+    def __init__(self):
+        self.size = Config.LIBREOFFICE_POOL_SIZE
+        self.max_jobs = Config.LIBREOFFICE_MAX_JOBS
+        self.job_timeout = Config.LIBREOFFICE_JOB_TIMEOUT
+        self.startup_timeout = Config.LIBREOFFICE_STARTUP_TIMEOUT
+        self.acquire_timeout = Config.LIBREOFFICE_ACQUIRE_TIMEOUT
+        self.profile_root = Config.LIBREOFFICE_PROFILE_DIR or os.path.join(Path.home(), '.cache')
+        self.soffice_path = shutil.which(Config.LIBREOFFICE_PATH)
+        self._available = None
+        self._pid = None
+        self._idle = None
+        self._instances = []
+        self._lock = threading.Lock()
+        atexit.register(self.shutdown)
+    
+    def is_available(self) -> bool:
+        """Check for an soffice binary and the UNO bridge module"""
+        if self._available is None:
+            self._available = self.soffice_path is not None and self._find_uno()
+        return self._available
+    
+    def _find_uno(self) -> bool:
+        # Only locate the module: importing uno loads the LibreOffice runtime,
+        # which waits for the first instance start
+        if find_spec('uno') is not None:
+            return True
+        # Distro packages (python3-uno) install outside our interpreter's path
+        uno_path = Config.LIBREOFFICE_UNO_PATH
+        if uno_path and os.path.isdir(uno_path) and uno_path not in sys.path:
+            sys.path.append(uno_path)
+            if find_spec('uno') is not None:
+                return True
+            sys.path.remove(uno_path)
+        return False
+    
+    def can_convert(self, input_format: str, target_format: str) -> bool:
+        family = OFFICE_FAMILIES.get(input_format.lower())
+        return family is not None and (family, target_format.lower()) in EXPORT_FILTERS
+    
+    def convert(self, input_path: str, output_path: str, target_format: str) -> bool:
+        """Convert a document on the next idle instance"""
+        input_ext = Path(input_path).suffix[1:].lower()
+        filter_name = EXPORT_FILTERS.get((OFFICE_FAMILIES.get(input_ext), target_format.lower()))
+        if filter_name is None or not self.is_available():
+            return False
+        
+        self._ensure_instances()
+        try:
+            instance = self._idle.get(timeout=self.acquire_timeout)
+        except queue.Empty:
+            logger.error("No LibreOffice instance became free in time")
+            return False
+        
+        try:
+            if not instance.is_running():
+                instance.start(self.startup_timeout)
+            return instance.convert(input_path, output_path, filter_name, self.job_timeout)
+        except Exception as e:
+            logger.error(f"LibreOffice pool error: {str(e)}")
+            instance.broken = True
+            return False
+        finally:
+            if instance.broken:
+                instance.kill()
+            elif instance.jobs_done >= self.max_jobs:
+                logger.info(f"Recycling LibreOffice instance {instance.index} after {instance.jobs_done} jobs")
+                instance.stop()
+            self._idle.put(instance)
+    
+    def _ensure_instances(self):
+        """Create the instance slots for this process (after fork the parent's do not apply)"""
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._idle = queue.Queue()
+            self._instances = [OfficeInstance(i, self.soffice_path, self.profile_root) for i in range(self.size)]
+            for instance in self._instances:
+                self._idle.put(instance)
+    
+    def shutdown(self):
+        """Stop every instance owned by this process"""
+        if self._pid != os.getpid():
+            return
+        for instance in self._instances:
+            instance.stop()
@@ -0,0 +1,175 @@
+import io
+import logging
+from functools import lru_cache
+from itertools import chain, islice
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Base-14 fonts the sample stylesheet and our renderers draw with
+STANDARD_FONTS = ('Helvetica', 'Helvetica-Bold', 'Helvetica-Oblique', 'Helvetica-BoldOblique',
+                  'Times-Roman', 'Times-Bold', 'Courier', 'Courier-Bold')
+
+@lru_cache(maxsize=1)
+def sample_styles():
+    """ReportLab's sample stylesheet, built once per process (treat it as read-only)"""
+    from reportlab.lib.styles import getSampleStyleSheet
+    return getSampleStyleSheet()
+
+@lru_cache(maxsize=512)
+def paragraph_style(name: str, parent: str, **overrides):
+    """A sample style with overrides, shared by every conversion that asks for the same one"""
+    from reportlab.lib.styles import ParagraphStyle
+    return ParagraphStyle(name, parent=sample_styles()[parent], **overrides)
+
+@lru_cache(maxsize=1)
+def prime_reportlab() -> bool:
+    """Fill the caches and lay out one tiny page, so later builds (and forked children) skip first-use setup"""
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import Paragraph, SimpleDocTemplate
+    
+    styles = sample_styles()
+    for font in STANDARD_FONTS:
+        pdfmetrics.getFont(font)
+    doc = SimpleDocTemplate(io.BytesIO(), pagesize=A4)
+    doc.build([Paragraph('<b>a</b> <i>b</i> c', styles['Normal']), Paragraph('d', styles['Heading1'])])
+    return True
+
+class StreamingStory(list):
+    """Flowable list that is filled lazily from an iterator during doc.build()
+
+    ReportLab consumes the story from the front and only checks len() between
+    flowables, so topping the list up there keeps just a small window of
+    flowables alive instead of the whole document.
+    """
+    
+    def __init__(self, source, low_water: int = 4, batch: int = 16):
+        super().__init__()
+        self._source = iter(source)
+        self._low_water = low_water
+        self._batch = batch
+        self._exhausted = False
+    
+    def __len__(self):
+        if not self._exhausted and list.__len__(self) < self._low_water:
+            pulled = list(islice(self._source, self._batch))
+            if len(pulled) < self._batch:
+                self._exhausted = True
+            self.extend(pulled)
+        return list.__len__(self)
+    
+    def __bool__(self):
+        return len(self) > 0
+
+class TablePdfRenderer:
+    """Renders row iterators (CSV, XLSX sheets) as paginated PDF tables"""
+    
+    def __init__(self, font_size: float = None, sample_rows: int = None, margin: float = 36):
+        self.font_size = font_size or Config.TABLE_FONT_SIZE
+        self.sample_rows = sample_rows or Config.TABLE_SAMPLE_ROWS
+        self.margin = margin
+        self.cell_padding = 2
+        self.max_cell_chars = 60
+    
+    def render(self, rows, output_path: str, title: str = None) -> bool:
+        """Render rows (first row is the header) to output_path"""
+        from reportlab.lib.pagesizes import A4, landscape
+        from reportlab.platypus import SimpleDocTemplate
+        
+        rows = iter(rows)
+        sample = list(islice(rows, self.sample_rows))
+        if not sample:
+            return False
+        
+        column_count = max(len(row) for row in sample)
+        pagesize = landscape(A4) if column_count > 6 else A4
+        doc = SimpleDocTemplate(
+            output_path,
+            pagesize=pagesize,
+            leftMargin=self.margin,
+            rightMargin=self.margin,
+            topMargin=self.margin,
+            bottomMargin=self.margin,
+            title=title or ''
+        )
+        
+        col_widths = self._sample_column_widths(sample, column_count, doc.width)
+        row_height = self.font_size * 1.2 + 2 * self.cell_padding
+        # Frame padding is 6pt on each side; leave one row of slack so every
+        # chunk fits on exactly one page and never needs splitting.
+        rows_per_page = max(1, int((doc.height - 12) // row_height) - 2)
+        
+        header = self._normalize_row(sample[0], column_count, col_widths)
+        body = chain(sample[1:], rows)
+        chunks = self._iter_chunks(header, body, column_count, col_widths, row_height, rows_per_page)
+        
+        doc.build(StreamingStory(chunks, low_water=2, batch=2))
+        return True
+    
+    def _iter_chunks(self, header, body, column_count, col_widths, row_height, rows_per_page):
+        """Yield one Table flowable per page worth of rows"""
+        from reportlab.platypus import Table
+        
+        style = self._table_style()
+        while True:
+            chunk = [self._normalize_row(row, column_count, col_widths)
+                     for row in islice(body, rows_per_page)]
+            if not chunk:
+                return
+            data = [header] + chunk
+            table = Table(data, colWidths=col_widths, rowHeights=[row_height] * len(data), repeatRows=1)
+            table.setStyle(style)
+            yield table
+            if len(chunk) < rows_per_page:
+                return
+    
+    def _sample_column_widths(self, sample, column_count: int, available_width: float) -> list:
+        """Distribute the page width by the typical text length seen in the sample"""
+        lengths = [[] for _ in range(column_count)]
+        for row in sample:
+            for index in range(column_count):
+                value = row[index] if index < len(row) else ''
+                lengths[index].append(min(len(str(value or '')), self.max_cell_chars))
+        
+        weights = []
+        for column in lengths:
+            column.sort()
+            # 90th percentile keeps one long outlier from claiming the page
+            typical = column[int(len(column) * 0.9)] if len(column) > 1 else column[0]
+            weights.append(max(typical, 3))
+        
+        total = float(sum(weights))
+        return [available_width * weight / total for weight in weights]
+    
+    def _normalize_row(self, row, column_count: int, col_widths: list) -> list:
+        """Pad short rows and clip cell text to the column width"""
+        cells = []
+        for index in range(column_count):
+            value = row[index] if index < len(row) else ''
+            text = '' if value is None else str(value).replace('\n', ' ')
+            max_chars = max(1, int((col_widths[index] - 2 * self.cell_padding) / (self.font_size * 0.55)))
+            if len(text) > max_chars:
+                text = text[:max(1, max_chars - 1)] + '\u2026'
+            cells.append(text)
+        return cells
+    
+    def _table_style(self):
+        """Shared grid style for every table chunk"""
+        from reportlab.lib import colors
+        from reportlab.platypus import TableStyle
+        
+        return TableStyle([
+            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), self.font_size),
+            ('LEADING', (0, 0), (-1, -1), self.font_size * 1.2),
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#e8e8e8')),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f7f7f7')]),
+            ('GRID', (0, 0), (-1, -1), 0.25, colors.HexColor('#bbbbbb')),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('TOPPADDING', (0, 0), (-1, -1), self.cell_padding),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), self.cell_padding),
+            ('LEFTPADDING', (0, 0), (-1, -1), self.cell_padding),
+            ('RIGHTPADDING', (0, 0), (-1, -1), self.cell_padding),
+        ])
@@ -0,0 +1,66 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class RenderCache:
+    """Per-process LRU cache of rendered output keyed by input content hash"""
+    
+    def __init__(self, max_bytes: int = None, max_entry_bytes: int = None):
+        self.max_bytes = max_bytes if max_bytes is not None else Config.RENDER_CACHE_MAX_BYTES
+        self.max_entry_bytes = max_entry_bytes if max_entry_bytes is not None else Config.RENDER_CACHE_MAX_ENTRY_BYTES
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # When a list, puts are also appended here (a sandboxed child hands them back)
+        self.journal = None
+    
+    @staticmethod
+    def file_digest(path: str, namespace: str, chunk_size: int = 1024 * 1024) -> str:
+        """Hash a file's bytes together with the renderer namespace"""
+        digest = hashlib.sha256(namespace.encode('utf-8'))
+        digest.update(b'\0')
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    def get(self, key: str):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def put(self, key: str, value: str) -> bool:
+        """Store a value unless it is larger than one entry may be"""
+        size = len(value)
+        if size > self.max_entry_bytes or size > self.max_bytes:
+            return False
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = value
+            self._size += size
+            if self.journal is not None:
+                self.journal.append((key, value))
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+        return True
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._size, 'hits': self.hits, 'misses': self.misses}
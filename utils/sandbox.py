@@ -0,0 +1,168 @@
+import os
+import json
+import time
+import select
+import signal
+import logging
+from pathlib import Path
+from config import Config
+from utils.capabilities import preload
+from utils.log_pipeline import flush_logging
+
+try:
+    import resource
+except ImportError:  # not on Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# Child exit signals that mean a resource limit was hit, as structured errors
+LIMIT_SIGNALS = {
+    signal.SIGXCPU: ('cpu_limit', 'Conversion used too much CPU time'),
+    signal.SIGXFSZ: ('output_limit', 'Conversion output is too large'),
+}
+LIMIT_ERRORS = {'timeout', 'cpu_limit', 'memory_limit', 'output_limit', 'crashed'}
+
+def parse_timeouts(spec: str) -> dict:
+    """Parse 'key=seconds,...' where a key is an input>target pair or an engine name"""
+    timeouts = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        key, _, seconds = item.partition('=')
+        timeouts[key.strip().lower()] = max(1.0, float(seconds))
+    timeouts.setdefault('default', 30.0)
+    return timeouts
+
+class ConversionSandbox:
+    """Runs each conversion in a forked child with rlimits and a wall-clock timeout
+
+    The child inherits the loaded converter, so nothing is re-imported; it
+    gets RLIMIT_AS, RLIMIT_CPU and RLIMIT_FSIZE, runs one job and reports
+    back over a pipe. A bomb or a runaway layout kills the child only, and
+    the worker turns that into an error result for the one request.
+    """
+    
+    def __init__(self, timeouts: dict = None):
+        self.enabled = Config.SANDBOX_ENABLED and resource is not None and hasattr(os, 'fork')
+        self.timeouts = timeouts or parse_timeouts(Config.SANDBOX_TIMEOUTS)
+        self.exempt = {name.strip() for name in Config.SANDBOX_EXEMPT_ENGINES.split(',') if name.strip()}
+        self.max_memory = Config.SANDBOX_MAX_MEMORY_MB * 1024 * 1024
+        self.max_cpu = Config.SANDBOX_MAX_CPU_SECONDS
+        self.max_output = Config.SANDBOX_MAX_OUTPUT_MB * 1024 * 1024
+    
+    def timeout_for(self, engine: str, input_path: str, target_format: str) -> float:
+        pair = f"{Path(input_path).suffix[1:].lower()}>{target_format.lower()}"
+        return self.timeouts.get(pair) or self.timeouts.get(engine) or self.timeouts['default']
+    
+    def convert(self, converter, engine: str, input_path: str, output_path: str, target_format: str, options: dict = None) -> dict:
+        """converter.convert_file in a limited child; same result dict, plus error_code on limits"""
+        # The LibreOffice pool already isolates its soffice processes and times out jobs
+        if not self.enabled or engine in self.exempt:
+            try:
+                return converter.convert_file(input_path, output_path, target_format, options)
+            except MemoryError:
+                return {'success': False, 'error': 'Conversion ran out of memory', 'error_code': 'memory_limit'}
+        
+        # Import the engine here once, so each child inherits it instead of importing it again
+        preload(engine)
+        timeout = self.timeout_for(engine, input_path, target_format)
+        journal = []
+        converter.render_cache.journal = journal
+        try:
+            payload = self._run(lambda: converter.convert_file(input_path, output_path, target_format, options),
+                                journal, timeout)
+        finally:
+            converter.render_cache.journal = None
+        
+        # Keep what the child rendered, or the parent's cache never warms up
+        for key, value in payload.pop('cache', []):
+            converter.render_cache.put(key, value)
+        
+        result = payload.get('result')
+        if result is None:
+            logger.warning(f"Sandboxed {engine} conversion of {os.path.basename(input_path)} to {target_format} "
+                           f"failed: {payload['error_code']}")
+            result = {'success': False, 'error': payload['error'], 'error_code': payload['error_code']}
+        if not result.get('success'):
+            try:
+                os.remove(output_path)  # whatever the child got written before it failed
+            except OSError:
+                pass
+        return result
+    
+    def _limit_child(self):
+        os.setpgid(0, 0)  # own group, so a timeout also takes down anything it spawned
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGQUIT, signal.SIGHUP,
+                       signal.SIGUSR1, signal.SIGUSR2, signal.SIGWINCH, signal.SIGCHLD):
+            signal.signal(signum, signal.SIG_DFL)  # not the gunicorn worker's handlers
+        # Python ignores SIGXFSZ, which would leave an EFBIG for the converters to swallow
+        signal.signal(signal.SIGXFSZ, signal.SIG_DFL)
+        if self.max_memory > 0:
+            resource.setrlimit(resource.RLIMIT_AS, (self.max_memory, self.max_memory))
+        if self.max_cpu > 0:
+            # SIGXCPU at the soft limit, SIGKILL at the hard one
+            resource.setrlimit(resource.RLIMIT_CPU, (self.max_cpu, self.max_cpu + 5))
+        if self.max_output > 0:
+            resource.setrlimit(resource.RLIMIT_FSIZE, (self.max_output, self.max_output))
+    
+    def _run(self, job, journal: list, timeout: float) -> dict:
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            try:
+                self._limit_child()
+                payload = {'result': job()}
+            except MemoryError:
+                payload = {'error': 'Conversion ran out of memory', 'error_code': 'memory_limit'}
+            except BaseException as e:
+                payload = {'error': f'Conversion error: {str(e)}', 'error_code': 'crashed'}
+            try:
+                payload['cache'] = journal
+                with os.fdopen(write_fd, 'w', encoding='utf-8') as pipe:
+                    json.dump(payload, pipe)
+                flush_logging()
+            finally:
+                os._exit(0)
+        
+        os.close(write_fd)
+        chunks = []
+        timed_out = False
+        deadline = time.monotonic() + timeout
+        with os.fdopen(read_fd, 'rb') as pipe:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    timed_out = True
+                    self._kill(pid)
+                    break
+                ready, _, _ = select.select([pipe], [], [], remaining)
+                if ready:
+                    chunk = os.read(pipe.fileno(), 65536)
+                    if not chunk:
+                        break
+                    chunks.append(chunk)
+        _, status = os.waitpid(pid, 0)
+        
+        if timed_out:
+            return {'error': f'Conversion timed out after {timeout:g} seconds', 'error_code': 'timeout'}
+        if os.WIFSIGNALED(status):
+            signum = os.WTERMSIG(status)
+            if signum in LIMIT_SIGNALS:
+                code, message = LIMIT_SIGNALS[signum]
+            else:
+                code, message = 'crashed', f'Conversion process crashed ({signal.Signals(signum).name})'
+            return {'error': message, 'error_code': code}
+        try:
+            return json.loads(b''.join(chunks))
+        except ValueError:
+            return {'error': 'Conversion process exited without a result', 'error_code': 'crashed'}
+    
+    @staticmethod
+    def _kill(pid: int):
+        try:
+            os.killpg(pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
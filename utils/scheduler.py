@@ -0,0 +1,187 @@
+import os
+import json
+import time
+import atexit
+import logging
+import threading
+from collections import deque
+from contextlib import ExitStack, contextmanager
+from config import Config
+from utils.admission import AdmissionController, AdmissionRejected, parse_limits
+
+logger = logging.getLogger(__name__)
+
+# Rough cost of a pair per input byte, relative to a plain text/data conversion
+ENGINE_COST = {
+    'libreoffice': 8,
+    'chromium': 6,
+    'pymupdf': 6,
+    'reportlab': 3,
+    'pillow': 2,
+    'default': 1,
+}
+
+LANES = ('fast', 'bulk')
+
+def _percentiles(samples: list) -> dict:
+    if not samples:
+        return {'p50': None, 'p95': None, 'p99': None, 'max': None}
+    ordered = sorted(samples)
+    pick = lambda q: round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 1)
+    return {'p50': pick(0.50), 'p95': pick(0.95), 'p99': pick(0.99), 'max': round(ordered[-1] * 1000, 1)}
+
+class LaneMetrics:
+    """Recent queue-wait and run-time samples per lane, merged across workers
+
+    Each process keeps a bounded window of samples and rewrites its own
+    snapshot file at most every flush_jobs jobs or flush_seconds seconds
+    (and at exit), so most requests never touch the disk for it; readers
+    merge the snapshots of live processes, so any worker can answer for
+    the whole host.
+    """
+    
+    def __init__(self, directory: str, sample_size: int = None, flush_jobs: int = None, flush_seconds: float = None):
+        self.directory = directory
+        self.sample_size = sample_size or Config.LANE_SAMPLE_SIZE
+        self.flush_jobs = flush_jobs or Config.LANE_METRICS_FLUSH_JOBS
+        self.flush_seconds = flush_seconds if flush_seconds is not None else Config.LANE_METRICS_FLUSH_SECONDS
+        self._lock = threading.Lock()
+        self._reset()
+        atexit.register(self.flush)
+    
+    def _reset(self):
+        self.pid = os.getpid()
+        self.waits = {lane: deque(maxlen=self.sample_size) for lane in LANES}
+        self.runs = {lane: deque(maxlen=self.sample_size) for lane in LANES}
+        self.jobs = {lane: 0 for lane in LANES}
+        self.rejected = {lane: 0 for lane in LANES}
+        self._unflushed = 0
+        self._flushed_at = time.monotonic()
+    
+    def _snapshot_path(self, pid: int) -> str:
+        return os.path.join(self.directory, f'lane-metrics.{pid}.json')
+    
+    def record(self, lane: str, wait: float = None, run: float = None, rejected: bool = False):
+        with self._lock:
+            if self.pid != os.getpid():
+                self._reset()  # forked: the parent's samples are not ours
+            if rejected:
+                self.rejected[lane] += 1
+            else:
+                self.jobs[lane] += 1
+                self.waits[lane].append(wait)
+                self.runs[lane].append(run)
+            self._unflushed += 1
+            due = self._unflushed >= self.flush_jobs or time.monotonic() - self._flushed_at >= self.flush_seconds
+        if due:
+            self.flush()
+    
+    def flush(self):
+        """Write this process's snapshot if it recorded anything since the last write"""
+        with self._lock:
+            if self.pid != os.getpid() or not self._unflushed:
+                return  # nothing new, or forked and the samples are the parent's
+            snapshot = {
+                'jobs': dict(self.jobs),
+                'rejected': dict(self.rejected),
+                'waits': {lane: list(values) for lane, values in self.waits.items()},
+                'runs': {lane: list(values) for lane, values in self.runs.items()},
+            }
+            self._unflushed = 0
+            self._flushed_at = time.monotonic()
+        try:
+            path = self._snapshot_path(self.pid)
+            with open(f'{path}.tmp', 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f)
+            os.replace(f'{path}.tmp', path)
+        except OSError as e:
+            logger.debug("Lane metrics snapshot error: %s", e)
+    
+    def merged(self) -> dict:
+        self.flush()  # the answering worker's own samples are always current
+        totals = {lane: {'jobs': 0, 'rejected': 0, 'waits': [], 'runs': []} for lane in LANES}
+        workers = 0
+        for name in os.listdir(self.directory):
+            if not (name.startswith('lane-metrics.') and name.endswith('.json')):
+                continue
+            pid = int(name.split('.')[1])
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                # Worker is gone (recycled by max_requests); drop its samples
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+                continue
+            except PermissionError:
+                pass
+            try:
+                with open(os.path.join(self.directory, name), 'r', encoding='utf-8') as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            workers += 1
+            for lane in LANES:
+                totals[lane]['jobs'] += snapshot['jobs'].get(lane, 0)
+                totals[lane]['rejected'] += snapshot['rejected'].get(lane, 0)
+                totals[lane]['waits'] += snapshot['waits'].get(lane, [])
+                totals[lane]['runs'] += snapshot['runs'].get(lane, [])
+        
+        return {
+            'workers': workers,
+            'lanes': {
+                lane: {
+                    'jobs': values['jobs'],
+                    'rejected': values['rejected'],
+                    'queue_wait_ms': _percentiles(values['waits']),
+                    'latency_ms': _percentiles(values['runs']),
+                }
+                for lane, values in totals.items()
+            }
+        }
+
+class ConversionScheduler:
+    """Routes each job to the fast or bulk lane by input size x pair cost
+
+    Lanes have their own slot and queue capacity, so small jobs never wait
+    behind big ones; bulk jobs are also kept off FAST_LANE_RESERVED slots of
+    every engine so a burst of large files cannot take a whole engine.
+    """
+    
+    def __init__(self, engines: AdmissionController = None):
+        self.engines = engines or AdmissionController()
+        self.lanes = AdmissionController(limits=parse_limits(Config.LANE_LIMITS))
+        self.max_fast_cost = Config.FAST_LANE_MAX_COST_BYTES
+        self.reserved = Config.FAST_LANE_RESERVED
+        self.metrics = LaneMetrics(self.engines.lock_dir)
+    
+    def classify(self, engine: str, size: int) -> str:
+        cost = (size or 0) * ENGINE_COST.get(engine, ENGINE_COST['default'])
+        return 'fast' if cost <= self.max_fast_cost else 'bulk'
+    
+    @contextmanager
+    def admit(self, engine: str, size: int):
+        """Hold a lane slot and an engine slot for the body; yields the lane"""
+        lane = self.classify(engine, size)
+        enqueued = time.monotonic()
+        with ExitStack() as stack:
+            try:
+                stack.enter_context(self.lanes.slot(lane))
+                stack.enter_context(self.engines.slot(engine, reserve=0 if lane == 'fast' else self.reserved))
+            except AdmissionRejected:
+                self.metrics.record(lane, rejected=True)
+                raise
+            started = time.monotonic()
+            try:
+                yield lane
+            finally:
+                self.metrics.record(lane, started - enqueued, time.monotonic() - started)
+    
+    def stats(self) -> dict:
+        stats = self.metrics.merged()
+        for lane in LANES:
+            slots, queue = self.lanes.limits_for(lane)
+            stats['lanes'][lane].update({'slots': slots, 'queue': queue})
+        stats['fast_lane_max_cost_bytes'] = self.max_fast_cost
+        return stats
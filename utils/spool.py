@@ -0,0 +1,65 @@
+import os
+import logging
+import tempfile
+from contextlib import contextmanager
+from functools import lru_cache
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class Spool:
+    """Size-tiered scratch space: small files on tmpfs, everything else on disk
+
+    Files are ordinary paths, so libraries that insist on a filename work
+    unchanged; only where they live depends on their (expected) size and on
+    how much room the tmpfs has left.
+    """
+    
+    def __init__(self, directory: str = None, max_bytes: int = None, min_free_bytes: int = None):
+        self.directory = os.path.abspath(directory) if directory else None
+        self.max_bytes = Config.SPOOL_MAX_BYTES if max_bytes is None else max_bytes
+        self.min_free_bytes = Config.SPOOL_MIN_FREE_BYTES if min_free_bytes is None else min_free_bytes
+        self.enabled = bool(self.directory) and self.max_bytes > 0 and self._prepare()
+    
+    def _prepare(self) -> bool:
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            if os.access(self.directory, os.W_OK):
+                return True
+        except OSError as e:
+            logger.warning(f"Spool directory unavailable: {str(e)}")
+        return False
+    
+    def accepts(self, size) -> bool:
+        """Whether a file of about this many bytes should go to the spool"""
+        if not self.enabled or size is None or size > self.max_bytes:
+            return False
+        try:
+            fs = os.statvfs(self.directory)
+        except OSError:
+            return False
+        return fs.f_bavail * fs.f_frsize - size >= self.min_free_bytes
+    
+    def owns(self, path: str) -> bool:
+        return self.enabled and os.path.dirname(os.path.abspath(path)) == self.directory
+    
+    def path_for(self, filename: str) -> str:
+        return os.path.join(self.directory, filename)
+    
+    @contextmanager
+    def temp_path(self, suffix: str = '', size_hint: int = None, fallback_dir: str = None):
+        """Yield a scratch file path that is removed afterwards"""
+        directory = self.directory if self.accepts(size_hint) else fallback_dir
+        fd, path = tempfile.mkstemp(prefix='spool_', suffix=suffix, dir=directory)
+        os.close(fd)
+        try:
+            yield path
+        finally:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+@lru_cache(maxsize=None)
+def get_spool() -> Spool:
+    return Spool(Config.SPOOL_DIR)
@@ -0,0 +1,173 @@
+import os
+import logging
+from config import Config
+from utils.downloads import attachment_header, guess_mimetype
+from utils.storage_layout import sharded_path
+
+logger = logging.getLogger(__name__)
+
+class LocalStorage:
+    """Converted files stay in CONVERTED_FOLDER and are served by the app"""
+    
+    remote = False
+    
+    def __init__(self, folder: str = None):
+        self.folder = folder or Config.CONVERTED_FOLDER
+    
+    def store(self, local_path: str, name: str) -> str:
+        # Conversions already write into the sharded folder
+        return local_path
+    
+    def size(self, name: str):
+        try:
+            return os.path.getsize(sharded_path(self.folder, name))
+        except OSError:
+            return None
+    
+    def delete(self, name: str) -> bool:
+        try:
+            os.remove(sharded_path(self.folder, name))
+            return True
+        except OSError:
+            return False
+    
+    def configure_expiry(self, retention_hours: int):
+        # Local expiry is handled by CleanupManager
+        pass
+
+class S3Storage:
+    """Converted files live in an S3-compatible bucket (AWS S3, MinIO, ...)
+
+    Outputs are streamed up as multipart uploads and removed locally, downloads
+    are presigned redirects, and a bucket lifecycle rule expires them, so no
+    node keeps state between requests.
+    """
+    
+    remote = True
+    
+    def __init__(self, bucket: str = None, prefix: str = None, endpoint_url: str = None, region: str = None):
+        self.bucket = bucket or Config.S3_BUCKET
+        self.prefix = (prefix if prefix is not None else Config.S3_PREFIX).strip('/')
+        self.endpoint_url = endpoint_url or Config.S3_ENDPOINT_URL
+        self.region = region or Config.S3_REGION
+        self.presign_seconds = Config.S3_PRESIGN_SECONDS
+        self._client = None
+        self._transfer_config = None
+        if not self.bucket:
+            raise ValueError('S3_BUCKET must be set for the s3 storage backend')
+    
+    @property
+    def client(self):
+        # boto3 is only needed (and imported) when the s3 backend is in use
+        if self._client is None:
+            import boto3
+            from botocore.config import Config as BotoConfig
+            
+            self._client = boto3.client(
+                's3',
+                endpoint_url=self.endpoint_url,
+                region_name=self.region,
+                config=BotoConfig(
+                    signature_version='s3v4',
+                    s3={'addressing_style': 'path' if self.endpoint_url else 'auto'},
+                    max_pool_connections=max(10, Config.S3_MAX_CONCURRENCY * 2)
+                )
+            )
+        return self._client
+    
+    @property
+    def transfer_config(self):
+        if self._transfer_config is None:
+            from boto3.s3.transfer import TransferConfig
+            
+            self._transfer_config = TransferConfig(
+                multipart_threshold=Config.S3_MULTIPART_THRESHOLD,
+                multipart_chunksize=Config.S3_MULTIPART_CHUNK_SIZE,
+                max_concurrency=Config.S3_MAX_CONCURRENCY,
+                use_threads=Config.S3_MAX_CONCURRENCY > 1
+            )
+        return self._transfer_config
+    
+    def key(self, name: str) -> str:
+        # Hash prefixes spread keys across S3 partitions like they spread directories
+        shard = sharded_path('', name)
+        return f'{self.prefix}/{shard}' if self.prefix else shard
+    
+    def store(self, local_path: str, name: str) -> str:
+        """Stream a converted file to the bucket in multipart chunks, then drop the local copy"""
+        key = self.key(name)
+        self.client.upload_file(
+            local_path,
+            self.bucket,
+            key,
+            ExtraArgs={'ContentType': guess_mimetype(name)},
+            Config=self.transfer_config
+        )
+        os.remove(local_path)
+        logger.info(f"Stored {name} in s3://{self.bucket}/{key}")
+        return key
+    
+    def download_url(self, name: str, download_name: str) -> str:
+        """Presigned GET that makes the bucket send the attachment headers"""
+        return self.client.generate_presigned_url(
+            'get_object',
+            Params={
+                'Bucket': self.bucket,
+                'Key': self.key(name),
+                'ResponseContentType': guess_mimetype(download_name),
+                'ResponseContentDisposition': attachment_header(download_name),
+            },
+            ExpiresIn=self.presign_seconds
+        )
+    
+    def size(self, name: str):
+        from botocore.exceptions import ClientError
+        
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=self.key(name))['ContentLength']
+        except ClientError:
+            return None
+    
+    def delete(self, name: str) -> bool:
+        try:
+            self.client.delete_object(Bucket=self.bucket, Key=self.key(name))
+            return True
+        except Exception as e:
+            logger.error(f"Error deleting {name} from S3: {str(e)}")
+            return False
+    
+    def configure_expiry(self, retention_hours: int):
+        """Create the bucket if needed and let a lifecycle rule expire outputs"""
+        from botocore.exceptions import ClientError
+        
+        try:
+            self.client.head_bucket(Bucket=self.bucket)
+        except ClientError:
+            params = {'Bucket': self.bucket}
+            if self.region and self.region != 'us-east-1':
+                params['CreateBucketConfiguration'] = {'LocationConstraint': self.region}
+            self.client.create_bucket(**params)
+            logger.info(f"Created bucket {self.bucket}")
+        
+        # Lifecycle expiry is counted in whole days
+        days = max(1, -(-retention_hours // 24))
+        self.client.put_bucket_lifecycle_configuration(
+            Bucket=self.bucket,
+            LifecycleConfiguration={'Rules': [{
+                'ID': 'expire-converted-files',
+                'Filter': {'Prefix': f'{self.prefix}/' if self.prefix else ''},
+                'Status': 'Enabled',
+                'Expiration': {'Days': days},
+                'AbortIncompleteMultipartUpload': {'DaysAfterInitiation': 1},
+            }]}
+        )
+        logger.info(f"Lifecycle expiry on s3://{self.bucket}/{self.prefix}: {days} day(s)")
+
+def get_storage():
+    """Build the storage backend selected by STORAGE_BACKEND"""
+    backend = Config.STORAGE_BACKEND.lower()
+    if backend == 's3':
+        return S3Storage()
+    if backend != 'local':
+        raise ValueError(f'Unknown STORAGE_BACKEND: {Config.STORAGE_BACKEND}')
+    return LocalStorage()
@@ -0,0 +1,80 @@
+import os
+import sys
+import hashlib
+from config import Config
+
+# A stored name lives at <folder>/<h0h1>/<h2h3>/<name> with h = sha1(name), so a
+# lookup is a path computation and no directory grows past a few entries.
+# Existing flat folders are migrated with:
+#     python -m utils.storage_layout [--dry-run] [folder ...]
+
+def shard_dir(folder: str, filename: str) -> str:
+    digest = hashlib.sha1(filename.encode('utf-8')).hexdigest()
+    return os.path.join(folder, digest[:2], digest[2:4])
+
+def sharded_path(folder: str, filename: str, create: bool = False) -> str:
+    """Where filename is stored under folder; create makes the shard directories"""
+    directory = shard_dir(folder, filename)
+    if create:
+        os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, filename)
+
+def relative_path(folder: str, filename: str) -> str:
+    return os.path.relpath(sharded_path(folder, filename), folder)
+
+def iter_stored_files(folder: str):
+    """Yield the path of every file in folder, sharded or not, skipping hidden directories"""
+    pending = [folder]
+    while pending:
+        try:
+            entries = os.scandir(pending.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not entry.name.startswith('.'):
+                            pending.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        yield entry.path
+                except OSError:
+                    continue
+
+def migrate_flat_files(folder: str, expiry_index=None, dry_run: bool = False) -> int:
+    """Move files sitting directly in folder into their shard; returns how many moved"""
+    moved = 0
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.name.startswith('.') or not entry.is_file(follow_symlinks=False):
+                continue
+            destination = sharded_path(folder, entry.name, create=not dry_run)
+            if dry_run:
+                print(f"{entry.path} -> {destination}")
+            else:
+                os.replace(entry.path, destination)
+                if expiry_index is not None:
+                    expiry_index.rename(entry.path, destination)
+            moved += 1
+    return moved
+
+def main(argv: list = None) -> int:
+    args = list(sys.argv[1:] if argv is None else argv)
+    dry_run = '--dry-run' in args
+    folders = [arg for arg in args if arg != '--dry-run'] or [Config.UPLOAD_FOLDER, Config.CONVERTED_FOLDER]
+    
+    expiry_index = None
+    if not dry_run:
+        from utils.expiry_index import ExpiryIndex
+        expiry_index = ExpiryIndex()
+    
+    for folder in folders:
+        if not os.path.isdir(folder):
+            print(f"Skipping {folder}: not a directory")
+            continue
+        moved = migrate_flat_files(folder, expiry_index, dry_run)
+        print(f"{folder}: {'would move' if dry_run else 'moved'} {moved} files")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,6 +5,54 @@ from config import Config
 
 logger = logging.getLogger(__name__)
 
+# Bytes read from the start of an upload to identify its real type
+SNIFF_BYTES = 512
+
+# Leading byte signatures: extension -> list of (offset, magic)
+MAGIC_SIGNATURES = {
+    'pdf': [(0, b'%PDF-')],
+    'png': [(0, b'\x89PNG\r\n\x1a\n')],
+    'jpg': [(0, b'\xff\xd8\xff')],
+    'jpeg': [(0, b'\xff\xd8\xff')],
+    'gif': [(0, b'GIF87a'), (0, b'GIF89a')],
+    'bmp': [(0, b'BM')],
+    'tiff': [(0, b'II*\x00'), (0, b'MM\x00*')],
+    'tif': [(0, b'II*\x00'), (0, b'MM\x00*')],
+    'webp': [(8, b'WEBP')],
+    'ico': [(0, b'\x00\x00\x01\x00')],
+    'docx': [(0, b'PK\x03\x04')],
+    'xlsx': [(0, b'PK\x03\x04')],
+    'pptx': [(0, b'PK\x03\x04')],
+    'zip': [(0, b'PK\x03\x04'), (0, b'PK\x05\x06')],
+    'doc': [(0, b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1')],
+    'xls': [(0, b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1')],
+    'ppt': [(0, b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1')],
+    'rtf': [(0, b'{\\rtf')],
+    'rar': [(0, b'Rar!\x1a\x07')],
+    '7z': [(0, b"7z\xbc\xaf'\x1c")],
+    'gz': [(0, b'\x1f\x8b')],
+    'tar': [(257, b'ustar')],
+    'mp3': [(0, b'ID3'), (0, b'\xff\xfb'), (0, b'\xff\xf3'), (0, b'\xff\xf2')],
+    'wav': [(8, b'WAVE')],
+    'flac': [(0, b'fLaC')],
+    'aac': [(0, b'\xff\xf1'), (0, b'\xff\xf9'), (0, b'ADIF')],
+    'ogg': [(0, b'OggS')],
+    'mp4': [(4, b'ftyp')],
+    'mov': [(4, b'ftyp'), (4, b'moov'), (4, b'mdat'), (4, b'wide')],
+    'avi': [(8, b'AVI ')],
+    'wmv': [(0, b'\x30\x26\xb2\x75\x8e\x66\xcf\x11')],
+    'flv': [(0, b'FLV')],
+    'mkv': [(0, b'\x1a\x45\xdf\xa3')],
+    'webm': [(0, b'\x1a\x45\xdf\xa3')],
+}
+
+# Formats that must be text rather than binary
+TEXT_FORMATS = {
+    'txt', 'md', 'html', 'htm', 'csv', 'json', 'xml', 'svg',
+    'py', 'js', 'css', 'php', 'java', 'cpp', 'c', 'cs', 'rb', 'go', 'rs',
+    'log', 'ini', 'cfg', 'conf', 'yaml', 'yml', 'toml',
+}
+
 class FileValidator:
     """Validates uploaded files for safety and compatibility"""
     
@@ -64,10 +112,14 @@ class FileValidator:
         extension = Path(filename).suffix[1:].lower()
         return extension in self.ALLOWED_EXTENSIONS
     
-    def validate_file(self, file_path: str, original_filename: str = None) -> dict:
-        """Comprehensive file validation"""
+    def validate_file(self, file_path: str, original_filename: str = None, ingest: dict = None) -> dict:
+        """Comprehensive file validation
+
+        ingest is the summary from streaming ingestion; its size and signature
+        check are reused instead of reading the file again.
+        """
         try:
-            if not os.path.exists(file_path):
+            if ingest is None and not os.path.exists(file_path):
                 return {
                     'valid': False,
                     'error': 'File does not exist',
@@ -86,7 +138,7 @@ class FileValidator:
                 }
             
             # Validate file size
-            file_size = os.path.getsize(file_path)
+            file_size = ingest['size'] if ingest is not None else os.path.getsize(file_path)
             max_size = self._get_max_size_for_format(file_ext)
             
             if file_size > max_size:
@@ -96,6 +148,16 @@ class FileValidator:
                     'details': f'File size ({self._format_size(file_size)}) exceeds maximum allowed size ({self._format_size(max_size)})'
                 }
             
+            # Validate content against the extension
+            if ingest is None:
+                with open(file_path, 'rb') as f:
+                    head = f.read(SNIFF_BYTES)
+                signature_ok = self.check_signature(file_ext, head)
+            else:
+                signature_ok = ingest['signature_ok']
+            if not signature_ok:
+                return self.signature_error(file_ext)
+            
             # Basic security checks
             security_check = self._validate_security(file_path)
             if not security_check['valid']:
@@ -144,6 +206,46 @@ class FileValidator:
         else:
             return self.MAX_FILE_SIZES['default']
     
+    def get_max_size_for_format(self, extension: str) -> int:
+        """Public access to the per-format size limit"""
+        return self._get_max_size_for_format(extension.lower())
+    
+    def check_signature(self, extension: str, head: bytes) -> bool:
+        """Check the first bytes of a file against what its extension claims"""
+        extension = extension.lower()
+        if not head:
+            return True  # empty files are judged by the converters
+        
+        signatures = MAGIC_SIGNATURES.get(extension)
+        if signatures is not None:
+            for offset, magic in signatures:
+                if head[offset:offset + len(magic)] == magic:
+                    return True
+            # Files shorter than every signature cannot be judged here
+            return all(len(head) < offset + len(magic) for offset, magic in signatures)
+        
+        if extension in TEXT_FORMATS:
+            if head.startswith((b'\xff\xfe', b'\xfe\xff')):
+                return True  # UTF-16 text carries NUL bytes
+            return b'\x00' not in head
+        
+        return True
+    
+    def size_limit_error(self, extension: str) -> dict:
+        max_size = self._get_max_size_for_format(extension)
+        return {
+            'valid': False,
+            'error': 'File too large',
+            'details': f'File size exceeds maximum allowed size for .{extension} files ({self._format_size(max_size)})'
+        }
+    
+    def signature_error(self, extension: str) -> dict:
+        return {
+            'valid': False,
+            'error': 'File content does not match its extension',
+            'details': f'The uploaded data is not a valid .{extension} file.'
+        }
+    
     def _validate_security(self, file_path: str) -> dict:
         """Basic security validation"""
         try:
@@ -0,0 +1,117 @@
+import os
+import time
+import shutil
+import logging
+import tempfile
+import threading
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Tiny synthetic job per engine: (input name, input bytes or None for a PNG, target format)
+WARMUP_JOBS = {
+    'pillow': ('warmup.png', None, 'gif'),
+    'reportlab': ('warmup.txt', b'Warm-up\n', 'pdf'),
+    'pymupdf': ('warmup.pdf', None, 'png'),
+    'libreoffice': ('warmup.rtf', b'{\\rtf1\\ansi Warm-up\\par}', 'txt'),
+    'default': ('warmup.md', b'# Warm-up\n\n*text* and `code`\n', 'html'),
+}
+
+class WarmupState:
+    """Readiness of the host: ready once every worker slot has warmed up
+
+    A sync worker only accepts after its post_fork warm-up returns, so one
+    worker can never answer while it is still warming. Instead each warmed
+    worker appends its pid to a file shared by the workers of one master,
+    and the host is ready once that file has a line per configured worker.
+    Recycled workers only add lines, so a max_requests restart never takes
+    the host out of rotation.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.path = None
+        self.expected = 0
+        self.timings = {}
+    
+    def track(self, path: str, expected: int):
+        """Count this worker toward the host's readiness (call before warming up)"""
+        with self._lock:
+            self.path = path
+            self.expected = expected
+    
+    def finish(self, timings: dict):
+        with self._lock:
+            self.timings = timings
+            if self.path:
+                # One short O_APPEND write per worker, so workers never interleave
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(f'{os.getpid()}\n')
+    
+    def warmed(self) -> int:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return sum(1 for _ in f)
+        except OSError:
+            return 0
+    
+    def snapshot(self) -> dict:
+        with self._lock:
+            status = {'ready': True, 'pid': os.getpid(), 'warmup_ms': dict(self.timings)}
+            if self.path:
+                warmed = self.warmed()
+                status.update(ready=warmed >= self.expected, workers_warmed=warmed, workers=self.expected)
+            return status
+
+state = WarmupState()
+
+def _write_input(work_dir: str, engine: str, converter) -> tuple:
+    name, data, target_format = WARMUP_JOBS[engine]
+    path = os.path.join(work_dir, name)
+    if name.endswith('.png'):
+        from PIL import Image
+        Image.new('RGB', (16, 16), color='white').save(path, format='PNG')
+    elif name.endswith('.pdf'):
+        # Rendered from text so fitz has a real document to open
+        text_path = os.path.join(work_dir, 'warmup_source.txt')
+        with open(text_path, 'wb') as f:
+            f.write(b'Warm-up\n')
+        if not converter.convert_file(text_path, path, 'pdf').get('success'):
+            return None, target_format
+    else:
+        with open(path, 'wb') as f:
+            f.write(data)
+    return path, target_format
+
+def warm_up(converter, engines: list = None) -> dict:
+    """Run one tiny conversion per enabled engine in this process and keep what it loaded
+
+    Runs in-process on purpose (not in the sandbox), so fonts, stylesheets,
+    plugins and pool instances stay in the worker and its future children.
+    Returns milliseconds per engine; failures are logged and skipped.
+    """
+    if engines is None:
+        engines = [name.strip() for name in Config.WARMUP_ENGINES.split(',') if name.strip()]
+    timings = {}
+    work_dir = tempfile.mkdtemp(prefix='warmup_')
+    try:
+        for engine in engines:
+            if engine not in WARMUP_JOBS:
+                logger.warning(f"No warm-up job for engine {engine}")
+                continue
+            started = time.monotonic()
+            try:
+                input_path, target_format = _write_input(work_dir, engine, converter)
+                output_path = os.path.join(work_dir, f'{engine}_out.{target_format}')
+                if input_path is None or not converter.convert_file(input_path, output_path, target_format).get('success'):
+                    logger.warning(f"Warm-up conversion for {engine} failed")
+                    continue
+            except Exception as e:
+                logger.warning(f"Warm-up for {engine} error: {str(e)}")
+                continue
+            timings[engine] = round((time.monotonic() - started) * 1000, 1)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        state.finish(timings)
+    logger.info(f"Worker {os.getpid()} warmed up: {timings}")
+    return timings
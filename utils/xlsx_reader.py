@@ -0,0 +1,342 @@
+import os
+import re
+import csv
+import json
+import shutil
+import logging
+import tempfile
+import zipfile
+import posixpath
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from xml.sax.saxutils import escape
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+MAIN_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+PKG_REL_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+
+def _m(tag: str) -> str:
+    return f'{{{MAIN_NS}}}{tag}'
+
+# Built-in number formats that display dates or times
+BUILTIN_DATE_FORMATS = set(range(14, 23)) | set(range(27, 37)) | set(range(45, 48)) | set(range(50, 59))
+
+_FORMAT_LITERALS = re.compile(r'"[^"]*"|\[[^\]]*\]|\\.')
+
+def column_index(ref: str) -> int:
+    """Convert a cell reference such as 'AB12' to a zero-based column index"""
+    index = 0
+    for char in ref:
+        if 'A' <= char <= 'Z':
+            index = index * 26 + (ord(char) - 64)
+        else:
+            break
+    return index - 1
+
+class XlsxReader:
+    """Streams rows out of an XLSX workbook without loading the sheets into memory"""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.archive = zipfile.ZipFile(path)
+        self.date1904 = False
+        self.sheets = self._read_workbook()
+        self._shared_strings = None
+        self._date_styles = None
+    
+    def close(self):
+        self.archive.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def _read_workbook(self) -> list:
+        """Return [(sheet name, part path)] in workbook order"""
+        rels = {}
+        with self.archive.open('xl/_rels/workbook.xml.rels') as f:
+            for rel in ET.parse(f).getroot().iter(f'{{{PKG_REL_NS}}}Relationship'):
+                target = rel.get('Target', '')
+                if target.startswith('/'):
+                    target = target[1:]
+                else:
+                    target = posixpath.normpath(posixpath.join('xl', target))
+                rels[rel.get('Id')] = target
+        
+        sheets = []
+        with self.archive.open('xl/workbook.xml') as f:
+            root = ET.parse(f).getroot()
+            properties = root.find(_m('workbookPr'))
+            if properties is not None and properties.get('date1904') in ('1', 'true'):
+                self.date1904 = True
+            for sheet in root.iter(_m('sheet')):
+                part = rels.get(sheet.get(f'{{{REL_NS}}}id'))
+                if part:
+                    sheets.append((sheet.get('name'), part))
+        return sheets
+    
+    def sheet_names(self) -> list:
+        return [name for name, _ in self.sheets]
+    
+    def resolve_sheet(self, sheet=None) -> str:
+        """Accept a sheet name, a 1-based index or None (first sheet)"""
+        names = self.sheet_names()
+        if not names:
+            raise ValueError('Workbook has no sheets')
+        if sheet in (None, ''):
+            return names[0]
+        if sheet in names:
+            return sheet
+        if str(sheet).isdigit() and 1 <= int(sheet) <= len(names):
+            return names[int(sheet) - 1]
+        raise ValueError(f'Sheet not found: {sheet}')
+    
+    def _load_shared_strings(self) -> list:
+        """Stream the shared string table; its size is bounded by distinct strings only"""
+        strings = []
+        try:
+            source = self.archive.open('xl/sharedStrings.xml')
+        except KeyError:
+            return strings
+        
+        with source:
+            for event, elem in ET.iterparse(source, events=('end',)):
+                if elem.tag == _m('si'):
+                    # Rich text runs each carry a <t>; phonetic hints (rPh) do not count
+                    parts = [t.text or '' for t in elem.iter(_m('t'))]
+                    for phonetic in elem.findall(_m('rPh')):
+                        for t in phonetic.iter(_m('t')):
+                            if t.text in parts:
+                                parts.remove(t.text)
+                    strings.append(''.join(parts))
+                    elem.clear()
+        return strings
+    
+    def _load_date_styles(self) -> set:
+        """Return the cell style indexes whose number format is a date/time"""
+        date_styles = set()
+        try:
+            source = self.archive.open('xl/styles.xml')
+        except KeyError:
+            return date_styles
+        
+        with source:
+            root = ET.parse(source).getroot()
+        
+        custom_dates = set()
+        num_fmts = root.find(_m('numFmts'))
+        if num_fmts is not None:
+            for fmt in num_fmts.iter(_m('numFmt')):
+                code = _FORMAT_LITERALS.sub('', fmt.get('formatCode', '')).lower()
+                if any(token in code for token in ('d', 'm', 'y', 'h', 's')) and 'general' not in code:
+                    custom_dates.add(int(fmt.get('numFmtId', -1)))
+        
+        cell_xfs = root.find(_m('cellXfs'))
+        if cell_xfs is not None:
+            for index, xf in enumerate(cell_xfs.iter(_m('xf'))):
+                fmt_id = int(xf.get('numFmtId', 0))
+                if fmt_id in BUILTIN_DATE_FORMATS or fmt_id in custom_dates:
+                    date_styles.add(index)
+        return date_styles
+    
+    def _format_date(self, value: str) -> str:
+        try:
+            serial = float(value)
+        except ValueError:
+            return value
+        base = datetime(1904, 1, 1) if self.date1904 else datetime(1899, 12, 30)
+        moment = base + timedelta(days=serial)
+        if serial == int(serial):
+            return moment.date().isoformat()
+        if serial < 1:
+            return moment.time().isoformat(timespec='seconds')
+        return moment.isoformat(sep=' ', timespec='seconds')
+    
+    def iter_rows(self, sheet=None):
+        """Yield each row of a sheet as a list of strings"""
+        name = self.resolve_sheet(sheet)
+        part = dict(self.sheets)[name]
+        
+        if self._shared_strings is None:
+            self._shared_strings = self._load_shared_strings()
+        if self._date_styles is None:
+            self._date_styles = self._load_date_styles()
+        shared_strings = self._shared_strings
+        date_styles = self._date_styles
+        
+        row_tag, cell_tag, value_tag = _m('row'), _m('c'), _m('v')
+        sheet_data_tag, inline_tag, text_tag = _m('sheetData'), _m('is'), _m('t')
+        
+        next_row = 1
+        sheet_data = None
+        with self.archive.open(part) as source:
+            for event, elem in ET.iterparse(source, events=('start', 'end')):
+                if event == 'start':
+                    if elem.tag == sheet_data_tag:
+                        sheet_data = elem
+                    continue
+                if elem.tag != row_tag:
+                    continue
+                
+                row_number = int(elem.get('r', next_row))
+                # Sparse sheets skip empty rows entirely; keep them for CSV fidelity
+                while next_row < row_number:
+                    yield []
+                    next_row += 1
+                next_row = row_number + 1
+                
+                values = []
+                for cell in elem.iter(cell_tag):
+                    ref = cell.get('r')
+                    if ref:
+                        col = column_index(ref)
+                        if col > len(values):
+                            values.extend([''] * (col - len(values)))
+                    
+                    cell_type = cell.get('t')
+                    if cell_type == 'inlineStr':
+                        inline = cell.find(inline_tag)
+                        text = ''.join(t.text or '' for t in inline.iter(text_tag)) if inline is not None else ''
+                    else:
+                        value = cell.find(value_tag)
+                        text = value.text if value is not None and value.text is not None else ''
+                        if cell_type == 's' and text:
+                            text = shared_strings[int(text)]
+                        elif cell_type == 'b':
+                            text = 'TRUE' if text == '1' else 'FALSE'
+                        elif cell_type in (None, 'n') and text and int(cell.get('s', 0)) in date_styles:
+                            text = self._format_date(text)
+                    values.append(text)
+                
+                yield values
+                # Drop the parsed row so memory stays flat across the sheet
+                elem.clear()
+                if sheet_data is not None:
+                    sheet_data.clear()
+    
+    def write_csv(self, output_path: str, sheet=None):
+        with open(output_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            for row in self.iter_rows(sheet):
+                writer.writerow(row)
+    
+    def write_ndjson(self, output_path: str, sheet=None):
+        with open(output_path, 'w', encoding='utf-8') as f:
+            for record in self.iter_records(sheet):
+                f.write(json.dumps(record, ensure_ascii=False))
+                f.write('\n')
+    
+    def write_json(self, output_path: str, sheet=None):
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write('[')
+            first = True
+            for record in self.iter_records(sheet):
+                f.write('\n  ' if first else ',\n  ')
+                f.write(json.dumps(record, ensure_ascii=False))
+                first = False
+            f.write('\n]' if not first else ']')
+    
+    def write_xml(self, output_path: str, sheet=None):
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write("<?xml version='1.0' encoding='utf-8'?>\n<data>")
+            for record in self.iter_records(sheet):
+                f.write('<record>')
+                for key, value in record.items():
+                    tag = _xml_tag(key)
+                    f.write(f'<{tag}>{escape(value)}</{tag}>')
+                f.write('</record>')
+            f.write('</data>')
+    
+    def iter_records(self, sheet=None):
+        """Yield rows after the first as dicts keyed by the header row"""
+        rows = self.iter_rows(sheet)
+        header = None
+        for row in rows:
+            if header is None:
+                if not any(row):
+                    continue
+                header = _unique_headers(row)
+                continue
+            if not any(row):
+                continue
+            if len(row) > len(header):
+                header.extend(f'column_{i + 1}' for i in range(len(header), len(row)))
+            yield {key: (row[i] if i < len(row) else '') for i, key in enumerate(header)}
+    
+    def write_sheet(self, output_path: str, target_format: str, sheet=None):
+        writers = {
+            'csv': self.write_csv,
+            'json': self.write_json,
+            'ndjson': self.write_ndjson,
+            'xml': self.write_xml,
+        }
+        writers[target_format](output_path, sheet)
+
+def _unique_headers(row: list) -> list:
+    headers = []
+    seen = set()
+    for index, value in enumerate(row):
+        name = str(value).strip() or f'column_{index + 1}'
+        candidate = name
+        suffix = 2
+        while candidate in seen:
+            candidate = f'{name}_{suffix}'
+            suffix += 1
+        seen.add(candidate)
+        headers.append(candidate)
+    return headers
+
+def _xml_tag(name: str) -> str:
+    tag = re.sub(r'[^0-9A-Za-z_.-]', '_', name.strip().lower()) or 'field'
+    if not (tag[0].isalpha() or tag[0] == '_'):
+        tag = f'_{tag}'
+    return tag
+
+def _export_sheet(input_path: str, sheet: str, target_format: str, output_path: str) -> str:
+    """Process pool entry point: export one sheet of a workbook"""
+    with XlsxReader(input_path) as reader:
+        reader.write_sheet(output_path, target_format, sheet)
+    return output_path
+
+def export_all_sheets_zip(input_path: str, output_path: str, target_format: str = 'csv') -> bool:
+    """Export every sheet to its own file inside a ZIP archive"""
+    with XlsxReader(input_path) as reader:
+        names = reader.sheet_names()
+    if not names:
+        return False
+    
+    work_dir = tempfile.mkdtemp(prefix='xlsx_', dir=os.path.dirname(os.path.abspath(output_path)))
+    try:
+        jobs = []
+        used = set()
+        for index, name in enumerate(names):
+            safe = re.sub(r'[^0-9A-Za-z_. -]', '_', name).strip() or f'sheet{index + 1}'
+            while safe in used:
+                safe = f'{safe}_{index + 1}'
+            used.add(safe)
+            jobs.append((name, f'{safe}.{target_format}', os.path.join(work_dir, f'{index}.{target_format}')))
+        
+        # Sheets parse independently, so large workbooks fan out over processes
+        workers = min(Config.XLSX_PARALLEL_WORKERS, len(jobs))
+        if workers > 1 and os.path.getsize(input_path) >= Config.XLSX_PARALLEL_MIN_BYTES:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_export_sheet, input_path, name, target_format, path)
+                           for name, _, path in jobs]
+                for future in futures:
+                    future.result()
+        else:
+            for name, _, path in jobs:
+                _export_sheet(input_path, name, target_format, path)
+        
+        with zipfile.ZipFile(output_path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            for _, arcname, path in jobs:
+                archive.write(path, arcname)
+        return True
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)